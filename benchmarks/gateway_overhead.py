@@ -0,0 +1,424 @@
+"""
+Gateway overhead benchmark.
+
+Starts in-process fake SessionService / ModelService backends with a
+configurable latency and payload size, then sends the same calls to them
+directly and through an in-process gateway. Reports throughput and
+p50/p95/p99 latency for both paths and the difference (the overhead one
+gateway hop adds), as JSON.
+
+Scenarios:
+- sessions.GetMessages: unary, response of --payload-bytes
+- models.Chat: unary, response of --payload-bytes
+- models.ChatStream: server streaming, --stream-chunks chunks of --chunk-bytes
+  (time to first chunk and to the end of the stream are both reported)
+
+Usage:
+    python benchmarks/gateway_overhead.py --concurrency 1,16,64 --latency-ms 5 --output results.json
+    python benchmarks/gateway_overhead.py --modes typed,passthrough,aio --payload-bytes 1024,1048576
+
+Backends, gateway and load generator share one process (and its GIL), so
+absolute numbers are pessimistic; compare runs made on the same machine.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import sys
+import threading
+import time
+from concurrent import futures
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import grpc
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from proto import models_pb2, models_pb2_grpc
+from proto import sessions_pb2, sessions_pb2_grpc
+from services.gateway.registry import ServiceRegistry
+from services.gateway.servers import create_grpc_server, create_aio_grpc_server
+from services.shared.compression import message_size_options
+
+
+SESSIONS_METADATA = (("x-target-service", "sessions"),)
+MODELS_METADATA = (("x-target-service", "models"),)
+
+# Size of each message in a fake GetMessages response
+MESSAGE_CONTENT_BYTES = 256
+
+MODES = ("typed", "passthrough", "aio")
+SCENARIOS = ("sessions.GetMessages", "models.Chat", "models.ChatStream")
+
+
+class FakeSessionService(sessions_pb2_grpc.SessionServiceServicer):
+    """Returns a prebuilt GetMessages response after a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self._responses: Dict[int, sessions_pb2.GetMessagesResponse] = {}
+
+    def response_for(self, payload_bytes: int) -> sessions_pb2.GetMessagesResponse:
+        response = self._responses.get(payload_bytes)
+        if response is None:
+            count = max(1, payload_bytes // MESSAGE_CONTENT_BYTES)
+            content = "x" * min(payload_bytes, MESSAGE_CONTENT_BYTES)
+            response = sessions_pb2.GetMessagesResponse(
+                messages=[sessions_pb2.Message(role="user", content=content) for _ in range(count)],
+                total_count=count,
+            )
+            self._responses[payload_bytes] = response
+        return response
+
+    def GetMessages(self, request, context):
+        time.sleep(self.latency)
+        # The requested size travels in `limit` so one backend serves every payload size
+        return self.response_for(request.limit)
+
+
+class FakeModelService(models_pb2_grpc.ModelServiceServicer):
+    """Returns prebuilt Chat responses and ChatStream chunks after a fixed latency."""
+
+    def __init__(self, latency: float, stream_chunks: int, chunk_bytes: int, stream_interval: float):
+        self.latency = latency
+        self.stream_interval = stream_interval
+        self._chunks = [models_pb2.ChatChunk(token="x" * chunk_bytes, index=i) for i in range(stream_chunks)]
+        self._responses: Dict[int, models_pb2.ChatResponse] = {}
+
+    def Chat(self, request, context):
+        time.sleep(self.latency)
+        # The requested size travels in max_tokens so one backend serves every payload size
+        payload_bytes = request.config.max_tokens
+        response = self._responses.get(payload_bytes)
+        if response is None:
+            response = self._responses[payload_bytes] = models_pb2.ChatResponse(text="x" * payload_bytes)
+        return response
+
+    def ChatStream(self, request, context):
+        time.sleep(self.latency)
+        for index, chunk in enumerate(self._chunks):
+            if index and self.stream_interval:
+                time.sleep(self.stream_interval)
+            yield chunk
+
+
+def start_backend(add_servicer: Callable, servicer, max_workers: int) -> Tuple[grpc.Server, str]:
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        options=message_size_options(),
+    )
+    add_servicer(servicer, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    return server, f"127.0.0.1:{port}"
+
+
+def _free_port() -> int:
+    # create_grpc_server binds the port it is given, so pick a free one first
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Gateway:
+    """An in-process gateway (threaded or asyncio) in front of the fake backends."""
+
+    def __init__(self, mode: str, registry: ServiceRegistry):
+        self.mode = mode
+        self.port = _free_port()
+        self._loop = None
+        self._thread = None
+        if mode == "aio":
+            self._start_aio(registry)
+        else:
+            self._server = create_grpc_server(registry, self.port, passthrough=(mode == "passthrough"))
+            self._server.start()
+
+    def _start_aio(self, registry: ServiceRegistry):
+        started = threading.Event()
+
+        async def serve():
+            self._server = create_aio_grpc_server(registry, self.port)
+            await self._server.start()
+            started.set()
+            await self._server.wait_for_termination()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(serve())
+
+        self._thread = threading.Thread(target=run, name="aio-gateway", daemon=True)
+        self._thread.start()
+        started.wait()
+
+    @property
+    def address(self) -> str:
+        return f"localhost:{self.port}"
+
+    def stop(self):
+        if self.mode == "aio":
+            asyncio.run_coroutine_threadsafe(self._server.stop(0), self._loop).result()
+            self._thread.join()
+        else:
+            self._server.stop(0)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Mean and p50/p95/p99 of latencies, in milliseconds."""
+    latencies = sorted(latencies)
+    return {
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def run_load(call: Callable[[int], Optional[float]], requests: int, concurrency: int) -> Dict[str, Dict]:
+    """
+    Run `requests` calls from `concurrency` threads.
+
+    call(i) makes one request and returns the time to its first streamed
+    message (None for unary calls); its total duration is measured here.
+    """
+    latencies: List[float] = []
+    first_message: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    next_request = iter(range(requests))
+
+    def worker():
+        nonlocal errors
+        while True:
+            with lock:
+                i = next(next_request, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            try:
+                first = call(i)
+            except grpc.RpcError:
+                with lock:
+                    errors += 1
+                continue
+            duration = time.perf_counter() - started
+            with lock:
+                latencies.append(duration)
+                if first is not None:
+                    first_message.append(first)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "total": {
+            "requests": requests,
+            "errors": errors,
+            "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            **latency_summary(latencies),
+        },
+    }
+    if first_message:
+        result["first_message"] = latency_summary(first_message)
+    return result
+
+
+def make_call(scenario: str, channel: grpc.Channel, args) -> Callable[[int], Optional[float]]:
+    """Build the per-request function for a scenario over `channel`."""
+    if scenario == "sessions.GetMessages":
+        stub = sessions_pb2_grpc.SessionServiceStub(channel)
+
+        def call(i):
+            # Distinct session ids keep gateway caching/coalescing out of the measurement
+            stub.GetMessages(
+                sessions_pb2.GetMessagesRequest(session_id=f"session-{i}", limit=args.payload),
+                metadata=SESSIONS_METADATA,
+                timeout=args.timeout,
+            )
+
+        return call
+
+    stub = models_pb2_grpc.ModelServiceStub(channel)
+    if scenario == "models.Chat":
+        def call(i):
+            stub.Chat(
+                models_pb2.ChatRequest(model=f"model-{i}", config=models_pb2.ChatConfig(max_tokens=args.payload)),
+                metadata=MODELS_METADATA,
+                timeout=args.timeout,
+            )
+
+        return call
+
+    def call(i):
+        started = time.perf_counter()
+        first = None
+        for _ in stub.ChatStream(
+            models_pb2.ChatRequest(model=f"model-{i}"),
+            metadata=MODELS_METADATA,
+            timeout=args.timeout,
+        ):
+            if first is None:
+                first = time.perf_counter() - started
+        return first
+
+    return call
+
+
+def overhead(direct: Dict[str, float], gateway: Dict[str, float]) -> Dict[str, float]:
+    return {
+        key: round(gateway[f"{key}_ms"] - direct[f"{key}_ms"], 3)
+        for key in ("mean", "p50", "p95", "p99")
+    }
+
+
+def benchmark(scenario: str, target: str, gateway_address: str, concurrency: int, args) -> Dict:
+    """Measure one scenario directly against the backend and through the gateway."""
+    options = message_size_options()
+    runs = {}
+    for path, address in (("direct", target), ("gateway", gateway_address)):
+        with grpc.insecure_channel(address, options=options) as channel:
+            call = make_call(scenario, channel, args)
+            # Warm up connections (and the gateway's backend channels)
+            run_load(call, args.warmup, concurrency)
+            runs[path] = run_load(call, args.requests, concurrency)
+
+    result = {
+        "direct": runs["direct"]["total"],
+        "gateway": runs["gateway"]["total"],
+        "overhead_ms": overhead(runs["direct"]["total"], runs["gateway"]["total"]),
+    }
+    if "first_message" in runs["direct"]:
+        result["first_message"] = {
+            "direct": runs["direct"]["first_message"],
+            "gateway": runs["gateway"]["first_message"],
+            "overhead_ms": overhead(runs["direct"]["first_message"], runs["gateway"]["first_message"]),
+        }
+    return result
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _str_list(choices):
+    def parse(value: str) -> List[str]:
+        items = [item.strip() for item in value.split(",") if item.strip()]
+        for item in items:
+            if item not in choices:
+                raise argparse.ArgumentTypeError(f"'{item}' is not one of {', '.join(choices)}")
+        return items
+    return parse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the latency the gateway adds per hop.")
+    parser.add_argument("--modes", type=_str_list(MODES), default=["typed"],
+                        help="Gateway modes: typed, passthrough, aio (comma-separated)")
+    parser.add_argument("--scenarios", type=_str_list(SCENARIOS), default=list(SCENARIOS),
+                        help="Methods to call (comma-separated)")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 16],
+                        help="Concurrent callers (comma-separated)")
+    parser.add_argument("--payload-bytes", type=_int_list, default=[1024],
+                        help="Unary response sizes (comma-separated)")
+    parser.add_argument("--requests", type=int, default=1000, help="Measured requests per run")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests before each run")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Backend latency per call")
+    parser.add_argument("--stream-chunks", type=int, default=20, help="Chunks per ChatStream")
+    parser.add_argument("--chunk-bytes", type=int, default=16, help="Size of each ChatStream chunk")
+    parser.add_argument("--stream-interval-ms", type=float, default=0.0, help="Delay between stream chunks")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Client deadline per call (seconds)")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    max_concurrency = max(args.concurrency)
+
+    sessions = FakeSessionService(args.latency_ms / 1000)
+    models = FakeModelService(
+        args.latency_ms / 1000, args.stream_chunks, args.chunk_bytes, args.stream_interval_ms / 1000
+    )
+    sessions_server, sessions_address = start_backend(
+        sessions_pb2_grpc.add_SessionServiceServicer_to_server, sessions, max_concurrency * 2
+    )
+    models_server, models_address = start_backend(
+        models_pb2_grpc.add_ModelServiceServicer_to_server, models, max_concurrency * 2
+    )
+    registry = ServiceRegistry()
+    registry.register_platform_service("sessions", sessions_address)
+    registry.register_platform_service("models", models_address)
+    backends = {"sessions": sessions_address, "models": models_address}
+
+    results = []
+    for mode in args.modes:
+        gateway = Gateway(mode, registry)
+        try:
+            for scenario in args.scenarios:
+                streaming = scenario == "models.ChatStream"
+                # Streams are sized by --stream-chunks / --chunk-bytes instead
+                payloads = [None] if streaming else args.payload_bytes
+                for payload in payloads:
+                    for concurrency in args.concurrency:
+                        args.payload = payload
+                        target = backends[scenario.split(".", 1)[0]]
+                        result = {
+                            "mode": mode,
+                            "scenario": scenario,
+                            "concurrency": concurrency,
+                            "payload_bytes": payload if not streaming else args.stream_chunks * args.chunk_bytes,
+                        }
+                        result.update(benchmark(scenario, target, gateway.address, concurrency, args))
+                        results.append(result)
+                        print(
+                            f"{mode:<12} {scenario:<21} c={concurrency:<4} payload={result['payload_bytes']:<9} "
+                            f"overhead p50={result['overhead_ms']['p50']:.3f}ms "
+                            f"p99={result['overhead_ms']['p99']:.3f}ms "
+                            f"gateway {result['gateway']['throughput_rps']} rps",
+                            file=sys.stderr,
+                        )
+        finally:
+            gateway.stop()
+
+    sessions_server.stop(0)
+    models_server.stop(0)
+
+    report = {
+        "config": {
+            key: value for key, value in vars(args).items() if key not in ("output", "payload")
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "grpc": grpc.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Unix domain socket vs loopback TCP benchmark.
+
+Starts in-process fake SessionService / ModelService backends listening on
+both a loopback TCP port and a Unix domain socket (the same way platform
+services do with GRPC_UNIX_SOCKET_DIR set), then sends the same calls over
+each transport. Reports throughput and p50/p95/p99 latency per transport
+and the difference (what one hop saves over UDS), as JSON.
+
+Scenarios are the ones of gateway_overhead.py:
+- sessions.GetMessages: unary, response of --payload-bytes
+- models.Chat: unary, response of --payload-bytes
+- models.ChatStream: server streaming, --stream-chunks chunks of --chunk-bytes
+
+Usage:
+    python benchmarks/uds_vs_tcp.py --concurrency 1,16 --payload-bytes 1024,65536 --output results.json
+
+Backends and load generator share one process (and its GIL), so absolute
+numbers are pessimistic; compare runs made on the same machine.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+from concurrent import futures
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import grpc
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.gateway_overhead import (
+    SCENARIOS,
+    FakeModelService,
+    FakeSessionService,
+    _free_port,
+    _int_list,
+    _str_list,
+    make_call,
+    run_load,
+)
+from proto import models_pb2_grpc
+from proto import sessions_pb2_grpc
+from services.shared.compression import message_size_options
+from services.shared.transport import add_listen_ports
+
+
+TRANSPORTS = ("tcp", "uds")
+
+
+def start_backend(add_servicer: Callable, servicer, max_workers: int, socket_dir: str) -> Tuple[grpc.Server, Dict[str, str]]:
+    """Start a backend on a TCP port and its Unix socket; returns the address per transport."""
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        options=message_size_options(),
+    )
+    add_servicer(servicer, server)
+    port = _free_port()
+    unix_address = add_listen_ports(server, port, socket_dir)
+    if unix_address is None:
+        raise RuntimeError(f"Could not listen on a Unix socket in {socket_dir}")
+    server.start()
+    return server, {"tcp": f"127.0.0.1:{port}", "uds": unix_address}
+
+
+def difference(tcp: Dict[str, float], uds: Dict[str, float]) -> Dict[str, float]:
+    return {key: round(tcp[f"{key}_ms"] - uds[f"{key}_ms"], 3) for key in ("mean", "p50", "p95", "p99")}
+
+
+def benchmark(scenario: str, addresses: Dict[str, str], concurrency: int, args) -> Dict:
+    """Measure one scenario over each transport."""
+    options = message_size_options()
+    runs = {}
+    for transport in args.transports:
+        with grpc.insecure_channel(addresses[transport], options=options) as channel:
+            call = make_call(scenario, channel, args)
+            run_load(call, args.warmup, concurrency)
+            runs[transport] = run_load(call, args.requests, concurrency)
+
+    result = {transport: run["total"] for transport, run in runs.items()}
+    if "tcp" in runs and "uds" in runs:
+        result["saved_ms"] = difference(runs["tcp"]["total"], runs["uds"]["total"])
+        if "first_message" in runs["tcp"]:
+            result["first_message"] = {
+                "tcp": runs["tcp"]["first_message"],
+                "uds": runs["uds"]["first_message"],
+                "saved_ms": difference(runs["tcp"]["first_message"], runs["uds"]["first_message"]),
+            }
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-hop latency over Unix sockets and loopback TCP.")
+    parser.add_argument("--transports", type=_str_list(TRANSPORTS), default=list(TRANSPORTS),
+                        help="Transports to measure: tcp, uds (comma-separated)")
+    parser.add_argument("--scenarios", type=_str_list(SCENARIOS), default=list(SCENARIOS),
+                        help="Methods to call (comma-separated)")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 16],
+                        help="Concurrent callers (comma-separated)")
+    parser.add_argument("--payload-bytes", type=_int_list, default=[1024],
+                        help="Unary response sizes (comma-separated)")
+    parser.add_argument("--requests", type=int, default=1000, help="Measured requests per run")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests before each run")
+    parser.add_argument("--stream-chunks", type=int, default=20, help="Chunks per ChatStream")
+    parser.add_argument("--chunk-bytes", type=int, default=16, help="Size of each ChatStream chunk")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Client deadline per call (seconds)")
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    max_concurrency = max(args.concurrency)
+
+    with tempfile.TemporaryDirectory(prefix="genai-uds-") as socket_dir:
+        sessions_server, sessions_addresses = start_backend(
+            sessions_pb2_grpc.add_SessionServiceServicer_to_server,
+            FakeSessionService(0.0),
+            max_concurrency * 2,
+            socket_dir,
+        )
+        models_server, models_addresses = start_backend(
+            models_pb2_grpc.add_ModelServiceServicer_to_server,
+            FakeModelService(0.0, args.stream_chunks, args.chunk_bytes, 0.0),
+            max_concurrency * 2,
+            socket_dir,
+        )
+        backends = {"sessions": sessions_addresses, "models": models_addresses}
+
+        results: List[Dict] = []
+        try:
+            for scenario in args.scenarios:
+                streaming = scenario == "models.ChatStream"
+                payloads = [None] if streaming else args.payload_bytes
+                for payload in payloads:
+                    for concurrency in args.concurrency:
+                        args.payload = payload
+                        result = {
+                            "scenario": scenario,
+                            "concurrency": concurrency,
+                            "payload_bytes": payload if not streaming else args.stream_chunks * args.chunk_bytes,
+                        }
+                        result.update(benchmark(scenario, backends[scenario.split(".", 1)[0]], concurrency, args))
+                        results.append(result)
+                        summary = " ".join(
+                            f"{transport} p50={result[transport]['p50_ms']:.3f}ms "
+                            f"p99={result[transport]['p99_ms']:.3f}ms"
+                            for transport in args.transports
+                        )
+                        print(
+                            f"{scenario:<21} c={concurrency:<4} payload={result['payload_bytes']:<9} {summary}",
+                            file=sys.stderr,
+                        )
+        finally:
+            sessions_server.stop(0)
+            models_server.stop(0)
+
+    report = {
+        "config": {
+            key: value for key, value in vars(args).items() if key not in ("output", "payload")
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "grpc": grpc.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,58 @@ All service clients follow the same pattern:
 - Connect to gateway via gRPC
 - Use x-target-service metadata for routing
 - Handle Protocol Buffer serialization
+- Compress large requests and accept large responses (configured on GenAIPlatform)
+- Reach a gateway on the same host over its Unix domain socket when it has one
 """
 
+import collections
 import grpc
-from typing import Tuple
+from typing import Optional, Tuple
+
+from .transport import ResolvingChannel, insecure_target
+
+
+COMPRESSION_ALGORITHMS = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+class _CallDetails(
+    collections.namedtuple(
+        "_CallDetails",
+        ("method", "timeout", "metadata", "credentials", "wait_for_ready", "compression"),
+    ),
+    grpc.ClientCallDetails,
+):
+    pass
+
+
+class _RequestCompressionInterceptor(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor):
+    """Compresses requests at or above a size threshold; small ones are sent as is."""
+
+    def __init__(self, algorithm: grpc.Compression, min_bytes: int):
+        self.algorithm = algorithm
+        self.min_bytes = min_bytes
+
+    def _details(self, client_call_details, request):
+        if client_call_details.compression is not None or request.ByteSize() < self.min_bytes:
+            return client_call_details
+        return _CallDetails(
+            client_call_details.method,
+            client_call_details.timeout,
+            client_call_details.metadata,
+            client_call_details.credentials,
+            client_call_details.wait_for_ready,
+            self.algorithm,
+        )
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        return continuation(self._details(client_call_details, request), request)
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        return continuation(self._details(client_call_details, request), request)
 
 
 class BaseClient:
@@ -32,15 +80,35 @@ class BaseClient:
         self.platform = platform
         self.service_name = service_name
         
+        # Raise gRPC's 4 MB default so long session histories fit
+        options = [
+            ("grpc.max_send_message_length", platform.max_send_message_bytes),
+            ("grpc.max_receive_message_length", platform.max_receive_message_bytes),
+        ]
+        
         # Create gRPC channel to gateway
-        # Use insecure channel for localhost/testing, secure for production
-        if platform.gateway_url.startswith("localhost") or platform.gateway_url.startswith("127.0.0.1"):
-            self._channel = grpc.insecure_channel(platform.gateway_url)
-        else:
+        # A co-located gateway is reached over its Unix socket if it listens on one
+        # (GRPC_UNIX_SOCKET_DIR), otherwise over TCP; the channel moves to TCP
+        # if the socket stops answering
+        def connect(target: str) -> grpc.Channel:
+            # Use insecure channel for localhost/Unix sockets/testing, secure for production
+            if insecure_target(target):
+                return grpc.insecure_channel(target, options=options)
             credentials = grpc.ssl_channel_credentials()
-            self._channel = grpc.secure_channel(
-                platform.gateway_url,
-                credentials
+            return grpc.secure_channel(
+                target,
+                credentials,
+                options=options
+            )
+        
+        self._channel = ResolvingChannel(platform.gateway_url, connect)
+        
+        # Compress large requests (e.g. AddMessages with long content)
+        algorithm = self._compression_algorithm(platform.compression)
+        if algorithm is not None:
+            self._channel = grpc.intercept_channel(
+                self._channel,
+                _RequestCompressionInterceptor(algorithm, platform.compression_min_bytes)
             )
         
         # Service-specific metadata for gateway routing
@@ -48,8 +116,20 @@ class BaseClient:
             ('x-target-service', service_name),
         )
     
+    @staticmethod
+    def _compression_algorithm(name: str) -> Optional[grpc.Compression]:
+        """Map a compression setting to a gRPC algorithm (None = no compression)."""
+        try:
+            algorithm = COMPRESSION_ALGORITHMS[name.strip().lower()]
+        except KeyError:
+            raise ValueError(
+                f"Unknown compression '{name}' (expected one of {', '.join(COMPRESSION_ALGORITHMS)})"
+            )
+        if algorithm == grpc.Compression.NoCompression:
+            return None
+        return algorithm
+    
     @property
     def metadata(self) -> Tuple[Tuple[str, str], ...]:
         """Get service routing metadata."""
         return self._metadata
-
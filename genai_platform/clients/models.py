@@ -80,7 +80,8 @@ class ModelClient(BaseClient):
                 'completion_tokens': response.usage.completion_tokens,
                 'total_tokens': response.usage.total_tokens
             } if response.HasField('usage') else None,
-            'finish_reason': response.finish_reason
+            'finish_reason': response.finish_reason,
+            'cached': response.cached
         }
 
     def chat_stream(
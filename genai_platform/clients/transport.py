@@ -0,0 +1,208 @@
+"""
+Unix domain socket transport for the SDK.
+
+A gateway on the same host that listens on a Unix socket (its
+GRPC_UNIX_SOCKET_DIR, see services/shared/transport.py) is reached over
+that socket instead of loopback TCP. The address helpers mirror the
+server-side ones so the SDK does not depend on server code.
+
+The socket is only used while it answers: a call over it that fails with
+UNAVAILABLE makes the channel resolve the gateway address again, moving to
+TCP if the socket is gone.
+"""
+
+import os
+import socket
+import stat
+import threading
+from typing import Callable, Optional, Tuple
+
+import grpc
+
+
+UNIX_PREFIX = "unix:"
+SOCKET_DIR_ENV = "GRPC_UNIX_SOCKET_DIR"
+
+# Host names that mean "this host"
+LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "::1", "[::1]", "0.0.0.0", socket.gethostname()})
+
+# How long a probe waits for the server behind a socket file
+PROBE_TIMEOUT = 0.2
+
+
+def is_unix_address(address: str) -> bool:
+    return address.startswith(UNIX_PREFIX)
+
+
+def unix_socket_path(address: str) -> str:
+    """Filesystem path of a "unix:" address (unix:/path and unix:///path)."""
+    path = address[len(UNIX_PREFIX):]
+    if path.startswith("//"):
+        path = path[2:]
+    return path
+
+
+def unix_socket_ready(address: str) -> bool:
+    """Whether a server is accepting connections on a "unix:" address."""
+    path = unix_socket_path(address)
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return False
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.settimeout(PROBE_TIMEOUT)
+            probe.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def preferred_address(address: str, socket_dir: Optional[str] = None) -> str:
+    """The Unix socket of a local host:port if its server listens on one, `address` otherwise."""
+    if is_unix_address(address):
+        return address
+    host, _, port = address.rpartition(":")
+    socket_dir = socket_dir or os.getenv(SOCKET_DIR_ENV)
+    if host not in LOCAL_HOSTS or not port.isdigit() or not socket_dir:
+        return address
+    unix_address = f"{UNIX_PREFIX}{os.path.join(os.path.abspath(socket_dir), f'grpc-{port}.sock')}"
+    return unix_address if unix_socket_ready(unix_address) else address
+
+
+def insecure_target(address: str) -> bool:
+    """Whether a target is local (Unix socket or loopback) and needs no TLS."""
+    return is_unix_address(address) or address.startswith(("localhost", "127.0.0.1"))
+
+
+class ResolvingChannel(grpc.Channel):
+    """
+    Channel to `address` over its preferred target (see preferred_address).
+
+    When a call over a Unix socket fails with UNAVAILABLE the address is
+    resolved again; if that moves the channel to TCP, unary calls are
+    retried once over it (the socket's server is gone, so the call never
+    ran) and later calls, streams included, use TCP.
+    """
+
+    def __init__(self, address: str, connect: Callable[[str], grpc.Channel]):
+        """
+        Args:
+            address: Gateway host:port (or "unix:" address)
+            connect: Opens a channel to a target
+        """
+        self.address = address
+        self._connect = connect
+        self._lock = threading.Lock()
+        self.target = preferred_address(address)
+        self._channel = connect(self.target)
+
+    def current(self) -> Tuple[str, grpc.Channel]:
+        return self.target, self._channel
+
+    def target_failed(self, target: str) -> bool:
+        """Resolve again after a call to `target` failed; True if the channel moved."""
+        if not is_unix_address(target):
+            return False
+        with self._lock:
+            if self.target != target:
+                # Another call already moved the channel
+                return True
+            resolved = preferred_address(self.address)
+            if resolved == target:
+                return False
+            # Calls in flight on the old channel finish on it; it closes once unreferenced
+            self.target, self._channel = resolved, self._connect(resolved)
+            return True
+
+    def unary_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return _UnaryUnary(self, method, (request_serializer, response_deserializer, _registered_method))
+
+    def unary_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return _UnaryStream(self, method, (request_serializer, response_deserializer, _registered_method))
+
+    def stream_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self._channel.stream_unary(method, request_serializer, response_deserializer, _registered_method)
+
+    def stream_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return self._channel.stream_stream(method, request_serializer, response_deserializer, _registered_method)
+
+    def subscribe(self, callback, try_to_connect=False):
+        self._channel.subscribe(callback, try_to_connect)
+
+    def unsubscribe(self, callback):
+        self._channel.unsubscribe(callback)
+
+    def close(self):
+        self._channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class _MultiCallable:
+    """Multicallable bound to whichever channel the ResolvingChannel currently uses."""
+
+    def __init__(self, owner: ResolvingChannel, method: str, args: tuple):
+        self._owner = owner
+        self._method = method
+        self._args = args
+        self._channel = None
+        self._callable = None
+
+    def _resolve(self):
+        target, channel = self._owner.current()
+        if channel is not self._channel:
+            self._channel = channel
+            self._callable = getattr(channel, self.kind)(self._method, *self._args)
+        return target, self._callable
+
+
+class _UnaryUnary(_MultiCallable, grpc.UnaryUnaryMultiCallable):
+    kind = "unary_unary"
+
+    def _call(self, invoke):
+        target, callable_ = self._resolve()
+        try:
+            return invoke(callable_)
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.UNAVAILABLE or not self._owner.target_failed(target):
+                raise
+        return invoke(self._resolve()[1])
+
+    def __call__(self, request, *args, **kwargs):
+        return self._call(lambda callable_: callable_(request, *args, **kwargs))
+
+    def with_call(self, request, *args, **kwargs):
+        return self._call(lambda callable_: callable_.with_call(request, *args, **kwargs))
+
+    def future(self, request, *args, **kwargs):
+        target, callable_ = self._resolve()
+        call = callable_.future(request, *args, **kwargs)
+        _watch(self._owner, target, call)
+        return call
+
+
+class _UnaryStream(_MultiCallable, grpc.UnaryStreamMultiCallable):
+    kind = "unary_stream"
+
+    def __call__(self, request, *args, **kwargs):
+        # Responses may already have been consumed, so streams are not
+        # retried; a failure only moves later calls off the socket
+        target, callable_ = self._resolve()
+        call = callable_(request, *args, **kwargs)
+        _watch(self._owner, target, call)
+        return call
+
+
+def _watch(owner: ResolvingChannel, target: str, call) -> None:
+    if not is_unix_address(target):
+        return
+
+    def done(finished):
+        if finished.code() == grpc.StatusCode.UNAVAILABLE:
+            owner.target_failed(target)
+
+    call.add_done_callback(done)
@@ -15,6 +15,16 @@ from .clients.tools import ToolClient
 from .clients.evaluation import EvaluationClient
 
 
+# gRPC's own receive limit (4 MB) is too small for long session histories
+DEFAULT_MAX_MESSAGE_MB = 64
+
+
+def _env_megabytes(name: str) -> int:
+    """Read a size in MB from the environment as bytes (-1 = unlimited)."""
+    megabytes = float(os.getenv(name, str(DEFAULT_MAX_MESSAGE_MB)))
+    return -1 if megabytes < 0 else int(megabytes * 1024 * 1024)
+
+
 class GenAIPlatform:
     """
     Main platform SDK entry point.
@@ -29,7 +39,14 @@ class GenAIPlatform:
         response = platform.models.chat(model="gpt-4o", query="Hello")
     """
     
-    def __init__(self, gateway_url: Optional[str] = None):
+    def __init__(
+        self,
+        gateway_url: Optional[str] = None,
+        max_send_message_bytes: Optional[int] = None,
+        max_receive_message_bytes: Optional[int] = None,
+        compression: Optional[str] = None,
+        compression_min_bytes: Optional[int] = None,
+    ):
         """
         Initialize the platform SDK.
         
@@ -37,12 +54,30 @@ class GenAIPlatform:
             gateway_url: Optional explicit gateway URL. If not provided,
                        checks GENAI_GATEWAY_URL environment variable.
                        If neither exists, defaults to "localhost:50051"
+            max_send_message_bytes: Largest request the clients send
+                       (default GENAI_MAX_SEND_MESSAGE_MB, 64 MB)
+            max_receive_message_bytes: Largest response the clients accept,
+                       e.g. GetMessages for long sessions
+                       (default GENAI_MAX_RECEIVE_MESSAGE_MB, 64 MB)
+            compression: "gzip", "deflate" or "none" for requests
+                       (default GENAI_COMPRESSION, none). Responses are
+                       decompressed whatever the server chooses.
+            compression_min_bytes: Requests smaller than this are sent
+                       uncompressed (default GENAI_COMPRESSION_MIN_BYTES, 1024)
         """
         if gateway_url:
             self.gateway_url = gateway_url
         else:
             self.gateway_url = os.getenv("GENAI_GATEWAY_URL", "localhost:50051")
         
+        # gRPC message size limits and request compression (see clients/base.py)
+        self.max_send_message_bytes = max_send_message_bytes or _env_megabytes("GENAI_MAX_SEND_MESSAGE_MB")
+        self.max_receive_message_bytes = max_receive_message_bytes or _env_megabytes("GENAI_MAX_RECEIVE_MESSAGE_MB")
+        self.compression = compression or os.getenv("GENAI_COMPRESSION", "none")
+        if compression_min_bytes is None:
+            compression_min_bytes = int(os.getenv("GENAI_COMPRESSION_MIN_BYTES", "1024"))
+        self.compression_min_bytes = compression_min_bytes
+        
         # Lazy initialization - clients created on first access
         self._sessions = None
         self._models = None
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0cmodels.proto\x12\x05proto\"\xf0\x01\n\x0b\x43hatRequest\x12\r\n\x05model\x18\x01 \x01(\t\x12$\n\x08messages\x18\x02 \x03(\x0b\x32\x12.proto.ChatMessage\x12!\n\x06\x63onfig\x18\x03 \x01(\x0b\x32\x11.proto.ChatConfig\x12$\n\x05tools\x18\x04 \x03(\x0b\x32\x15.proto.ToolDefinition\x12\x33\n\x0fresponse_format\x18\x05 \x01(\x0b\x32\x15.proto.ResponseFormatH\x00\x88\x01\x01\x12\x1a\n\x12system_prompt_name\x18\x06 \x01(\tB\x12\n\x10_response_format\"g\n\x0b\x43hatMessage\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x14\n\x0ctool_call_id\x18\x03 \x01(\t\x12#\n\ntool_calls\x18\x04 \x03(\x0b\x32\x0f.proto.ToolCall\"\\\n\nChatConfig\x12\x13\n\x0btemperature\x18\x01 \x01(\x02\x12\x12\n\nmax_tokens\x18\x02 \x01(\x05\x12\r\n\x05top_p\x18\x03 \x01(\x02\x12\x16\n\x0estop_sequences\x18\x04 \x03(\t\"L\n\x0eToolDefinition\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x17\n\x0fparameters_json\x18\x03 \x01(\t\"3\n\x0eResponseFormat\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x13\n\x0bschema_json\x18\x02 \x01(\t\"8\n\x0c\x43ontentBlock\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x0c\n\x04text\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\"\xd0\x01\n\x0c\x43hatResponse\x12\x0e\n\x04text\x18\x01 \x01(\tH\x00\x12&\n\x06\x62locks\x18\x02 \x01(\x0b\x32\x14.proto.ContentBlocksH\x00\x12\r\n\x05model\x18\x03 \x01(\t\x12\x10\n\x08provider\x18\x04 \x01(\t\x12 \n\x05usage\x18\x05 \x01(\x0b\x32\x11.proto.TokenUsage\x12#\n\ntool_calls\x18\x06 \x03(\x0b\x32\x0f.proto.ToolCall\x12\x15\n\rfinish_reason\x18\x07 \x01(\tB\t\n\x07\x63ontent\"4\n\rContentBlocks\x12#\n\x06\x62locks\x18\x01 \x03(\x0b\x32\x13.proto.ContentBlock\"<\n\x08ToolCall\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x16\n\x0e\x61rguments_json\x18\x03 \x01(\t\"T\n\nTokenUsage\x12\x15\n\rprompt_tokens\x18\x01 \x01(\x05\x12\x19\n\x11\x63ompletion_tokens\x18\x02 \x01(\x05\x12\x14\n\x0ctotal_tokens\x18\x03 \x01(\x05\"\x88\x01\n\tChatChunk\x12\r\n\x05token\x18\x01 \x01(\t\x12\r\n\x05index\x18\x02 \x01(\x05\x12\x1a\n\rfinish_reason\x18\x03 \x01(\tH\x00\x88\x01\x01\x12%\n\x05usage\x18\x04 \x01(\x0b\x32\x11.proto.TokenUsageH\x01\x88\x01\x01\x42\x10\n\x0e_finish_reasonB\x08\n\x06_usage\"\\\n\x11ModelCapabilities\x12\x16\n\x0e\x63ontext_window\x18\x01 \x01(\x05\x12\x17\n\x0fsupports_vision\x18\x02 \x01(\x08\x12\x16\n\x0esupports_tools\x18\x03 \x01(\x08\"[\n\tModelInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08provider\x18\x02 \x01(\t\x12.\n\x0c\x63\x61pabilities\x18\x03 \x01(\x0b\x32\x18.proto.ModelCapabilities\"\x13\n\x11ListModelsRequest\"6\n\x12ListModelsResponse\x12 \n\x06models\x18\x01 \x03(\x0b\x32\x10.proto.ModelInfo\"\'\n\x16GetCapabilitiesRequest\x12\r\n\x05model\x18\x01 \x01(\t\"C\n\x0ePromptMetadata\x12\x0e\n\x06\x61uthor\x18\x01 \x01(\t\x12\x13\n\x0breviewed_by\x18\x02 \x01(\t\x12\x0c\n\x04tags\x18\x03 \x03(\t\"_\n\x15RegisterPromptRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\'\n\x08metadata\x18\x03 \x01(\x0b\x32\x15.proto.PromptMetadata\"K\n\x16RegisterPromptResponse\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\x05\x12\x12\n\ncreated_at\x18\x03 \x01(\t\"u\n\x06Prompt\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\x05\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\'\n\x08metadata\x18\x04 \x01(\x0b\x32\x15.proto.PromptMetadata\x12\x12\n\ncreated_at\x18\x05 \x01(\t\"1\n\x10GetPromptRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\x05\"\x14\n\x12ListPromptsRequest\"5\n\x13ListPromptsResponse\x12\x1e\n\x07prompts\x18\x01 \x03(\x0b\x32\r.proto.Prompt\"\xa4\x01\n\x14RegisterModelRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08\x65ndpoint\x18\x02 \x01(\t\x12.\n\x0c\x63\x61pabilities\x18\x03 \x01(\x0b\x32\x18.proto.ModelCapabilities\x12\x14\n\x0chealth_check\x18\x04 \x01(\t\x12\x14\n\x0c\x61\x64\x61pter_type\x18\x05 \x01(\t\x12\x10\n\x08provider\x18\x06 \x01(\t\"L\n\x15RegisterModelResponse\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x15\n\rregistered_at\x18\x03 \x01(\t\"\xc6\x01\n\x0fRegisteredModel\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08\x65ndpoint\x18\x02 \x01(\t\x12.\n\x0c\x63\x61pabilities\x18\x03 \x01(\x0b\x32\x18.proto.ModelCapabilities\x12\x14\n\x0chealth_check\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\x12\x15\n\rregistered_at\x18\x06 \x01(\t\x12\x10\n\x08provider\x18\x07 \x01(\t\x12\x14\n\x0c\x61\x64\x61pter_type\x18\x08 \x01(\t\"\x1d\n\x1bListRegisteredModelsRequest\"F\n\x1cListRegisteredModelsResponse\x12&\n\x06models\x18\x01 \x03(\x0b\x32\x16.proto.RegisteredModel\"%\n\x15GetModelStatusRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\"S\n\x0bModelStatus\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x14\n\x0clast_checked\x18\x03 \x01(\t\x12\x10\n\x08\x65ndpoint\x18\x04 \x01(\t2\xc4\x05\n\x0cModelService\x12/\n\x04\x43hat\x12\x12.proto.ChatRequest\x1a\x13.proto.ChatResponse\x12\x34\n\nChatStream\x12\x12.proto.ChatRequest\x1a\x10.proto.ChatChunk0\x01\x12\x41\n\nListModels\x12\x18.proto.ListModelsRequest\x1a\x19.proto.ListModelsResponse\x12O\n\x14GetModelCapabilities\x12\x1d.proto.GetCapabilitiesRequest\x1a\x18.proto.ModelCapabilities\x12M\n\x0eRegisterPrompt\x12\x1c.proto.RegisterPromptRequest\x1a\x1d.proto.RegisterPromptResponse\x12\x33\n\tGetPrompt\x12\x17.proto.GetPromptRequest\x1a\r.proto.Prompt\x12\x44\n\x0bListPrompts\x12\x19.proto.ListPromptsRequest\x1a\x1a.proto.ListPromptsResponse\x12J\n\rRegisterModel\x12\x1b.proto.RegisterModelRequest\x1a\x1c.proto.RegisterModelResponse\x12_\n\x14ListRegisteredModels\x12\".proto.ListRegisteredModelsRequest\x1a#.proto.ListRegisteredModelsResponse\x12\x42\n\x0eGetModelStatus\x12\x1c.proto.GetModelStatusRequest\x1a\x12.proto.ModelStatusb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0cmodels.proto\x12\x05proto\"\xf0\x01\n\x0b\x43hatRequest\x12\r\n\x05model\x18\x01 \x01(\t\x12$\n\x08messages\x18\x02 \x03(\x0b\x32\x12.proto.ChatMessage\x12!\n\x06\x63onfig\x18\x03 \x01(\x0b\x32\x11.proto.ChatConfig\x12$\n\x05tools\x18\x04 \x03(\x0b\x32\x15.proto.ToolDefinition\x12\x33\n\x0fresponse_format\x18\x05 \x01(\x0b\x32\x15.proto.ResponseFormatH\x00\x88\x01\x01\x12\x1a\n\x12system_prompt_name\x18\x06 \x01(\tB\x12\n\x10_response_format\"g\n\x0b\x43hatMessage\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x14\n\x0ctool_call_id\x18\x03 \x01(\t\x12#\n\ntool_calls\x18\x04 \x03(\x0b\x32\x0f.proto.ToolCall\"q\n\nChatConfig\x12\x18\n\x0btemperature\x18\x01 \x01(\x02H\x00\x88\x01\x01\x12\x12\n\nmax_tokens\x18\x02 \x01(\x05\x12\r\n\x05top_p\x18\x03 \x01(\x02\x12\x16\n\x0estop_sequences\x18\x04 \x03(\tB\x0e\n\x0c_temperature\"L\n\x0eToolDefinition\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x17\n\x0fparameters_json\x18\x03 \x01(\t\"3\n\x0eResponseFormat\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x13\n\x0bschema_json\x18\x02 \x01(\t\"8\n\x0c\x43ontentBlock\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x0c\n\x04text\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\"\xe0\x01\n\x0c\x43hatResponse\x12\x0e\n\x04text\x18\x01 \x01(\tH\x00\x12&\n\x06\x62locks\x18\x02 \x01(\x0b\x32\x14.proto.ContentBlocksH\x00\x12\r\n\x05model\x18\x03 \x01(\t\x12\x10\n\x08provider\x18\x04 \x01(\t\x12 \n\x05usage\x18\x05 \x01(\x0b\x32\x11.proto.TokenUsage\x12#\n\ntool_calls\x18\x06 \x03(\x0b\x32\x0f.proto.ToolCall\x12\x15\n\rfinish_reason\x18\x07 \x01(\t\x12\x0e\n\x06\x63\x61\x63hed\x18\x08 \x01(\x08\x42\t\n\x07\x63ontent\"4\n\rContentBlocks\x12#\n\x06\x62locks\x18\x01 \x03(\x0b\x32\x13.proto.ContentBlock\"<\n\x08ToolCall\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x16\n\x0e\x61rguments_json\x18\x03 \x01(\t\"T\n\nTokenUsage\x12\x15\n\rprompt_tokens\x18\x01 \x01(\x05\x12\x19\n\x11\x63ompletion_tokens\x18\x02 \x01(\x05\x12\x14\n\x0ctotal_tokens\x18\x03 \x01(\x05\"\x98\x01\n\tChatChunk\x12\r\n\x05token\x18\x01 \x01(\t\x12\r\n\x05index\x18\x02 \x01(\x05\x12\x1a\n\rfinish_reason\x18\x03 \x01(\tH\x00\x88\x01\x01\x12%\n\x05usage\x18\x04 \x01(\x0b\x32\x11.proto.TokenUsageH\x01\x88\x01\x01\x12\x0e\n\x06\x63\x61\x63hed\x18\x05 \x01(\x08\x42\x10\n\x0e_finish_reasonB\x08\n\x06_usage\"\\\n\x11ModelCapabilities\x12\x16\n\x0e\x63ontext_window\x18\x01 \x01(\x05\x12\x17\n\x0fsupports_vision\x18\x02 \x01(\x08\x12\x16\n\x0esupports_tools\x18\x03 \x01(\x08\"[\n\tModelInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08provider\x18\x02 \x01(\t\x12.\n\x0c\x63\x61pabilities\x18\x03 \x01(\x0b\x32\x18.proto.ModelCapabilities\"\x13\n\x11ListModelsRequest\"6\n\x12ListModelsResponse\x12 \n\x06models\x18\x01 \x03(\x0b\x32\x10.proto.ModelInfo\"\'\n\x16GetCapabilitiesRequest\x12\r\n\x05model\x18\x01 \x01(\t\"C\n\x0ePromptMetadata\x12\x0e\n\x06\x61uthor\x18\x01 \x01(\t\x12\x13\n\x0breviewed_by\x18\x02 \x01(\t\x12\x0c\n\x04tags\x18\x03 \x03(\t\"_\n\x15RegisterPromptRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\'\n\x08metadata\x18\x03 \x01(\x0b\x32\x15.proto.PromptMetadata\"K\n\x16RegisterPromptResponse\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\x05\x12\x12\n\ncreated_at\x18\x03 \x01(\t\"u\n\x06Prompt\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\x05\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\'\n\x08metadata\x18\x04 \x01(\x0b\x32\x15.proto.PromptMetadata\x12\x12\n\ncreated_at\x18\x05 \x01(\t\"1\n\x10GetPromptRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0f\n\x07version\x18\x02 \x01(\x05\"\x14\n\x12ListPromptsRequest\"5\n\x13ListPromptsResponse\x12\x1e\n\x07prompts\x18\x01 \x03(\x0b\x32\r.proto.Prompt\"\xa4\x01\n\x14RegisterModelRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08\x65ndpoint\x18\x02 \x01(\t\x12.\n\x0c\x63\x61pabilities\x18\x03 \x01(\x0b\x32\x18.proto.ModelCapabilities\x12\x14\n\x0chealth_check\x18\x04 \x01(\t\x12\x14\n\x0c\x61\x64\x61pter_type\x18\x05 \x01(\t\x12\x10\n\x08provider\x18\x06 \x01(\t\"L\n\x15RegisterModelResponse\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x15\n\rregistered_at\x18\x03 \x01(\t\"\xc6\x01\n\x0fRegisteredModel\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08\x65ndpoint\x18\x02 \x01(\t\x12.\n\x0c\x63\x61pabilities\x18\x03 \x01(\x0b\x32\x18.proto.ModelCapabilities\x12\x14\n\x0chealth_check\x18\x04 \x01(\t\x12\x0e\n\x06status\x18\x05 \x01(\t\x12\x15\n\rregistered_at\x18\x06 \x01(\t\x12\x10\n\x08provider\x18\x07 \x01(\t\x12\x14\n\x0c\x61\x64\x61pter_type\x18\x08 \x01(\t\"\x1d\n\x1bListRegisteredModelsRequest\"F\n\x1cListRegisteredModelsResponse\x12&\n\x06models\x18\x01 \x03(\x0b\x32\x16.proto.RegisteredModel\"%\n\x15GetModelStatusRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\"S\n\x0bModelStatus\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x14\n\x0clast_checked\x18\x03 \x01(\t\x12\x10\n\x08\x65ndpoint\x18\x04 \x01(\t2\xc4\x05\n\x0cModelService\x12/\n\x04\x43hat\x12\x12.proto.ChatRequest\x1a\x13.proto.ChatResponse\x12\x34\n\nChatStream\x12\x12.proto.ChatRequest\x1a\x10.proto.ChatChunk0\x01\x12\x41\n\nListModels\x12\x18.proto.ListModelsRequest\x1a\x19.proto.ListModelsResponse\x12O\n\x14GetModelCapabilities\x12\x1d.proto.GetCapabilitiesRequest\x1a\x18.proto.ModelCapabilities\x12M\n\x0eRegisterPrompt\x12\x1c.proto.RegisterPromptRequest\x1a\x1d.proto.RegisterPromptResponse\x12\x33\n\tGetPrompt\x12\x17.proto.GetPromptRequest\x1a\r.proto.Prompt\x12\x44\n\x0bListPrompts\x12\x19.proto.ListPromptsRequest\x1a\x1a.proto.ListPromptsResponse\x12J\n\rRegisterModel\x12\x1b.proto.RegisterModelRequest\x1a\x1c.proto.RegisterModelResponse\x12_\n\x14ListRegisteredModels\x12\".proto.ListRegisteredModelsRequest\x1a#.proto.ListRegisteredModelsResponse\x12\x42\n\x0eGetModelStatus\x12\x1c.proto.GetModelStatusRequest\x1a\x12.proto.ModelStatusb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -36,61 +36,61 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_CHATMESSAGE']._serialized_start=266
   _globals['_CHATMESSAGE']._serialized_end=369
   _globals['_CHATCONFIG']._serialized_start=371
-  _globals['_CHATCONFIG']._serialized_end=463
-  _globals['_TOOLDEFINITION']._serialized_start=465
-  _globals['_TOOLDEFINITION']._serialized_end=541
-  _globals['_RESPONSEFORMAT']._serialized_start=543
-  _globals['_RESPONSEFORMAT']._serialized_end=594
-  _globals['_CONTENTBLOCK']._serialized_start=596
-  _globals['_CONTENTBLOCK']._serialized_end=652
-  _globals['_CHATRESPONSE']._serialized_start=655
-  _globals['_CHATRESPONSE']._serialized_end=863
-  _globals['_CONTENTBLOCKS']._serialized_start=865
-  _globals['_CONTENTBLOCKS']._serialized_end=917
-  _globals['_TOOLCALL']._serialized_start=919
-  _globals['_TOOLCALL']._serialized_end=979
-  _globals['_TOKENUSAGE']._serialized_start=981
-  _globals['_TOKENUSAGE']._serialized_end=1065
-  _globals['_CHATCHUNK']._serialized_start=1068
-  _globals['_CHATCHUNK']._serialized_end=1204
-  _globals['_MODELCAPABILITIES']._serialized_start=1206
-  _globals['_MODELCAPABILITIES']._serialized_end=1298
-  _globals['_MODELINFO']._serialized_start=1300
-  _globals['_MODELINFO']._serialized_end=1391
-  _globals['_LISTMODELSREQUEST']._serialized_start=1393
-  _globals['_LISTMODELSREQUEST']._serialized_end=1412
-  _globals['_LISTMODELSRESPONSE']._serialized_start=1414
-  _globals['_LISTMODELSRESPONSE']._serialized_end=1468
-  _globals['_GETCAPABILITIESREQUEST']._serialized_start=1470
-  _globals['_GETCAPABILITIESREQUEST']._serialized_end=1509
-  _globals['_PROMPTMETADATA']._serialized_start=1511
-  _globals['_PROMPTMETADATA']._serialized_end=1578
-  _globals['_REGISTERPROMPTREQUEST']._serialized_start=1580
-  _globals['_REGISTERPROMPTREQUEST']._serialized_end=1675
-  _globals['_REGISTERPROMPTRESPONSE']._serialized_start=1677
-  _globals['_REGISTERPROMPTRESPONSE']._serialized_end=1752
-  _globals['_PROMPT']._serialized_start=1754
-  _globals['_PROMPT']._serialized_end=1871
-  _globals['_GETPROMPTREQUEST']._serialized_start=1873
-  _globals['_GETPROMPTREQUEST']._serialized_end=1922
-  _globals['_LISTPROMPTSREQUEST']._serialized_start=1924
-  _globals['_LISTPROMPTSREQUEST']._serialized_end=1944
-  _globals['_LISTPROMPTSRESPONSE']._serialized_start=1946
-  _globals['_LISTPROMPTSRESPONSE']._serialized_end=1999
-  _globals['_REGISTERMODELREQUEST']._serialized_start=2002
-  _globals['_REGISTERMODELREQUEST']._serialized_end=2166
-  _globals['_REGISTERMODELRESPONSE']._serialized_start=2168
-  _globals['_REGISTERMODELRESPONSE']._serialized_end=2244
-  _globals['_REGISTEREDMODEL']._serialized_start=2247
-  _globals['_REGISTEREDMODEL']._serialized_end=2445
-  _globals['_LISTREGISTEREDMODELSREQUEST']._serialized_start=2447
-  _globals['_LISTREGISTEREDMODELSREQUEST']._serialized_end=2476
-  _globals['_LISTREGISTEREDMODELSRESPONSE']._serialized_start=2478
-  _globals['_LISTREGISTEREDMODELSRESPONSE']._serialized_end=2548
-  _globals['_GETMODELSTATUSREQUEST']._serialized_start=2550
-  _globals['_GETMODELSTATUSREQUEST']._serialized_end=2587
-  _globals['_MODELSTATUS']._serialized_start=2589
-  _globals['_MODELSTATUS']._serialized_end=2672
-  _globals['_MODELSERVICE']._serialized_start=2675
-  _globals['_MODELSERVICE']._serialized_end=3383
+  _globals['_CHATCONFIG']._serialized_end=484
+  _globals['_TOOLDEFINITION']._serialized_start=486
+  _globals['_TOOLDEFINITION']._serialized_end=562
+  _globals['_RESPONSEFORMAT']._serialized_start=564
+  _globals['_RESPONSEFORMAT']._serialized_end=615
+  _globals['_CONTENTBLOCK']._serialized_start=617
+  _globals['_CONTENTBLOCK']._serialized_end=673
+  _globals['_CHATRESPONSE']._serialized_start=676
+  _globals['_CHATRESPONSE']._serialized_end=900
+  _globals['_CONTENTBLOCKS']._serialized_start=902
+  _globals['_CONTENTBLOCKS']._serialized_end=954
+  _globals['_TOOLCALL']._serialized_start=956
+  _globals['_TOOLCALL']._serialized_end=1016
+  _globals['_TOKENUSAGE']._serialized_start=1018
+  _globals['_TOKENUSAGE']._serialized_end=1102
+  _globals['_CHATCHUNK']._serialized_start=1105
+  _globals['_CHATCHUNK']._serialized_end=1257
+  _globals['_MODELCAPABILITIES']._serialized_start=1259
+  _globals['_MODELCAPABILITIES']._serialized_end=1351
+  _globals['_MODELINFO']._serialized_start=1353
+  _globals['_MODELINFO']._serialized_end=1444
+  _globals['_LISTMODELSREQUEST']._serialized_start=1446
+  _globals['_LISTMODELSREQUEST']._serialized_end=1465
+  _globals['_LISTMODELSRESPONSE']._serialized_start=1467
+  _globals['_LISTMODELSRESPONSE']._serialized_end=1521
+  _globals['_GETCAPABILITIESREQUEST']._serialized_start=1523
+  _globals['_GETCAPABILITIESREQUEST']._serialized_end=1562
+  _globals['_PROMPTMETADATA']._serialized_start=1564
+  _globals['_PROMPTMETADATA']._serialized_end=1631
+  _globals['_REGISTERPROMPTREQUEST']._serialized_start=1633
+  _globals['_REGISTERPROMPTREQUEST']._serialized_end=1728
+  _globals['_REGISTERPROMPTRESPONSE']._serialized_start=1730
+  _globals['_REGISTERPROMPTRESPONSE']._serialized_end=1805
+  _globals['_PROMPT']._serialized_start=1807
+  _globals['_PROMPT']._serialized_end=1924
+  _globals['_GETPROMPTREQUEST']._serialized_start=1926
+  _globals['_GETPROMPTREQUEST']._serialized_end=1975
+  _globals['_LISTPROMPTSREQUEST']._serialized_start=1977
+  _globals['_LISTPROMPTSREQUEST']._serialized_end=1997
+  _globals['_LISTPROMPTSRESPONSE']._serialized_start=1999
+  _globals['_LISTPROMPTSRESPONSE']._serialized_end=2052
+  _globals['_REGISTERMODELREQUEST']._serialized_start=2055
+  _globals['_REGISTERMODELREQUEST']._serialized_end=2219
+  _globals['_REGISTERMODELRESPONSE']._serialized_start=2221
+  _globals['_REGISTERMODELRESPONSE']._serialized_end=2297
+  _globals['_REGISTEREDMODEL']._serialized_start=2300
+  _globals['_REGISTEREDMODEL']._serialized_end=2498
+  _globals['_LISTREGISTEREDMODELSREQUEST']._serialized_start=2500
+  _globals['_LISTREGISTEREDMODELSREQUEST']._serialized_end=2529
+  _globals['_LISTREGISTEREDMODELSRESPONSE']._serialized_start=2531
+  _globals['_LISTREGISTEREDMODELSRESPONSE']._serialized_end=2601
+  _globals['_GETMODELSTATUSREQUEST']._serialized_start=2603
+  _globals['_GETMODELSTATUSREQUEST']._serialized_end=2640
+  _globals['_MODELSTATUS']._serialized_start=2642
+  _globals['_MODELSTATUS']._serialized_end=2725
+  _globals['_MODELSERVICE']._serialized_start=2728
+  _globals['_MODELSERVICE']._serialized_end=3436
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: registry.proto
+# Protobuf Python Version: 6.31.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    6,
+    31,
+    1,
+    '',
+    'registry.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0eregistry.proto\x12\x05proto\"M\n\x0fRegisterRequest\x12\x14\n\x0cservice_name\x18\x01 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\x12\x13\n\x0bttl_seconds\x18\x03 \x01(\x01\"K\n\x10RegisterResponse\x12\x13\n\x0bttl_seconds\x18\x01 \x01(\x01\x12\"\n\x1aheartbeat_interval_seconds\x18\x02 \x01(\x01\"9\n\x10HeartbeatRequest\x12\x14\n\x0cservice_name\x18\x01 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\"\'\n\x11HeartbeatResponse\x12\x12\n\nregistered\x18\x01 \x01(\x08\":\n\x11\x44\x65registerRequest\x12\x14\n\x0cservice_name\x18\x01 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\"%\n\x12\x44\x65registerResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32\xd1\x01\n\x0fRegistryService\x12;\n\x08Register\x12\x16.proto.RegisterRequest\x1a\x17.proto.RegisterResponse\x12>\n\tHeartbeat\x12\x17.proto.HeartbeatRequest\x1a\x18.proto.HeartbeatResponse\x12\x41\n\nDeregister\x12\x18.proto.DeregisterRequest\x1a\x19.proto.DeregisterResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'registry_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_REGISTERREQUEST']._serialized_start=25
+  _globals['_REGISTERREQUEST']._serialized_end=102
+  _globals['_REGISTERRESPONSE']._serialized_start=104
+  _globals['_REGISTERRESPONSE']._serialized_end=179
+  _globals['_HEARTBEATREQUEST']._serialized_start=181
+  _globals['_HEARTBEATREQUEST']._serialized_end=238
+  _globals['_HEARTBEATRESPONSE']._serialized_start=240
+  _globals['_HEARTBEATRESPONSE']._serialized_end=279
+  _globals['_DEREGISTERREQUEST']._serialized_start=281
+  _globals['_DEREGISTERREQUEST']._serialized_end=339
+  _globals['_DEREGISTERRESPONSE']._serialized_start=341
+  _globals['_DEREGISTERRESPONSE']._serialized_end=378
+  _globals['_REGISTRYSERVICE']._serialized_start=381
+  _globals['_REGISTRYSERVICE']._serialized_end=590
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,266 @@
+"""
+Admission Control - Rate and concurrency limits for proxied calls.
+
+Without limits a single workflow (e.g. a runaway batch job calling
+models.Chat) can saturate the gateway and the backends for everyone.
+Limits are configured along two dimensions:
+- Per tenant (taken from request metadata, "x-tenant-id" by default)
+- Per target service or service.method ("models", "models.Chat")
+
+Each limit combines a token bucket (rate + burst) and a cap on concurrent
+calls. Over-limit calls are rejected immediately with a retry-after hint
+instead of queueing.
+
+Tenant ids come from the client, so per-tenant state is bounded: a tenant
+with no call in flight and a full bucket is dropped (a new state starts
+full, so nothing is lost), and beyond max_tenants unknown tenants share one
+overflow state.
+"""
+
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+import grpc
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call exceeds a rate or concurrency limit."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Limit:
+    """Limit definition: token bucket (rate/burst) and/or max concurrent calls."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """
+        Args:
+            rate: Sustained calls per second (None = no rate limit)
+            burst: Bucket size (defaults to one second worth of rate, at
+                least one call)
+            max_concurrency: Calls allowed in flight at once (None = unlimited)
+
+        Raises:
+            ValueError: If burst is below 1 (no call could ever be admitted)
+        """
+        if rate and burst is not None and burst < 1:
+            raise ValueError(f"burst must be at least 1 (got {burst})")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate or 0.0, 1.0)
+        self.max_concurrency = max_concurrency
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "Limit":
+        return cls(
+            rate=config.get("rate"),
+            burst=config.get("burst"),
+            max_concurrency=config.get("max_concurrency"),
+        )
+
+
+class LimitState:
+    """Runtime state for one limit: current tokens and calls in flight."""
+
+    __slots__ = ("limit", "name", "tokens", "updated_at", "in_flight")
+
+    def __init__(self, limit: Limit, name: str):
+        self.limit = limit
+        self.name = name
+        self.tokens = limit.burst if limit.rate else 0.0
+        self.updated_at = time.monotonic()
+        self.in_flight = 0
+
+    def retry_after_locked(self, now: float, concurrency_retry_after: float) -> float:
+        """Seconds until a call would be admitted (0 = admit now). Caller holds the lock."""
+        limit = self.limit
+        if limit.max_concurrency is not None and self.in_flight >= limit.max_concurrency:
+            return concurrency_retry_after
+        if limit.rate:
+            # A state created after `now` was taken must not lose tokens
+            elapsed = max(0.0, now - self.updated_at)
+            self.tokens = min(limit.burst, self.tokens + elapsed * limit.rate)
+            self.updated_at = max(now, self.updated_at)
+            if self.tokens < 1.0:
+                return (1.0 - self.tokens) / limit.rate
+        return 0.0
+
+    def idle_locked(self, now: float) -> bool:
+        """Whether nothing is in flight and the bucket has refilled (state can be dropped)."""
+        if self.in_flight:
+            return False
+        limit = self.limit
+        return not limit.rate or self.tokens + (now - self.updated_at) * limit.rate >= limit.burst
+
+    def admit_locked(self):
+        if self.limit.rate:
+            self.tokens -= 1.0
+        self.in_flight += 1
+
+
+class AdmissionTicket:
+    """An admitted call. release() must be called once the call has finished."""
+
+    __slots__ = ("_controller", "_states")
+
+    def __init__(self, controller: "AdmissionController", states: List[LimitState]):
+        self._controller = controller
+        self._states = states
+
+    def release(self):
+        states, self._states = self._states, []
+        if states:
+            self._controller._release(states)
+
+
+class AdmissionController:
+    """
+    Applies tenant and service/method limits to every proxied call.
+
+    Example config (GATEWAY_RATE_LIMITS, JSON):
+        {
+          "tenant_header": "x-tenant-id",
+          "max_tenants": 10000,
+          "default_tenant": {"rate": 50, "burst": 100, "max_concurrency": 20},
+          "tenants": {"batch-job": {"rate": 5, "max_concurrency": 2}},
+          "methods": {"models.Chat": {"rate": 200, "max_concurrency": 50}}
+        }
+    """
+
+    def __init__(
+        self,
+        default_tenant: Optional[Limit] = None,
+        tenants: Optional[Dict[str, Limit]] = None,
+        methods: Optional[Dict[str, Limit]] = None,
+        tenant_header: str = "x-tenant-id",
+        concurrency_retry_after: float = 1.0,
+        max_tenants: int = 10000,
+        sweep_interval: float = 10.0,
+    ):
+        """
+        Args:
+            default_tenant: Limit applied to each tenant without an explicit entry
+            tenants: Per-tenant limits
+            methods: Limits keyed by "service" or "service.Method", shared by all tenants
+            tenant_header: Metadata key identifying the tenant
+            concurrency_retry_after: Retry-after hint (seconds) for concurrency rejections
+            max_tenants: Tenants tracked individually; further unknown tenants
+                share one overflow state
+            sweep_interval: Seconds between sweeps dropping idle tenant states
+        """
+        self.default_tenant = default_tenant
+        self.tenants = tenants or {}
+        self.methods = methods or {}
+        self.tenant_header = tenant_header
+        self.concurrency_retry_after = concurrency_retry_after
+        self.max_tenants = max_tenants
+        self.sweep_interval = sweep_interval
+
+        self._lock = threading.Lock()
+        self._tenant_states: Dict[str, LimitState] = {}
+        self._overflow_state = (
+            LimitState(default_tenant, "tenant '(overflow)'") if default_tenant is not None else None
+        )
+        self._last_sweep = time.monotonic()
+        self._method_states: Dict[str, LimitState] = {
+            name: LimitState(limit, name) for name, limit in self.methods.items()
+        }
+        self._rejected = 0
+
+    @classmethod
+    def from_json(cls, config_json: str) -> "AdmissionController":
+        """Build a controller from a JSON config string."""
+        config = json.loads(config_json)
+        default_tenant = config.get("default_tenant")
+        return cls(
+            default_tenant=Limit.from_dict(default_tenant) if default_tenant else None,
+            tenants={name: Limit.from_dict(c) for name, c in config.get("tenants", {}).items()},
+            methods={name: Limit.from_dict(c) for name, c in config.get("methods", {}).items()},
+            tenant_header=config.get("tenant_header", "x-tenant-id"),
+            concurrency_retry_after=config.get("concurrency_retry_after", 1.0),
+            max_tenants=config.get("max_tenants", 10000),
+        )
+
+    def admit(self, service_name: str, method_name: str, tenant: Optional[str]) -> AdmissionTicket:
+        """
+        Admit a call or raise AdmissionRejected.
+
+        Either every applicable limit is charged or none is.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep_locked(now)
+            states = self._states_locked(service_name, method_name, tenant or "anonymous")
+            for state in states:
+                retry_after = state.retry_after_locked(now, self.concurrency_retry_after)
+                if retry_after > 0:
+                    self._rejected += 1
+                    raise AdmissionRejected(
+                        f"Limit exceeded for {state.name}; retry after {retry_after:.3f}s",
+                        retry_after,
+                    )
+            for state in states:
+                state.admit_locked()
+        return AdmissionTicket(self, states)
+
+    def stats(self) -> Dict[str, object]:
+        """Snapshot of rejections and calls in flight per limit."""
+        with self._lock:
+            states = list(self._method_states.values()) + list(self._tenant_states.values())
+            if self._overflow_state is not None and self._overflow_state.in_flight:
+                states.append(self._overflow_state)
+            return {
+                "rejected": self._rejected,
+                "tenants": len(self._tenant_states),
+                "in_flight": {state.name: state.in_flight for state in states},
+            }
+
+    def _states_locked(self, service_name: str, method_name: str, tenant: str) -> List[LimitState]:
+        states = []
+        tenant_state = self._tenant_states.get(tenant)
+        if tenant_state is None:
+            limit = self.tenants.get(tenant)
+            if limit is None and len(self._tenant_states) >= self.max_tenants:
+                # Table full: unknown tenants share one default-limited state
+                tenant_state = self._overflow_state
+            elif limit is not None or self.default_tenant is not None:
+                tenant_state = LimitState(limit or self.default_tenant, f"tenant '{tenant}'")
+                self._tenant_states[tenant] = tenant_state
+        if tenant_state is not None:
+            states.append(tenant_state)
+
+        for name in (service_name, f"{service_name}.{method_name}"):
+            method_state = self._method_states.get(name)
+            if method_state is not None:
+                states.append(method_state)
+        return states
+
+    def _sweep_locked(self, now: float):
+        """Drop idle tenant states; they would be recreated identical (full bucket)."""
+        self._last_sweep = now
+        idle = [tenant for tenant, state in self._tenant_states.items() if state.idle_locked(now)]
+        for tenant in idle:
+            del self._tenant_states[tenant]
+
+    def _release(self, states: List[LimitState]):
+        with self._lock:
+            for state in states:
+                state.in_flight -= 1
+
+
+def reject_call(context, error: AdmissionRejected):
+    """Fail a call with RESOURCE_EXHAUSTED and a retry-after hint in trailing metadata."""
+    context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+    context.set_details(str(error))
+    context.set_trailing_metadata((
+        ("retry-after-ms", str(int(error.retry_after * 1000))),
+    ))
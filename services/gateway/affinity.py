@@ -0,0 +1,99 @@
+"""
+Session Affinity - Routes a session's calls to the same replica.
+
+With several Session or Model Service replicas, per-replica caches (hot
+session tails, prompt caches) only help if one session's calls keep
+landing on the replica that warmed them. For the services configured here
+the gateway takes an affinity key from each call and picks the replica by
+consistent hashing with bounded loads (see ConsistentHashBalancer) instead
+of the balancing policy.
+
+The key is the first of the configured fields (default session_id, then
+user_id) found in the call's metadata ("x-session-id", "x-user-id") or in
+the request message. In byte passthrough modes the request is only decoded
+when the metadata carries no key. Calls without a key use the normal
+balancing policy.
+"""
+
+import json
+import threading
+from typing import Dict, Optional, Sequence
+
+from google.protobuf.message import DecodeError
+
+from services.gateway.methods import MethodInfo
+
+
+DEFAULT_KEY_FIELDS = ("session_id", "user_id")
+
+
+class SessionAffinity:
+    """Affinity key extraction for the services routed by consistent hashing."""
+
+    def __init__(self, services: Dict[str, Optional[Sequence[str]]], load_factor: float = 1.25):
+        """
+        Args:
+            services: Request fields to take the key from, per service name
+                (None = DEFAULT_KEY_FIELDS)
+            load_factor: Largest in-flight load allowed on a replica relative
+                to the average before keys spill to the next replica (passed
+                to the registry's ConsistentHashBalancer)
+        """
+        self.services = {
+            name: tuple(fields) if fields else DEFAULT_KEY_FIELDS
+            for name, fields in services.items()
+        }
+        self.load_factor = load_factor
+        # Service name -> ((field, metadata key), ...)
+        self._keys = {
+            name: tuple((field, "x-" + field.replace("_", "-")) for field in fields)
+            for name, fields in self.services.items()
+        }
+
+        # Counters for gateway stats (service -> calls)
+        self._lock = threading.Lock()
+        self._keyed: Dict[str, int] = {}
+        self._unkeyed: Dict[str, int] = {}
+
+    @classmethod
+    def from_json(cls, config_json: str) -> "SessionAffinity":
+        """
+        Build affinity settings from a JSON config string:
+        {"services": {"sessions": null, "models": ["session_id"]}, "load_factor": 1.25}
+        """
+        config = json.loads(config_json)
+        return cls(services=config.get("services", {}), load_factor=config.get("load_factor", 1.25))
+
+    def key_for(self, method: MethodInfo, request, context) -> Optional[str]:
+        """Affinity key of a call, or None if its service is not hashed or it carries no key."""
+        keys = self._keys.get(method.service_name)
+        if keys is None:
+            return None
+        key = self._find_key(keys, method, request, context)
+        counters = self._keyed if key is not None else self._unkeyed
+        with self._lock:
+            counters[method.service_name] = counters.get(method.service_name, 0) + 1
+        return key
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Calls routed by key and calls without a key, per service."""
+        with self._lock:
+            return {"keyed": dict(self._keyed), "unkeyed": dict(self._unkeyed)}
+
+    def _find_key(self, keys, method: MethodInfo, request, context) -> Optional[str]:
+        metadata = dict(context.invocation_metadata())
+        for _, metadata_key in keys:
+            value = metadata.get(metadata_key)
+            if value:
+                return value
+
+        if isinstance(request, bytes):
+            try:
+                request = method.request_class.FromString(request)
+            except DecodeError:
+                return None
+        for field, _ in keys:
+            value = getattr(request, field, None)
+            if value:
+                return str(value)
+        return None
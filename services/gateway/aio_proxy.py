@@ -0,0 +1,333 @@
+"""
+Async gRPC Proxy - grpc.aio implementation of the gateway proxy path.
+
+The threaded gateway server holds one worker thread per in-flight call, so
+long ChatStream generations starve every other RPC once the pool is busy.
+Here every proxied call is a coroutine on a single event loop: unary calls
+await the backend, streaming calls relay chunks from an async iterator.
+Thousands of concurrent token streams can share one process.
+
+Routing matches the byte passthrough mode: the method path plus the
+x-target-service metadata pick the backend, and request/response bytes are
+forwarded unchanged.
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Optional
+
+import grpc
+
+from services.gateway.admission import AdmissionController, AdmissionRejected, reject_call
+from services.gateway.affinity import SessionAffinity
+from services.gateway.channel_pool import ChannelPool
+from services.gateway.circuit_breaker import CircuitOpenError
+from services.gateway.grpc_proxy import GenericProxy
+from services.gateway.methods import MethodInfo
+from services.gateway.metrics import GatewayMetrics
+from services.gateway.mirroring import TrafficMirror
+from services.gateway.passthrough import PassthroughHandler, check_target
+from services.gateway.registry import ServiceRegistry
+from services.gateway.response_cache import ResponseCache
+from services.gateway.retries import RetryPolicy
+from services.gateway.singleflight import SingleFlight
+from services.gateway.stream_buffer import StreamBuffers, StreamOverflowError
+from services.shared.compression import CompressionPolicy
+
+
+class AioGenericProxy(GenericProxy):
+    """
+    Proxy that forwards calls to platform services as coroutines.
+
+    Shares routing, replica accounting and stats with GenericProxy, but
+    pools grpc.aio channels and awaits backend calls.
+    """
+
+    def __init__(
+        self,
+        registry: ServiceRegistry,
+        channel_pool: Optional[ChannelPool] = None,
+        response_cache: Optional[ResponseCache] = None,
+        admission: Optional[AdmissionController] = None,
+        metrics: Optional[GatewayMetrics] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        default_timeout: Optional[float] = None,
+        singleflight: Optional[SingleFlight] = None,
+        compression: Optional[CompressionPolicy] = None,
+        stream_buffers: Optional[StreamBuffers] = None,
+        mirror: Optional[TrafficMirror] = None,
+        affinity: Optional[SessionAffinity] = None,
+    ):
+        super().__init__(
+            registry,
+            channel_pool=channel_pool or ChannelPool(channel_factory=grpc.aio.insecure_channel),
+            response_cache=response_cache,
+            admission=admission,
+            metrics=metrics,
+            retry_policy=retry_policy,
+            default_timeout=default_timeout,
+            singleflight=singleflight,
+            compression=compression,
+            stream_buffers=stream_buffers,
+            mirror=mirror,
+            affinity=affinity,
+        )
+
+    async def forward_unary(self, method: MethodInfo, request: bytes, context) -> bytes:
+        """Forward a unary call and await the backend response."""
+        started_at = time.perf_counter()
+        metrics = self.metrics
+        service_name, method_name = method.service_name, method.method_name
+        if self._deadline_passed(context):
+            metrics.shed("grpc", service_name, method_name, "expired")
+            return b""
+
+        cache_key, generation = None, 0
+        if self.response_cache is not None:
+            cache_key = self.response_cache.make_key(service_name, method_name, request)
+            if cache_key is not None:
+                cached, generation = self.response_cache.lookup(cache_key)
+                if cached is not None:
+                    metrics.observe("grpc", service_name, method_name, "OK", time.perf_counter() - started_at)
+                    self._compress_response(context, method_name, cached)
+                    return cached
+
+        ticket = None
+        if self.admission is not None:
+            try:
+                ticket = self.admission.admit(
+                    method.service_name, method.method_name, self._extract_tenant(context)
+                )
+            except AdmissionRejected as e:
+                reject_call(context, e)
+                metrics.observe(
+                    "grpc", service_name, method_name, "RESOURCE_EXHAUSTED", time.perf_counter() - started_at
+                )
+                return b""
+
+        metrics.call_started("grpc", service_name, method_name)
+        metrics.add_bytes("grpc", service_name, "sent", len(request))
+        mirrored = self.mirror.submit(method, request) if self.mirror is not None else None
+        affinity_key = self.affinity.key_for(method, request, context) if self.affinity is not None else None
+        status = "OK"
+        try:
+            if self.singleflight is not None and self.singleflight.is_coalesced(service_name, method_name):
+                # Identical reads already in flight share one backend call
+                response = await self.singleflight.do_async(
+                    (service_name, method_name, request),
+                    lambda: self._call_unary(method, request, context, affinity_key, shared=True),
+                )
+            else:
+                response = await self._call_unary(method, request, context, affinity_key)
+
+            metrics.add_bytes("grpc", service_name, "received", len(response))
+            if self.response_cache is not None:
+                if cache_key is not None:
+                    self.response_cache.put(cache_key, response, generation)
+                self.response_cache.invalidate_after(service_name, method_name)
+            self._compress_response(context, method_name, response)
+            return response
+
+        except grpc.RpcError as e:
+            status = e.code().name
+            context.set_code(e.code())
+            context.set_details(e.details())
+            return b""
+        except asyncio.CancelledError:
+            status = "CANCELLED"
+            raise
+        except CircuitOpenError as e:
+            status = "UNAVAILABLE"
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details(str(e))
+            return b""
+        except Exception as e:
+            status = "INTERNAL"
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return b""
+        finally:
+            if ticket is not None:
+                ticket.release()
+            duration = time.perf_counter() - started_at
+            metrics.call_finished("grpc", service_name, method_name, status, duration)
+            if mirrored is not None:
+                mirrored.primary_finished(status, duration)
+
+    async def _call_unary(
+        self,
+        method: MethodInfo,
+        request: bytes,
+        context,
+        affinity_key: Optional[str] = None,
+        shared: bool = False,
+    ) -> bytes:
+        """Await a unary backend call within the client's deadline, retrying idempotent reads."""
+        service_name, method_name = method.service_name, method.method_name
+        retry_policy = self._retry_policy_for(service_name, method_name)
+        attempt = 0
+        while True:
+            attempt += 1
+            backend_addr = self.registry.get_platform_service_address(service_name, affinity_key)
+            await self.channel_pool.prepare(backend_addr)
+            pooled = self.channel_pool.acquire(backend_addr)
+            self.registry.request_started(backend_addr)
+
+            attempt_started = time.perf_counter()
+            try:
+                response = await pooled.raw_method(method.path)(
+                    request,
+                    timeout=(
+                        self._shared_timeout(context) if shared
+                        else self._backend_timeout(service_name, method_name, context)
+                    ),
+                    compression=self._request_compression(method_name, request),
+                )
+            except grpc.RpcError as e:
+                self._finish_call(pooled, e)
+                backoff = None
+                if retry_policy is not None:
+                    backoff = retry_policy.next_backoff(attempt, e, self._time_remaining(context))
+                if backoff is None:
+                    raise
+                await asyncio.sleep(backoff)
+                continue
+            except BaseException:
+                # Includes cancellation while awaiting the backend
+                self._finish_call(pooled)
+                raise
+
+            self._finish_call(pooled, duration=time.perf_counter() - attempt_started)
+            return response
+
+    async def forward_stream(self, method: MethodInfo, request: bytes, context) -> AsyncIterator[bytes]:
+        """Forward a server-streaming call, relaying chunks as they arrive."""
+        started_at = time.perf_counter()
+        metrics = self.metrics
+        service_name, method_name = method.service_name, method.method_name
+        if self._deadline_passed(context):
+            metrics.shed("grpc", service_name, method_name, "expired")
+            return
+
+        ticket = None
+        if self.admission is not None:
+            try:
+                ticket = self.admission.admit(
+                    method.service_name, method.method_name, self._extract_tenant(context)
+                )
+            except AdmissionRejected as e:
+                reject_call(context, e)
+                metrics.observe(
+                    "grpc", service_name, method_name, "RESOURCE_EXHAUSTED", time.perf_counter() - started_at
+                )
+                return
+
+        metrics.call_started("grpc", service_name, method_name)
+        metrics.add_bytes("grpc", service_name, "sent", len(request))
+        mirrored = self.mirror.submit(method, request) if self.mirror is not None else None
+        affinity_key = self.affinity.key_for(method, request, context) if self.affinity is not None else None
+        pooled = None
+        call = None
+        chunks = None
+        error = None
+        status = "OK"
+        received = 0
+        try:
+            backend_addr = self.registry.get_platform_service_address(method.service_name, affinity_key)
+            await self.channel_pool.prepare(backend_addr)
+            pooled = self.channel_pool.acquire(backend_addr)
+            self.registry.request_started(backend_addr)
+
+            call = pooled.raw_method(method.path, server_streaming=True)(
+                request,
+                timeout=self._backend_timeout(service_name, method_name, context),
+                compression=self._request_compression(method_name, request),
+            )
+            before_send = None
+            if self.compression is not None:
+                before_send = self.compression.stream_filter(context, method_name)
+                if before_send is None:
+                    # The server compresses by default (see _compress_response)
+                    before_send = lambda chunk: context.disable_next_message_compression()
+            chunks = call
+            if self.stream_buffers is not None:
+                # Read ahead of the client, up to the per-stream bound
+                chunks = self.stream_buffers.wrap_async(call, call.cancel)
+            first_message = True
+            async for chunk in chunks:
+                if first_message:
+                    first_message = False
+                    metrics.first_message("grpc", service_name, method_name, time.perf_counter() - started_at)
+                received += len(chunk)
+                if before_send is not None:
+                    before_send(chunk)
+                yield chunk
+
+        except grpc.RpcError as e:
+            error = e
+            status = e.code().name
+            context.set_code(e.code())
+            context.set_details(e.details())
+        except StreamOverflowError as e:
+            # Client fell too far behind (cancel overflow policy)
+            status = "RESOURCE_EXHAUSTED"
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details(str(e))
+        except (GeneratorExit, asyncio.CancelledError):
+            status = "CANCELLED"
+            raise
+        except CircuitOpenError as e:
+            status = "UNAVAILABLE"
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details(str(e))
+        except Exception as e:
+            status = "INTERNAL"
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+        finally:
+            # No-op if the stream completed; stops the backend call if the
+            # client went away mid-stream (the generator is cancelled)
+            if chunks is not None and chunks is not call:
+                chunks.close()
+            if call is not None:
+                call.cancel()
+            if pooled is not None:
+                self._finish_call(pooled, error)
+            if ticket is not None:
+                ticket.release()
+            metrics.add_bytes("grpc", service_name, "received", received)
+            duration = time.perf_counter() - started_at
+            metrics.call_finished("grpc", service_name, method_name, status, duration, streaming=True)
+            if mirrored is not None:
+                mirrored.primary_finished(status, duration)
+
+
+    def _compress_response(self, context, method_name: str, response: bytes):
+        """
+        Send small (or uncompressed-method) unary responses uncompressed.
+
+        grpc.aio ignores set_compression() for unary responses, so the
+        server compresses everything with the policy's server_algorithm
+        and compression is switched off per response instead.
+        """
+        if self.compression is not None and self.compression.for_message(method_name, response) is None:
+            context.disable_next_message_compression()
+
+
+class AioPassthroughHandler(PassthroughHandler):
+    """Generic RPC handler whose behaviors are coroutines (for grpc.aio servers)."""
+
+    def _unary_behavior(self, method: MethodInfo):
+        async def behavior(request: bytes, context):
+            if not check_target(method, self.proxy._extract_target_service(context), context):
+                return b""
+            return await self.proxy.forward_unary(method, request, context)
+        return behavior
+
+    def _stream_behavior(self, method: MethodInfo):
+        async def behavior(request: bytes, context):
+            if not check_target(method, self.proxy._extract_target_service(context), context):
+                return
+            async for chunk in self.proxy.forward_stream(method, request, context):
+                yield chunk
+        return behavior
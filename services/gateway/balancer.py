@@ -0,0 +1,211 @@
+"""
+Load Balancing - Replica selection policies for the service registry.
+
+Policies pick one replica out of the healthy replicas registered for a
+platform service or workflow:
+- round_robin: Cycle through replicas in order
+- least_outstanding: Replica with the fewest in-flight requests
+- power_of_two: Sample two replicas, take the one with fewer in-flight requests
+
+In-flight counts come from the gateway itself (every proxied call is
+started and finished through the registry). Replicas that keep failing
+are ejected for a while and come back automatically afterwards, and
+replicas whose circuit breaker is open are skipped.
+
+Calls carrying an affinity key (session or user, see affinity.py) bypass
+the policy and go through ConsistentHashBalancer instead.
+"""
+
+import bisect
+import hashlib
+import itertools
+import math
+import random
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from services.gateway.circuit_breaker import CircuitBreaker
+
+
+class Replica:
+    """One backend address plus the gateway's view of its load and health."""
+
+    __slots__ = (
+        "address",
+        "in_flight",
+        "consecutive_failures",
+        "ejections",
+        "ejected_until",
+        "breaker",
+    )
+
+    def __init__(self, address: str, breaker: Optional[CircuitBreaker] = None):
+        self.address = address
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        # Number of back-to-back ejections, used to back off re-admission
+        self.ejections = 0
+        self.ejected_until = 0.0
+        # Error-rate / latency breaker (None disables it)
+        self.breaker = breaker
+
+    def is_available(self, now: float) -> bool:
+        """Whether the replica is currently in rotation."""
+        return self.ejected_until <= now and (self.breaker is None or self.breaker.allows(now))
+
+
+class LoadBalancer(ABC):
+    """Base class for replica selection policies."""
+
+    @abstractmethod
+    def pick(self, pool_name: str, replicas: Sequence[Replica]) -> Replica:
+        """
+        Pick a replica.
+
+        Args:
+            pool_name: Service name or workflow path the replicas belong to
+            replicas: Non-empty list of candidate replicas
+        """
+        raise NotImplementedError
+
+
+class RoundRobinBalancer(LoadBalancer):
+    """Cycle through replicas, one counter per service/workflow."""
+
+    def __init__(self):
+        self._counters: Dict[str, itertools.count] = {}
+
+    def pick(self, pool_name: str, replicas: Sequence[Replica]) -> Replica:
+        counter = self._counters.get(pool_name)
+        if counter is None:
+            counter = self._counters.setdefault(pool_name, itertools.count())
+        return replicas[next(counter) % len(replicas)]
+
+
+class LeastOutstandingBalancer(LoadBalancer):
+    """Pick the replica with the fewest in-flight requests (random tie-break)."""
+
+    def pick(self, pool_name: str, replicas: Sequence[Replica]) -> Replica:
+        lowest = min(replica.in_flight for replica in replicas)
+        candidates = [replica for replica in replicas if replica.in_flight == lowest]
+        return candidates[0] if len(candidates) == 1 else random.choice(candidates)
+
+
+class PowerOfTwoBalancer(LoadBalancer):
+    """Sample two replicas at random and pick the less loaded one."""
+
+    def pick(self, pool_name: str, replicas: Sequence[Replica]) -> Replica:
+        if len(replicas) == 1:
+            return replicas[0]
+        first, second = random.sample(replicas, 2)
+        return first if first.in_flight <= second.in_flight else second
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ConsistentHashBalancer:
+    """
+    Consistent hashing with bounded loads.
+
+    Every replica owns many points on a hash ring and a key goes to the
+    first replica clockwise from its hash, so the same key keeps reaching
+    the same replica and a replica joining or leaving only moves the keys
+    next to its points. A replica is skipped while its in-flight calls
+    exceed load_factor times the average (rounded up, counting the new
+    call); the key then spills to the next replica on the ring, so a hot
+    key cannot overload its home replica.
+    """
+
+    def __init__(self, load_factor: float = 1.25, virtual_nodes: int = 100):
+        """
+        Args:
+            load_factor: Largest in-flight load allowed on a replica,
+                relative to the average (> 1; lower spreads hot keys sooner)
+            virtual_nodes: Ring points per replica (more = more even key spread)
+        """
+        if load_factor <= 1:
+            raise ValueError("load_factor must be greater than 1")
+        self.load_factor = load_factor
+        self.virtual_nodes = virtual_nodes
+
+        # pool_name -> (addresses, sorted ring points, owner address per point)
+        self._rings: Dict[str, Tuple[Tuple[str, ...], List[int], List[str]]] = {}
+        self._lock = threading.Lock()
+
+        # Counters for gateway stats
+        self._picks = 0
+        self._spilled = 0
+
+    def pick(self, pool_name: str, replicas: Sequence[Replica], key: str) -> Replica:
+        """
+        Pick the replica for a key.
+
+        Args:
+            pool_name: Service name the replicas belong to
+            replicas: Non-empty list of available replicas
+            key: Affinity key (session or user id)
+        """
+        addresses = tuple(sorted(replica.address for replica in replicas))
+        ring = self._rings.get(pool_name)
+        if ring is None or ring[0] != addresses:
+            # Replica set changed (registration, ejection, open circuit)
+            ring = self._rings[pool_name] = self._build_ring(addresses)
+        _, points, owners = ring
+
+        by_address = {replica.address: replica for replica in replicas}
+        total = sum(replica.in_flight for replica in replicas)
+        capacity = math.ceil(self.load_factor * (total + 1) / len(replicas))
+
+        index = bisect.bisect(points, _hash(key))
+        skipped = set()
+        for offset in range(len(points)):
+            address = owners[(index + offset) % len(points)]
+            if address in skipped:
+                continue
+            replica = by_address[address]
+            if replica.in_flight < capacity:
+                with self._lock:
+                    self._picks += 1
+                    if skipped:
+                        self._spilled += 1
+                return replica
+            skipped.add(address)
+            if len(skipped) == len(replicas):
+                break
+        # Unreachable while capacity exceeds the average load
+        return min(replicas, key=lambda replica: replica.in_flight)
+
+    def stats(self) -> Dict[str, float]:
+        """Keyed picks, and picks that spilled past an overloaded home replica."""
+        with self._lock:
+            return {"picks": self._picks, "spilled": self._spilled}
+
+    def _build_ring(self, addresses: Tuple[str, ...]) -> Tuple[Tuple[str, ...], List[int], List[str]]:
+        ring = sorted(
+            (_hash(f"{address}#{i}"), address)
+            for address in addresses
+            for i in range(self.virtual_nodes)
+        )
+        return addresses, [point for point, _ in ring], [address for _, address in ring]
+
+
+BALANCING_POLICIES = {
+    "round_robin": RoundRobinBalancer,
+    "least_outstanding": LeastOutstandingBalancer,
+    "power_of_two": PowerOfTwoBalancer,
+}
+
+
+def create_balancer(policy: str) -> LoadBalancer:
+    """Create a load balancer by policy name."""
+    balancer_class = BALANCING_POLICIES.get(policy)
+    if balancer_class is None:
+        raise ValueError(
+            f"Unknown load balancing policy '{policy}'. "
+            f"Choose one of: {', '.join(BALANCING_POLICIES)}"
+        )
+    return balancer_class()
+
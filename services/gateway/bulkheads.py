@@ -0,0 +1,361 @@
+"""
+Bulkheads - Isolated concurrency pools per traffic class.
+
+The threaded gateway serves every call on one worker pool, so a burst of
+long-lived ChatStream calls can occupy every worker while quick GetMemory
+lookups queue behind them. Calls are split into traffic classes, each with
+its own limits:
+- streaming_inference: server-streaming calls (ChatStream)
+- unary_inference: unary model calls that are not plain reads (Chat)
+- metadata: session/memory storage and model metadata reads
+
+Each class runs at most max_concurrency calls; up to max_queue more wait
+for a slot in arrival order (until the client's deadline), and further
+calls are rejected at once with RESOURCE_EXHAUSTED. The server's worker
+pool is sized for every class's running and queued calls, so a surge in
+one class cannot take workers from another.
+
+Queued calls are shed rather than forwarded once waiting is pointless:
+- A call whose deadline has passed is failed with DEADLINE_EXCEEDED when
+  it reaches the front of the queue (or arrives already expired)
+- Calls without a deadline get a CoDel-style adaptive queue timeout. While
+  the queue drains regularly they may wait up to codel_interval; once it
+  has stayed non-empty for a whole interval (a standing queue, i.e.
+  overload) any call queued longer than codel_target is dropped with
+  RESOURCE_EXHAUSTED, keeping queueing delay near the target
+"""
+
+import collections
+import json
+import threading
+import time
+from typing import Dict, Optional
+
+import grpc
+
+from services.gateway.grpc_proxy import NO_DEADLINE_THRESHOLD
+from services.gateway.methods import METHODS_BY_PATH, MethodInfo
+from services.gateway.metrics import GatewayMetrics
+
+
+STREAMING_INFERENCE = "streaming_inference"
+UNARY_INFERENCE = "unary_inference"
+METADATA = "metadata"
+
+# Workers for calls outside every class (replica Register/Heartbeat)
+UNCLASSIFIED_WORKERS = 4
+
+
+class BulkheadFull(Exception):
+    """Raised when a traffic class has no free slot and its queue is full."""
+
+
+class BulkheadTimeout(Exception):
+    """Raised when a call's deadline passes before it gets a slot."""
+
+
+class BulkheadShed(Exception):
+    """Raised when a call without a deadline is dropped by the adaptive queue timeout."""
+
+
+# Waiter outcomes
+_GRANTED = "granted"
+_EXPIRED = "expired"
+_SHED = "shed"
+
+# Adaptive queue timeout (CoDel) defaults, in seconds
+DEFAULT_CODEL_TARGET = 0.1
+DEFAULT_CODEL_INTERVAL = 1.0
+
+
+class _Waiter:
+    __slots__ = ("event", "outcome", "enqueued_at", "deadline")
+
+    def __init__(self, enqueued_at: float, deadline: Optional[float]):
+        self.event = threading.Event()
+        self.outcome = None
+        self.enqueued_at = enqueued_at
+        self.deadline = deadline
+
+
+class Bulkhead:
+    """Concurrency limit with a bounded FIFO queue for one traffic class."""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        codel_target: float = DEFAULT_CODEL_TARGET,
+        codel_interval: float = DEFAULT_CODEL_INTERVAL,
+    ):
+        """
+        Args:
+            name: Traffic class name (used in errors and stats)
+            max_concurrency: Calls of this class running at once
+            max_queue: Calls allowed to wait for a slot; more are rejected
+            codel_target: Queueing delay allowed for calls without a
+                deadline while the queue is overloaded
+            codel_interval: Queueing delay allowed for calls without a
+                deadline otherwise, and how long the queue must stay
+                non-empty to count as overloaded
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.codel_target = codel_target
+        self.codel_interval = codel_interval
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = collections.deque()
+        # Last time the queue was seen empty (CoDel overload detection)
+        self._last_empty = time.monotonic()
+
+        # Counters for gateway stats
+        self._admitted = 0
+        self._queued = 0
+        self._rejected = 0
+        self._expired = 0
+        self._shed = 0
+
+    @classmethod
+    def from_dict(cls, name: str, config: Dict) -> "Bulkhead":
+        return cls(
+            name,
+            max_concurrency=config["max_concurrency"],
+            max_queue=config.get("max_queue", 0),
+            codel_target=config.get("codel_target", DEFAULT_CODEL_TARGET),
+            codel_interval=config.get("codel_interval", DEFAULT_CODEL_INTERVAL),
+        )
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Take a slot, waiting in the queue if needed.
+
+        Args:
+            timeout: Seconds left before the call's deadline (None if it has
+                none; the adaptive queue timeout applies instead)
+
+        Raises BulkheadFull if the queue is full, BulkheadTimeout if the
+        deadline passes first and BulkheadShed if the adaptive queue timeout
+        drops the call. Every successful acquire() must be paired with
+        release().
+        """
+        now = time.monotonic()
+        with self._lock:
+            if timeout is not None and timeout <= 0:
+                # Expired while waiting for a worker: not worth a slot
+                self._expired += 1
+                raise BulkheadTimeout(f"Deadline passed before the call reached traffic class '{self.name}'")
+            if not self._waiters:
+                self._last_empty = now
+                if self._active < self.max_concurrency:
+                    self._active += 1
+                    self._admitted += 1
+                    return
+            if len(self._waiters) >= self.max_queue:
+                self._rejected += 1
+                raise BulkheadFull(
+                    f"Traffic class '{self.name}' is full "
+                    f"({self.max_concurrency} running, {self.max_queue} queued)"
+                )
+            waiter = _Waiter(now, now + timeout if timeout is not None else None)
+            self._waiters.append(waiter)
+            self._queued += 1
+
+        waiter.event.wait(timeout if timeout is not None else self.codel_interval)
+        with self._lock:
+            if waiter.outcome is None:
+                # Waited out its deadline or the longest queue timeout
+                self._waiters.remove(waiter)
+                if not self._waiters:
+                    self._last_empty = time.monotonic()
+                if waiter.deadline is not None:
+                    self._expired += 1
+                    waiter.outcome = _EXPIRED
+                else:
+                    self._shed += 1
+                    waiter.outcome = _SHED
+            if waiter.outcome == _GRANTED:
+                self._admitted += 1
+                return
+        if waiter.outcome == _EXPIRED:
+            raise BulkheadTimeout(f"Deadline passed while queued for traffic class '{self.name}'")
+        raise BulkheadShed(f"Traffic class '{self.name}' is overloaded; call dropped from the queue")
+
+    def release(self):
+        """Free a slot, handing it to the first queued call still worth running."""
+        now = time.monotonic()
+        with self._lock:
+            overloaded = self._waiters and now - self._last_empty >= self.codel_interval
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.deadline is not None and now >= waiter.deadline:
+                    # Nobody will read the answer: drop instead of forwarding
+                    waiter.outcome = _EXPIRED
+                    self._expired += 1
+                elif waiter.deadline is None and overloaded and now - waiter.enqueued_at > self.codel_target:
+                    waiter.outcome = _SHED
+                    self._shed += 1
+                else:
+                    waiter.outcome = _GRANTED
+                waiter.event.set()
+                if waiter.outcome == _GRANTED:
+                    if not self._waiters:
+                        self._last_empty = now
+                    return
+            self._last_empty = now
+            self._active -= 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "active": self._active,
+                "waiting": len(self._waiters),
+                "admitted": self._admitted,
+                "queued": self._queued,
+                "rejected": self._rejected,
+                "expired": self._expired,
+                "shed": self._shed,
+            }
+
+
+# Default limits per class: streams are long but mostly idle, metadata reads are quick
+DEFAULT_LIMITS = {
+    STREAMING_INFERENCE: {"max_concurrency": 64, "max_queue": 16},
+    UNARY_INFERENCE: {"max_concurrency": 32, "max_queue": 32},
+    METADATA: {"max_concurrency": 16, "max_queue": 64},
+}
+
+
+def classify(method: MethodInfo) -> str:
+    """Default traffic class of a platform service method."""
+    if method.server_streaming:
+        return STREAMING_INFERENCE
+    if method.service_name == "models" and not method.read_only:
+        return UNARY_INFERENCE
+    return METADATA
+
+
+class Bulkheads:
+    """The gateway's traffic classes and the methods assigned to them."""
+
+    def __init__(
+        self,
+        classes: Optional[Dict[str, Bulkhead]] = None,
+        methods: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            classes: Bulkhead per traffic class (defaults to DEFAULT_LIMITS)
+            methods: Class overrides keyed by service or service.method
+                ("models.Embed": "unary_inference")
+        """
+        if classes is None:
+            classes = {name: Bulkhead.from_dict(name, c) for name, c in DEFAULT_LIMITS.items()}
+        self.classes = classes
+
+        # Method path -> bulkhead, resolved once
+        methods = methods or {}
+        self._by_path: Dict[str, Bulkhead] = {}
+        for path, method in METHODS_BY_PATH.items():
+            class_name = methods.get(
+                f"{method.service_name}.{method.method_name}",
+                methods.get(method.service_name, classify(method)),
+            )
+            bulkhead = classes.get(class_name)
+            if bulkhead is not None:
+                self._by_path[path] = bulkhead
+
+    @classmethod
+    def from_json(cls, config_json: str) -> "Bulkheads":
+        """Build bulkheads from a JSON config string (classes not listed keep their defaults)."""
+        config = json.loads(config_json)
+        limits = {name: dict(c) for name, c in DEFAULT_LIMITS.items()}
+        for name, c in config.get("classes", {}).items():
+            limits.setdefault(name, {}).update(c)
+        return cls(
+            classes={name: Bulkhead.from_dict(name, c) for name, c in limits.items()},
+            methods=config.get("methods"),
+        )
+
+    def for_path(self, path: str) -> Optional[Bulkhead]:
+        """Bulkhead for a gRPC method path (None = not limited)."""
+        return self._by_path.get(path)
+
+    @property
+    def max_workers(self) -> int:
+        """Server worker threads needed to run and queue every class at its limits."""
+        return UNCLASSIFIED_WORKERS + sum(
+            bulkhead.max_concurrency + bulkhead.max_queue for bulkhead in self.classes.values()
+        )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: bulkhead.stats() for name, bulkhead in self.classes.items()}
+
+
+class BulkheadInterceptor(grpc.ServerInterceptor):
+    """Runs each call within its traffic class's bulkhead (threaded gRPC server)."""
+
+    def __init__(self, bulkheads: Bulkheads, metrics: Optional[GatewayMetrics] = None):
+        self.bulkheads = bulkheads
+        # Calls dropped from the queues are counted in gateway_shed_requests_total
+        self.metrics = metrics or GatewayMetrics()
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        bulkhead = self.bulkheads.for_path(handler_call_details.method)
+        if handler is None or bulkhead is None:
+            return handler
+        method = METHODS_BY_PATH[handler_call_details.method]
+        metrics = self.metrics
+
+        if handler.unary_unary:
+            behavior = handler.unary_unary
+
+            def unary_unary(request, context):
+                if not _enter(bulkhead, context, method, metrics):
+                    return None
+                try:
+                    return behavior(request, context)
+                finally:
+                    bulkhead.release()
+
+            return handler._replace(unary_unary=unary_unary)
+
+        if handler.unary_stream:
+            behavior = handler.unary_stream
+
+            def unary_stream(request, context):
+                if not _enter(bulkhead, context, method, metrics):
+                    return iter(())
+                # The slot is held until the whole stream has been sent
+                if not context.add_callback(bulkhead.release):
+                    bulkhead.release()
+                return behavior(request, context)
+
+            return handler._replace(unary_stream=unary_stream)
+
+        # Platform services have no client-streaming methods
+        return handler
+
+
+def _enter(bulkhead: Bulkhead, context, method: MethodInfo, metrics: GatewayMetrics) -> bool:
+    """Acquire a slot for the call, or fail it; True if it may proceed."""
+    remaining = context.time_remaining()
+    if remaining is not None and remaining > NO_DEADLINE_THRESHOLD:
+        remaining = None
+    try:
+        bulkhead.acquire(timeout=remaining)
+        return True
+    except BulkheadFull as e:
+        code, reason, details = grpc.StatusCode.RESOURCE_EXHAUSTED, "queue_full", str(e)
+    except BulkheadTimeout as e:
+        code, reason, details = grpc.StatusCode.DEADLINE_EXCEEDED, "expired", str(e)
+    except BulkheadShed as e:
+        code, reason, details = grpc.StatusCode.RESOURCE_EXHAUSTED, "queue_timeout", str(e)
+    context.set_code(code)
+    context.set_details(details)
+    metrics.shed("grpc", method.service_name, method.method_name, reason)
+    return False
@@ -0,0 +1,277 @@
+"""
+Channel Pool - Persistent gRPC channels to backend services.
+
+Opening a channel per proxied call costs a TCP and HTTP/2 handshake on every
+RPC. The pool keeps warm channels per backend address and hands them out to
+unary and streaming calls alike:
+- Keepalive pings so idle connections stay usable
+- A cap on concurrent streams per channel (extra channels are opened on demand)
+- Idle eviction of channels nobody has used for a while
+- Replacement of channels whose backend became unavailable
+
+Channels to a backend on the same host go over its Unix domain socket when
+it listens on one (see services/shared/transport.py). Resolving an address
+probes the socket, so it is done outside the pool lock (off the event loop
+for the asyncio gateway, see prepare()) and cached per address until a
+channel to it breaks or all of its channels go idle; the replacement
+channel then falls back to TCP once the socket is gone.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import grpc
+
+from services.shared.compression import message_size_options
+from services.shared.transport import preferred_address
+
+
+# Keepalive settings for gateway -> backend connections.
+# use_local_subchannel_pool gives every pooled channel its own connection,
+# otherwise gRPC would share one subchannel between all channels to an address.
+DEFAULT_CHANNEL_OPTIONS: Tuple[Tuple[str, int], ...] = (
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.use_local_subchannel_pool", 1),
+)
+
+
+class PooledChannel:
+    """
+    A channel owned by the pool, plus the stubs created on top of it.
+
+    Stubs (and raw byte multi-callables) are cached so they are only
+    constructed once per channel.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        options: Sequence[Tuple[str, int]],
+        channel_factory: Callable = grpc.insecure_channel,
+        target: Optional[str] = None,
+    ):
+        # Registry address (identifies the replica) and the address dialed
+        self.address = address
+        self.target = target or address
+        self.channel = channel_factory(self.target, options=list(options))
+        self.active_streams = 0
+        self.last_used = time.monotonic()
+        self.broken = False
+        self._stubs: Dict[str, object] = {}
+        self._raw_methods: Dict[str, object] = {}
+
+    def stub(self, service_name: str, stub_factory: Callable):
+        """Get (or create) the stub for a service on this channel."""
+        stub = self._stubs.get(service_name)
+        if stub is None:
+            stub = stub_factory(self.channel)
+            self._stubs[service_name] = stub
+        return stub
+
+    def raw_method(self, path: str, server_streaming: bool = False):
+        """
+        Get (or create) a multi-callable that sends and receives raw bytes.
+
+        Used by byte passthrough mode, where messages are never parsed.
+        """
+        method = self._raw_methods.get(path)
+        if method is None:
+            if server_streaming:
+                method = self.channel.unary_stream(path)
+            else:
+                method = self.channel.unary_unary(path)
+            self._raw_methods[path] = method
+        return method
+
+    def close(self):
+        """Close the underlying channel."""
+        result = self.channel.close()
+        # grpc.aio channels close asynchronously
+        if inspect.isawaitable(result):
+            asyncio.ensure_future(result)
+
+
+class ChannelPool:
+    """
+    Pool of gRPC channels keyed by backend address.
+
+    acquire() returns the least-loaded healthy channel for an address and
+    counts the call as an active stream on it. Every acquire() must be
+    paired with release() once the call (or the whole response stream)
+    has finished.
+    """
+
+    def __init__(
+        self,
+        max_streams_per_channel: int = 100,
+        idle_timeout: float = 300.0,
+        options: Optional[Sequence[Tuple[str, int]]] = None,
+        channel_factory: Callable = grpc.insecure_channel,
+        resolve: Callable[[str], str] = preferred_address,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            max_streams_per_channel: Concurrent calls allowed on one channel
+                before another channel to the same address is opened
+            idle_timeout: Seconds a channel may sit unused before it is closed
+            options: gRPC channel options (defaults to keepalive settings
+                plus the configured message size limits)
+            channel_factory: Creates channels (grpc.aio.insecure_channel for
+                the asyncio gateway; the pool is then used from the event loop)
+            resolve: Maps a backend address to the address to dial (default:
+                the backend's Unix socket when it is local and listening)
+        """
+        self.max_streams_per_channel = max_streams_per_channel
+        self.idle_timeout = idle_timeout
+        if options is None:
+            options = DEFAULT_CHANNEL_OPTIONS + tuple(message_size_options())
+        self.options = tuple(options)
+        self.channel_factory = channel_factory
+        self.resolve = resolve
+
+        self._lock = threading.Lock()
+        self._channels: Dict[str, List[PooledChannel]] = {}
+        # Backend address -> address dialed (cached result of resolve)
+        self._targets: Dict[str, str] = {}
+        self._last_sweep = time.monotonic()
+
+        # Counters for gateway stats
+        self._acquired = 0
+        self._reused = 0
+        self._created = 0
+        self._evicted = 0
+        self._reconnects = 0
+
+    async def prepare(self, address: str) -> None:
+        """Resolve an address on a worker thread, so acquire() never probes on the event loop."""
+        if address not in self._targets:
+            target = await asyncio.get_running_loop().run_in_executor(None, self.resolve, address)
+            with self._lock:
+                self._targets.setdefault(address, target)
+
+    def acquire(self, address: str) -> PooledChannel:
+        """Get a warm channel to an address, opening one if needed."""
+        target = self._targets.get(address)
+        if target is None:
+            # May probe a Unix socket: keep it out of the lock
+            target = self.resolve(address)
+        now = time.monotonic()
+        with self._lock:
+            target = self._targets.setdefault(address, target)
+            if now - self._last_sweep >= self.idle_timeout / 2:
+                self._evict_idle_locked(now)
+
+            channels = self._channels.setdefault(address, [])
+            chosen = None
+            for pooled in channels:
+                if pooled.broken or pooled.active_streams >= self.max_streams_per_channel:
+                    continue
+                if chosen is None or pooled.active_streams < chosen.active_streams:
+                    chosen = pooled
+
+            self._acquired += 1
+            if chosen is None:
+                chosen = PooledChannel(address, self.options, self.channel_factory, target)
+                channels.append(chosen)
+                self._created += 1
+            else:
+                self._reused += 1
+
+            chosen.active_streams += 1
+            chosen.last_used = now
+            return chosen
+
+    def release(self, pooled: PooledChannel, error: Optional[grpc.RpcError] = None):
+        """
+        Return a channel after a call finished.
+
+        Args:
+            pooled: Channel returned by acquire()
+            error: RpcError raised by the call, if any. UNAVAILABLE marks the
+                channel broken so the next call reconnects on a fresh channel.
+        """
+        close_now = False
+        with self._lock:
+            pooled.active_streams -= 1
+            pooled.last_used = time.monotonic()
+
+            if error is not None and not pooled.broken and _is_connection_error(error):
+                pooled.broken = True
+                self._reconnects += 1
+                channels = self._channels.get(pooled.address, [])
+                if pooled in channels:
+                    channels.remove(pooled)
+                # Resolve again for the replacement channel
+                if self._targets.get(pooled.address) == pooled.target:
+                    del self._targets[pooled.address]
+
+            # Broken channels are closed once their last call drains
+            if pooled.broken and pooled.active_streams <= 0:
+                close_now = True
+
+        if close_now:
+            pooled.close()
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of pool counters, including the channel reuse ratio."""
+        with self._lock:
+            open_channels = sum(len(channels) for channels in self._channels.values())
+            active_streams = sum(
+                pooled.active_streams
+                for channels in self._channels.values()
+                for pooled in channels
+            )
+            return {
+                "acquired": self._acquired,
+                "reused": self._reused,
+                "created": self._created,
+                "evicted": self._evicted,
+                "reconnects": self._reconnects,
+                "open_channels": open_channels,
+                "active_streams": active_streams,
+                "reuse_ratio": self._reused / self._acquired if self._acquired else 0.0,
+            }
+
+    def close(self):
+        """Close every pooled channel."""
+        with self._lock:
+            channels = [p for chans in self._channels.values() for p in chans]
+            self._channels.clear()
+            self._targets.clear()
+        for pooled in channels:
+            pooled.close()
+
+    def _evict_idle_locked(self, now: float):
+        """Close channels that have no active calls and exceeded the idle timeout."""
+        self._last_sweep = now
+        idle: List[PooledChannel] = []
+        for address in list(self._channels):
+            keep = []
+            for pooled in self._channels[address]:
+                if pooled.active_streams == 0 and now - pooled.last_used >= self.idle_timeout:
+                    idle.append(pooled)
+                else:
+                    keep.append(pooled)
+            if keep:
+                self._channels[address] = keep
+            else:
+                del self._channels[address]
+                self._targets.pop(address, None)
+
+        self._evicted += len(idle)
+        for pooled in idle:
+            pooled.close()
+
+
+def _is_connection_error(error: grpc.RpcError) -> bool:
+    """Whether an RPC error means the connection itself should be replaced."""
+    code = error.code() if hasattr(error, "code") else None
+    return code == grpc.StatusCode.UNAVAILABLE
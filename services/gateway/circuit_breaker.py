@@ -0,0 +1,150 @@
+"""
+Circuit Breaker - Per-replica error-rate and latency breaker.
+
+Consecutive-failure ejection (see registry.py) catches replicas that are
+down. A replica that is merely sick - a sessions replica whose Postgres
+connection hangs, a models replica timing out half its calls - keeps
+passing the odd request and never gets ejected, while every other call
+sent to it fails slowly. The breaker watches a rolling window instead:
+- CLOSED: calls flow; the error rate and slow-call rate are tracked
+- OPEN: the replica gets no traffic (calls fail fast if no replica is left)
+- HALF_OPEN: after the open period a few probe calls test the replica;
+  if they succeed the breaker closes, otherwise it opens again for longer
+"""
+
+from typing import List, Optional
+
+
+CLOSED = 0
+OPEN = 1
+HALF_OPEN = 2
+
+
+class CircuitOpenError(Exception):
+    """Raised when every replica of a service has an open circuit."""
+
+
+class CircuitBreaker:
+    """
+    Breaker state for one replica.
+
+    Not thread-safe on its own: the registry calls it under its lock.
+    """
+
+    def __init__(
+        self,
+        error_threshold: float = 0.5,
+        slow_call_threshold: float = 0.8,
+        slow_call_duration: float = 5.0,
+        min_calls: int = 20,
+        window: int = 10,
+        open_time: float = 5.0,
+        max_open_time: float = 60.0,
+        half_open_probes: int = 3,
+    ):
+        """
+        Args:
+            error_threshold: Failure ratio in the window that opens the breaker
+            slow_call_threshold: Ratio of slow calls in the window that opens the breaker
+            slow_call_duration: Calls taking longer than this (seconds) count as slow
+            min_calls: Calls needed in the window before ratios are evaluated
+            window: Rolling window length in seconds
+            open_time: Seconds the breaker stays open the first time
+            max_open_time: Cap on open time (doubles each time probes fail)
+            half_open_probes: Probe calls allowed, and successes needed to close
+        """
+        self.error_threshold = error_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_duration = slow_call_duration
+        self.min_calls = min_calls
+        self.window = window
+        self.open_time = open_time
+        self.max_open_time = max_open_time
+        self.half_open_probes = half_open_probes
+
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.trips = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # One bucket per second: [second, calls, failures, slow calls]
+        self._buckets: List[List[int]] = [[-1, 0, 0, 0] for _ in range(window)]
+
+    def allows(self, now: float) -> bool:
+        """Whether a new call may be sent to the replica."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return now >= self.open_until
+        return self._probes_in_flight < self.half_open_probes
+
+    def on_call_started(self, now: float):
+        """Count a call sent to the replica (reserves a probe when half-open)."""
+        if self.state == OPEN and now >= self.open_until:
+            self.state = HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if self.state == HALF_OPEN:
+            self._probes_in_flight += 1
+
+    def on_call_finished(self, success: bool, duration: Optional[float], now: float):
+        """
+        Record a call outcome.
+
+        Args:
+            success: False if the replica failed the call
+            duration: Call latency in seconds (None for streams, which are
+                not judged on latency)
+            now: Current monotonic time
+        """
+        slow = duration is not None and duration >= self.slow_call_duration
+
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+            if not success or slow:
+                self._trip(now)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._close()
+            return
+
+        if self.state == OPEN:
+            # Late result of a call sent before the breaker opened
+            return
+
+        second = int(now)
+        bucket = self._buckets[second % self.window]
+        if bucket[0] != second:
+            bucket[:] = [second, 0, 0, 0]
+        bucket[1] += 1
+        if not success:
+            bucket[2] += 1
+        if slow:
+            bucket[3] += 1
+
+        # Ratios only grow on a bad call, so good calls skip the evaluation
+        if success and not slow:
+            return
+        calls = failures = slow_calls = 0
+        for bucket_second, bucket_calls, bucket_failures, bucket_slow in self._buckets:
+            if second - bucket_second < self.window:
+                calls += bucket_calls
+                failures += bucket_failures
+                slow_calls += bucket_slow
+        if calls < self.min_calls:
+            return
+        if failures / calls >= self.error_threshold or slow_calls / calls >= self.slow_call_threshold:
+            self._trip(now)
+
+    def _trip(self, now: float):
+        open_time = min(self.open_time * (2 ** self.trips), self.max_open_time)
+        self.state = OPEN
+        self.open_until = now + open_time
+        self.trips += 1
+
+    def _close(self):
+        self.state = CLOSED
+        self.trips = 0
+        self._buckets = [[-1, 0, 0, 0] for _ in range(self.window)]
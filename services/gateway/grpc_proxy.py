@@ -3,14 +3,48 @@ gRPC Proxy - Routes internal gRPC calls to platform services.
 
 Routes based on x-target-service metadata from request context.
 Maintains Protocol Buffer efficiency by forwarding binary data.
+Backend channels come from a ChannelPool, so calls reuse warm connections.
 """
 
+import time
 from typing import Dict, Optional
 import grpc
 
 from proto import models_pb2_grpc
 from proto import sessions_pb2_grpc
+from services.gateway.admission import AdmissionController, AdmissionRejected, reject_call
+from services.gateway.affinity import SessionAffinity
+from services.gateway.channel_pool import ChannelPool, PooledChannel
+from services.gateway.circuit_breaker import CircuitOpenError
+from services.gateway.methods import MethodInfo, get_method
+from services.gateway.metrics import GatewayMetrics, payload_size
+from services.gateway.mirroring import TrafficMirror
 from services.gateway.registry import ServiceRegistry
+from services.gateway.response_cache import ResponseCache
+from services.gateway.retries import RetryPolicy
+from services.gateway.singleflight import FlightTimeout, SingleFlight
+from services.gateway.stream_buffer import StreamBuffers, StreamOverflowError
+from services.shared.compression import CompressionPolicy
+
+
+# Backend errors that count against the replica (used for ejection)
+REPLICA_FAILURE_CODES = frozenset({
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+})
+
+
+# Longer "remaining" times mean the client set no deadline (the sync server
+# reports about 2**63 seconds in that case)
+NO_DEADLINE_THRESHOLD = 365 * 24 * 3600.0
+
+
+def _empty_response(service_name: str, method_name: str):
+    """Value to return from a handler that failed before reaching the backend."""
+    method = get_method(service_name, method_name)
+    if method is not None and method.server_streaming:
+        return iter(())
+    return None
 
 
 class GenericProxy:
@@ -21,8 +55,44 @@ class GenericProxy:
     Maintains Protocol Buffer efficiency by forwarding binary data.
     """
     
-    def __init__(self, registry: ServiceRegistry):
+    def __init__(
+        self,
+        registry: ServiceRegistry,
+        channel_pool: Optional[ChannelPool] = None,
+        response_cache: Optional[ResponseCache] = None,
+        admission: Optional[AdmissionController] = None,
+        metrics: Optional[GatewayMetrics] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        default_timeout: Optional[float] = None,
+        singleflight: Optional[SingleFlight] = None,
+        compression: Optional[CompressionPolicy] = None,
+        stream_buffers: Optional[StreamBuffers] = None,
+        mirror: Optional[TrafficMirror] = None,
+        affinity: Optional[SessionAffinity] = None,
+    ):
         self.registry = registry
+        # Warm channels to backends, reused across calls
+        self.channel_pool = channel_pool or ChannelPool()
+        # Optional cache for idempotent reads (None disables caching)
+        self.response_cache = response_cache
+        # Optional per-tenant / per-method rate and concurrency limits
+        self.admission = admission
+        # Request counters and latency histograms (served on /metrics)
+        self.metrics = metrics or GatewayMetrics()
+        # Optional retries for idempotent reads (None disables retries)
+        self.retry_policy = retry_policy
+        # Backend timeout for unary calls whose client set no deadline
+        self.default_timeout = default_timeout
+        # Optional coalescing of identical concurrent reads (None disables it)
+        self.singleflight = singleflight
+        # Optional per-method compression of large messages (None sends them as is)
+        self.compression = compression
+        # Optional bounded read-ahead for streamed responses (None reads on demand)
+        self.stream_buffers = stream_buffers
+        # Optional copies of sampled calls to shadow backends (None mirrors nothing)
+        self.mirror = mirror
+        # Optional session/user affinity keys for consistent hashing (None balances every call)
+        self.affinity = affinity
         # Map service names to their stub factories
         self._stub_factories: Dict[str, callable] = {
             "sessions": lambda channel: sessions_pb2_grpc.SessionServiceStub(channel),
@@ -34,40 +104,352 @@ class GenericProxy:
         metadata = dict(context.invocation_metadata())
         return metadata.get('x-target-service')
     
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Gateway proxy stats (channel reuse, cache hits, ...)."""
+        stats = {"channel_pool": self.channel_pool.stats()}
+        if self.response_cache is not None:
+            stats["response_cache"] = self.response_cache.stats()
+        if self.admission is not None:
+            stats["admission"] = self.admission.stats()
+        if self.retry_policy is not None:
+            stats["retries"] = self.retry_policy.stats()
+        if self.singleflight is not None:
+            stats["singleflight"] = self.singleflight.stats()
+        if self.stream_buffers is not None:
+            stats["stream_buffer"] = self.stream_buffers.stats()
+        return stats
+    
     def _forward_request(self, service_name: str, stub_factory, method_name: str, request, context):
-        """Forward request to backend service."""
+        """Forward a deserialized request through the generated backend stub."""
+        def backend_method(pooled):
+            return getattr(pooled.stub(service_name, stub_factory), method_name)
+        return self._forward(service_name, method_name, backend_method, request, context)
+    
+    def forward_raw(self, method: MethodInfo, request: bytes, context):
+        """Forward serialized request bytes unchanged (byte passthrough mode)."""
+        def backend_method(pooled):
+            return pooled.raw_method(method.path, method.server_streaming)
+        return self._forward(method.service_name, method.method_name, backend_method, request, context)
+    
+    def forward_message(self, method: MethodInfo, request, context):
+        """Forward a request message built by the gateway itself (e.g. transcoded from JSON)."""
+        stub_factory = self._stub_factories[method.service_name]
+        return self._forward_request(method.service_name, stub_factory, method.method_name, request, context)
+    
+    def _forward(self, service_name: str, method_name: str, backend_method, request, context):
+        """Forward request to backend service over a pooled channel."""
+        started_at = time.perf_counter()
+        metrics = self.metrics
+        
+        # Expired while queued for a worker: nobody will read the answer
+        if self._deadline_passed(context):
+            metrics.shed("grpc", service_name, method_name, "expired")
+            return _empty_response(service_name, method_name)
+        
+        # Serve idempotent reads from the response cache
+        cache_key, generation = None, 0
+        if self.response_cache is not None:
+            cache_key = self.response_cache.make_key(service_name, method_name, request)
+            if cache_key is not None:
+                cached, generation = self.response_cache.lookup(cache_key)
+                if cached is not None:
+                    metrics.observe("grpc", service_name, method_name, "OK", time.perf_counter() - started_at)
+                    self._compress_response(context, method_name, cached)
+                    return cached
+        
+        # Rate and concurrency limits: reject fast instead of queueing
+        ticket = None
+        if self.admission is not None:
+            try:
+                ticket = self.admission.admit(
+                    service_name, method_name, self._extract_tenant(context)
+                )
+            except AdmissionRejected as e:
+                reject_call(context, e)
+                metrics.observe(
+                    "grpc", service_name, method_name, "RESOURCE_EXHAUSTED", time.perf_counter() - started_at
+                )
+                return _empty_response(service_name, method_name)
+        
+        metrics.call_started("grpc", service_name, method_name)
+        metrics.add_bytes("grpc", service_name, "sent", payload_size(request))
+        method_info = get_method(service_name, method_name)
+        mirrored = None
+        if self.mirror is not None and method_info is not None:
+            mirrored = self.mirror.submit(method_info, request)
+        affinity_key = None
+        if self.affinity is not None and method_info is not None:
+            affinity_key = self.affinity.key_for(method_info, request, context)
+        streaming = False
+        status = "OK"
         try:
-            backend_addr = self.registry.get_platform_service_address(service_name)
-            channel = grpc.insecure_channel(backend_addr)
-            stub = stub_factory(channel)
-            
-            # Call the method on the backend stub
-            method = getattr(stub, method_name)
-            response = method(request)
-            
-            # Check if response is streaming (iterator/generator)
-            if hasattr(response, '__iter__') and not isinstance(response, (str, bytes)):
-                # For streaming responses, yield from the iterator
-                # and close channel when done
+            if method_info is not None and method_info.server_streaming:
+                pooled, response = self._open_stream(
+                    service_name, method_name, backend_method, request, context, affinity_key
+                )
+                # Stop the backend call as soon as the client's RPC terminates,
+                # even while this stream is blocked waiting for the next chunk
+                context.add_callback(response.cancel)
+                chunks = response
+                if self.stream_buffers is not None:
+                    # Read ahead of the client, up to the per-stream bound
+                    chunks = self.stream_buffers.wrap(response, response.cancel)
+                # Hand the channel back to the pool when the stream ends
+                streaming = True
                 def stream_with_cleanup():
+                    error = None
+                    status = "OK"
+                    received = 0
+                    first_message = True
+                    before_send = None
                     try:
-                        yield from response
+                        if self.compression is not None:
+                            before_send = self.compression.stream_filter(context, method_name)
+                        for chunk in chunks:
+                            if first_message:
+                                first_message = False
+                                metrics.first_message(
+                                    "grpc", service_name, method_name, time.perf_counter() - started_at
+                                )
+                            received += payload_size(chunk)
+                            if before_send is not None:
+                                before_send(chunk)
+                            yield chunk
+                    except grpc.RpcError as e:
+                        error = e
+                        status = e.code().name
+                        context.set_code(e.code())
+                        context.set_details(e.details())
+                        raise
+                    except StreamOverflowError as e:
+                        # Client fell too far behind (cancel overflow policy)
+                        status = "RESOURCE_EXHAUSTED"
+                        context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+                        context.set_details(str(e))
+                        raise
+                    except GeneratorExit:
+                        status = "CANCELLED"
+                        raise
                     finally:
-                        channel.close()
+                        # No-op if the stream completed; stops the backend
+                        # call if the client went away mid-stream
+                        if chunks is not response:
+                            chunks.close()
+                        response.cancel()
+                        self._finish_call(pooled, error)
+                        if ticket is not None:
+                            ticket.release()
+                        metrics.add_bytes("grpc", service_name, "received", received)
+                        duration = time.perf_counter() - started_at
+                        metrics.call_finished("grpc", service_name, method_name, status, duration, streaming=True)
+                        if mirrored is not None:
+                            mirrored.primary_finished(status, duration)
                 return stream_with_cleanup()
+            
+            def call_unary(shared: bool = False):
+                return self._call_unary(
+                    service_name, method_name, backend_method, request, context, affinity_key, shared
+                )
+            
+            if self.singleflight is not None and self.singleflight.is_coalesced(service_name, method_name):
+                # Identical reads already in flight share one backend call
+                flight_key = self.singleflight.make_key(service_name, method_name, request)
+                response = self.singleflight.do(
+                    flight_key, lambda: call_unary(shared=True), self._time_remaining(context)
+                )
             else:
-                # For unary responses, close immediately
-                channel.close()
-                return response
+                response = call_unary()
+            
+            metrics.add_bytes("grpc", service_name, "received", payload_size(response))
+            if self.response_cache is not None:
+                if cache_key is not None:
+                    self.response_cache.put(cache_key, response, generation)
+                self.response_cache.invalidate_after(service_name, method_name)
+            self._compress_response(context, method_name, response)
+            return response
             
         except grpc.RpcError as e:
+            status = e.code().name
             context.set_code(e.code())
             context.set_details(e.details())
             raise
+        except CircuitOpenError as e:
+            # Every replica is sick: fail fast
+            status = "UNAVAILABLE"
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details(str(e))
+            raise
+        except FlightTimeout as e:
+            # Deadline passed waiting for an identical read in flight
+            status = "DEADLINE_EXCEEDED"
+            context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
+            context.set_details(str(e))
+            raise
         except Exception as e:
+            status = "INTERNAL"
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
             raise
+        finally:
+            # Streams release their admission slot and record metrics when the stream ends
+            if not streaming:
+                if ticket is not None:
+                    ticket.release()
+                duration = time.perf_counter() - started_at
+                metrics.call_finished("grpc", service_name, method_name, status, duration)
+                if mirrored is not None:
+                    mirrored.primary_finished(status, duration)
+    
+    def _call_unary(
+        self,
+        service_name: str,
+        method_name: str,
+        backend_method,
+        request,
+        context,
+        affinity_key: Optional[str] = None,
+        shared: bool = False,
+    ):
+        """
+        Make a unary backend call within the client's deadline, retrying idempotent reads.
+        
+        A `shared` call (coalesced for several callers) uses _shared_timeout.
+        """
+        retry_policy = self._retry_policy_for(service_name, method_name)
+        attempt = 0
+        while True:
+            attempt += 1
+            backend_addr = self.registry.get_platform_service_address(service_name, affinity_key)
+            pooled = self.channel_pool.acquire(backend_addr)
+            self.registry.request_started(backend_addr)
+            
+            attempt_started = time.perf_counter()
+            try:
+                method = backend_method(pooled)
+                response = method(
+                    request,
+                    timeout=(
+                        self._shared_timeout(context) if shared
+                        else self._backend_timeout(service_name, method_name, context)
+                    ),
+                    compression=self._request_compression(method_name, request),
+                )
+            except grpc.RpcError as e:
+                self._finish_call(pooled, e)
+                backoff = None
+                if retry_policy is not None:
+                    backoff = retry_policy.next_backoff(attempt, e, self._time_remaining(context))
+                if backoff is None:
+                    raise
+                time.sleep(backoff)
+                continue
+            except Exception:
+                self._finish_call(pooled)
+                raise
+            
+            self._finish_call(pooled, duration=time.perf_counter() - attempt_started)
+            return response
+    
+    def _open_stream(
+        self,
+        service_name: str,
+        method_name: str,
+        backend_method,
+        request,
+        context,
+        affinity_key: Optional[str] = None,
+    ):
+        """Start a server-streaming backend call; returns (pooled channel, response iterator)."""
+        backend_addr = self.registry.get_platform_service_address(service_name, affinity_key)
+        pooled = self.channel_pool.acquire(backend_addr)
+        self.registry.request_started(backend_addr)
+        try:
+            method = backend_method(pooled)
+            return pooled, method(
+                request,
+                timeout=self._backend_timeout(service_name, method_name, context),
+                compression=self._request_compression(method_name, request),
+            )
+        except grpc.RpcError as e:
+            self._finish_call(pooled, e)
+            raise
+        except Exception:
+            self._finish_call(pooled)
+            raise
+    
+    def _deadline_passed(self, context) -> bool:
+        """Fail the call with DEADLINE_EXCEEDED if its deadline has already passed."""
+        remaining = self._time_remaining(context)
+        if remaining is None or remaining > 0:
+            return False
+        context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
+        context.set_details("Deadline passed before the call was forwarded")
+        return True
+    
+    def _time_remaining(self, context) -> Optional[float]:
+        """Seconds left before the client's deadline (None if it set none)."""
+        remaining = context.time_remaining()
+        if remaining is None or remaining > NO_DEADLINE_THRESHOLD:
+            return None
+        return remaining
+    
+    def _backend_timeout(self, service_name: str, method_name: str, context) -> Optional[float]:
+        """Timeout for a backend call: the client's remaining time, else the unary default."""
+        remaining = self._time_remaining(context)
+        if remaining is not None:
+            return remaining
+        method = get_method(service_name, method_name)
+        if method is not None and method.server_streaming:
+            # Streams (ChatStream) may legitimately run for a long time
+            return None
+        return self.default_timeout
+    
+    def _shared_timeout(self, context) -> float:
+        """
+        Timeout for a backend call shared by coalesced callers.
+        
+        Not bounded by the leader's deadline alone (waiters may have longer
+        ones), but never unbounded either.
+        """
+        bound = self.default_timeout or self.singleflight.call_timeout
+        remaining = self._time_remaining(context)
+        return bound if remaining is None else max(remaining, bound)
+    
+    def _retry_policy_for(self, service_name: str, method_name: str) -> Optional[RetryPolicy]:
+        """Retry policy for a call (None if it must not be retried)."""
+        if self.retry_policy is None:
+            return None
+        self.retry_policy.budget.record_call()
+        if not self.retry_policy.is_retryable(service_name, method_name):
+            return None
+        return self.retry_policy
+    
+    def _request_compression(self, method_name: str, request) -> Optional[grpc.Compression]:
+        """Compression for the backend call (None unless the request is large enough)."""
+        if self.compression is None:
+            return None
+        return self.compression.for_message(method_name, request)
+    
+    def _compress_response(self, context, method_name: str, response):
+        """Ask gRPC to compress a large unary response to the client."""
+        if self.compression is not None and response is not None:
+            self.compression.apply_unary(context, method_name, response)
+    
+    def _extract_tenant(self, context) -> Optional[str]:
+        """Extract the tenant used for admission control from gRPC metadata."""
+        metadata = dict(context.invocation_metadata())
+        return metadata.get(self.admission.tenant_header)
+    
+    def _finish_call(
+        self,
+        pooled: PooledChannel,
+        error: Optional[grpc.RpcError] = None,
+        duration: Optional[float] = None,
+    ):
+        """Return the channel to the pool and report the outcome (and unary latency) to the registry."""
+        self.channel_pool.release(pooled, error)
+        replica_failed = error is not None and error.code() in REPLICA_FAILURE_CODES
+        self.registry.request_finished(pooled.address, success=not replica_failed, duration=duration)
 
 
 class GenericServiceProxy:
@@ -157,3 +539,4 @@ class ModelServiceProxy(GenericServiceProxy, models_pb2_grpc.ModelServiceService
     All methods automatically forwarded - no manual implementation needed!
     """
     pass
+
@@ -1,63 +1,514 @@
 """
 HTTP Handler - Routes external HTTP requests to workflow containers.
 
-Handles POST requests from external clients and forwards them to
-the appropriate workflow containers based on API path.
+Handles requests from external clients and forwards them to the
+appropriate workflow containers based on API path.
+
+Forwarding is streamed in both directions: request bodies are copied to
+the workflow as they arrive, and responses (including chunked and
+Server-Sent Events responses) are relayed chunk by chunk without
+buffering whole payloads. Upstream connections are kept alive and reused.
+
+POSTs to /v1/<service>/<Method> are not forwarded to workflows: they are
+transcoded from JSON and sent to the platform service (see transcoding.py).
+Streaming methods can also be consumed as Server-Sent Events (see sse.py).
 """
 
 from http.server import BaseHTTPRequestHandler
+import http.client
 import json
+import math
+import time
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+import grpc
 
+from services.gateway.circuit_breaker import CircuitOpenError
+from services.gateway.http_pool import HTTPConnectionPool
+from services.gateway.metrics import GatewayMetrics
 from services.gateway.registry import ServiceRegistry
+from services.gateway.sse import (
+    DISCONNECT_POLL_INTERVAL,
+    DONE,
+    ERROR,
+    HEARTBEAT,
+    HEARTBEAT_INTERVAL,
+    MESSAGE,
+    SSE_CONTENT_TYPE,
+    StreamPump,
+    client_disconnected,
+    format_event,
+)
+from services.gateway.transcoding import (
+    TIMEOUT_HEADER,
+    Route,
+    Transcoder,
+    TranscodingContext,
+    TranscodingError,
+)
+
+
+# Size of body pieces copied between client and workflow
+CHUNK_SIZE = 64 * 1024
+
+# Gateway's own Prometheus endpoint (not forwarded to workflows)
+METRICS_PATH = "/metrics"
+
+# Compact separators (transcoded responses are serialized on every call)
+_json_encoder = json.JSONEncoder(separators=(",", ":"))
+
+# Headers that describe a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+})
 
 
 class WorkflowHTTPHandler(BaseHTTPRequestHandler):
     """HTTP handler that routes requests to workflow containers."""
     
-    def __init__(self, registry: ServiceRegistry, *args, **kwargs):
+    # Keep client connections alive between requests
+    protocol_version = "HTTP/1.1"
+    
+    # Streamed chunks and SSE events are small writes; send them immediately
+    disable_nagle_algorithm = True
+    
+    def __init__(
+        self,
+        registry: ServiceRegistry,
+        connection_pool: HTTPConnectionPool,
+        metrics: GatewayMetrics,
+        transcoder: Optional[Transcoder],
+        *args,
+        **kwargs,
+    ):
         self.registry = registry
+        self.connection_pool = connection_pool
+        self.metrics = metrics
+        self.transcoder = transcoder
         super().__init__(*args, **kwargs)
     
     def do_POST(self):
-        """Handle POST requests to workflow endpoints."""
-        try:
-            # Extract API path from request
-            api_path = self.path
-            
-            # Get workflow address from registry
-            workflow_addr = self.registry.get_workflow_address(api_path)
-            
-            # Forward request to workflow container
-            # For now, this is a placeholder - in production, we'd use
-            # an HTTP client library to forward the request
-            # TODO: Implement actual HTTP forwarding to workflow containers
-            
-            # Placeholder response
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            response = {
-                "message": f"Request routed to workflow at {workflow_addr}",
-                "api_path": api_path,
-                "note": "HTTP forwarding to workflows not yet implemented"
-            }
-            self.wfile.write(json.dumps(response).encode())
-            
+        """Handle POST requests to workflow endpoints (and transcoded platform service calls)."""
+        if self.transcoder is not None:
+            route = self.transcoder.match(self._api_path())
+            if route is not None:
+                self._transcode(route)
+                return
+        self._forward_to_workflow()
+    
+    def do_GET(self):
+        """Handle GET requests to workflow endpoints (and the gateway's /metrics)."""
+        if self._api_path() == METRICS_PATH:
+            self._send_metrics()
+            return
+        if self.transcoder is not None:
+            route = self.transcoder.match(self._api_path())
+            if route is not None and route.method.server_streaming:
+                # EventSource can only GET: serve the stream as SSE
+                self._transcode(route)
+                return
+        self._forward_to_workflow()
+    
+    def do_PUT(self):
+        """Handle PUT requests to workflow endpoints."""
+        self._forward_to_workflow()
+    
+    def do_PATCH(self):
+        """Handle PATCH requests to workflow endpoints."""
+        self._forward_to_workflow()
+    
+    def do_DELETE(self):
+        """Handle DELETE requests to workflow endpoints."""
+        self._forward_to_workflow()
+    
+    def _forward_to_workflow(self):
+        """Forward the current request to its workflow and relay the response."""
+        started_at = time.perf_counter()
+        api_path = self._api_path()
+        
+        try:
+            # Longest matching workflow pattern: it labels the metrics, so
+            # parameterized paths do not create a series per path
+            route = self.registry.get_workflow_route(api_path)
+            workflow_addr = self.registry.get_workflow_address(route)
         except ValueError as e:
-            # Workflow not found
-            self.send_response(404)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            error = {"error": str(e)}
-            self.wfile.write(json.dumps(error).encode())
+            # Workflow not found (unmatched paths share one label set)
+            self._discard_request_body()
+            self._send_json(404, {"error": str(e)})
+            self.metrics.observe("http", "unmatched", self.command, "404", time.perf_counter() - started_at)
+            return
+        except CircuitOpenError as e:
+            # Every replica of the workflow is sick: fail fast
+            self._discard_request_body()
+            self._send_json(503, {"error": str(e)})
+            self.metrics.observe("http", route, self.command, "503", time.perf_counter() - started_at)
+            return
+        
+        self.metrics.call_started("http", route, self.command)
+        self.registry.request_started(workflow_addr)
+        status = "502"
+        conn = None
+        try:
+            conn, reused = self.connection_pool.acquire(workflow_addr)
+            try:
+                response = self._send_upstream(conn, route)
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # A kept-alive connection may have been closed by the workflow
+                # meanwhile; retry once on a fresh one if the body can be resent
+                if not reused or self._has_request_body():
+                    raise
+                conn.close()
+                conn = self.connection_pool.connect(workflow_addr)
+                response = self._send_upstream(conn, route)
+        except (OSError, http.client.HTTPException) as e:
+            if conn is not None:
+                conn.close()
+            self.registry.request_finished(workflow_addr, success=False)
+            self.close_connection = True
+            self._send_json(502, {"error": f"Workflow at {workflow_addr} unavailable: {e}"})
+            self.metrics.call_finished("http", route, self.command, status, time.perf_counter() - started_at)
+            return
         except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
+            if conn is not None:
+                conn.close()
+            self.registry.request_finished(workflow_addr)
+            self.close_connection = True
+            self._send_json(500, {"error": str(e)})
+            self.metrics.call_finished("http", route, self.command, "500", time.perf_counter() - started_at)
+            return
+        
+        status = str(response.status)
+        streaming = response.getheader("Content-Length") is None
+        try:
+            self._relay_response(response, route)
+        except (OSError, http.client.HTTPException):
+            # Client went away or the workflow broke mid-response
+            conn.close()
+            self.close_connection = True
+            status = "aborted"
+        else:
+            # Marks the response complete so the connection can send again
+            response.close()
+            if response.will_close:
+                conn.close()
+            else:
+                self.connection_pool.release(workflow_addr, conn)
+        finally:
+            self.registry.request_finished(workflow_addr)
+            self.metrics.call_finished(
+                "http", route, self.command, status,
+                time.perf_counter() - started_at, streaming=streaming,
+            )
+    
+    def _transcode(self, route: Route):
+        """Call a platform service method with the JSON body; reply with JSON (NDJSON or SSE for streams)."""
+        started_at = time.perf_counter()
+        event_stream = route.method.server_streaming and (
+            self.command == "GET" or SSE_CONTENT_TYPE in self.headers.get("Accept", "")
+        )
+        try:
+            body = self._read_json_body() if self.command == "POST" else self._query_json_body()
+            timeout = self.headers.get(TIMEOUT_HEADER)
+            context = TranscodingContext(
+                ((name.lower(), value) for name, value in self.headers.items()),
+                timeout=float(timeout) if timeout else None,
+            )
+            request = route.request_converter.from_json(body)
+        except (ValueError, TranscodingError) as e:
+            self._send_json(400, {"error": {"code": "INVALID_ARGUMENT", "message": str(e)}})
+            return
+        
+        try:
+            result = self.transcoder.call(route, request, context)
+        except Exception:
+            # The proxy has set the status on the context
+            self._send_transcoding_error(context)
+            return
+        
+        if result is None:
+            # Rejected before reaching the backend (admission control, ...)
+            self._send_transcoding_error(context)
+            return
+        if not route.method.server_streaming:
+            self._send_json(200, result)
+            return
+        if event_stream:
+            self._send_event_stream(route, result, context, started_at)
+            return
+        
+        # Wait for the first message so a failed call still gets an error status
+        try:
+            first = next(result, None)
+        except Exception:
+            self._send_transcoding_error(context)
+            return
+        
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
             self.end_headers()
-            error = {"error": str(e)}
-            self.wfile.write(json.dumps(error).encode())
+            if first is not None:
+                self._write_chunk(_json_encoder.encode(first).encode() + b"\n")
+                self.metrics.first_message(
+                    "http", route.method.service_name, route.method.method_name,
+                    time.perf_counter() - started_at,
+                )
+                for message in result:
+                    self._write_chunk(_json_encoder.encode(message).encode() + b"\n")
+        except OSError:
+            # Client went away: closing the stream cancels the backend call
+            result.close()
+            self.close_connection = True
+            return
+        except Exception:
+            # Headers are gone; report the failure as the last line
+            if context.code == grpc.StatusCode.OK:
+                context.set_code(grpc.StatusCode.INTERNAL)
+            self._write_chunk(_json_encoder.encode(context.error_body()).encode() + b"\n")
+        self.wfile.write(b"0\r\n\r\n")
+    
+    def _send_event_stream(self, route: Route, result, context: TranscodingContext, started_at: float):
+        """Relay a transcoded stream as Server-Sent Events, one flushed event per message."""
+        pump = StreamPump(result)
+        headers_sent = False
+        first_message = True
+        idle_since = time.monotonic()
+        try:
+            while True:
+                entry = pump.get(DISCONNECT_POLL_INTERVAL)
+                if entry is None:
+                    if client_disconnected(self.connection):
+                        raise ConnectionResetError("client disconnected")
+                    if time.monotonic() - idle_since >= HEARTBEAT_INTERVAL:
+                        # Stop holding the headers back for a possible error status
+                        if headers_sent:
+                            self._write_chunk(HEARTBEAT)
+                        else:
+                            self._start_event_stream()
+                            headers_sent = True
+                        idle_since = time.monotonic()
+                    continue
+                
+                kind, value = entry
+                if not headers_sent:
+                    if kind == ERROR:
+                        self._send_transcoding_error(context)
+                        return
+                    self._start_event_stream()
+                    headers_sent = True
+                
+                if kind == MESSAGE:
+                    self._write_chunk(format_event(_json_encoder.encode(value)))
+                    if first_message:
+                        first_message = False
+                        self.metrics.first_message(
+                            "sse", route.method.service_name, route.method.method_name,
+                            time.perf_counter() - started_at,
+                        )
+                    idle_since = time.monotonic()
+                elif kind == DONE:
+                    self._write_chunk(format_event("{}", event="done"))
+                    break
+                else:
+                    if context.code == grpc.StatusCode.OK:
+                        context.set_code(grpc.StatusCode.INTERNAL)
+                    self._write_chunk(format_event(_json_encoder.encode(context.error_body()), event="error"))
+                    break
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            self.close_connection = True
+        finally:
+            # Cancels the backend call if the client went away mid-stream
+            context.terminate()
+            pump.stop()
+    
+    def _start_event_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", SSE_CONTENT_TYPE)
+        self.send_header("Cache-Control", "no-cache")
+        # Stop nginx-style proxies in front of the gateway from buffering events
+        self.send_header("X-Accel-Buffering", "no")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+    
+    def _send_transcoding_error(self, context: TranscodingContext):
+        """Send a failed transcoded call's gRPC status as an HTTP error."""
+        if context.code == grpc.StatusCode.OK:
+            context.set_code(grpc.StatusCode.INTERNAL)
+        headers = {}
+        for key, value in context.trailing_metadata:
+            if key == "retry-after-ms":
+                headers["Retry-After"] = str(math.ceil(int(value) / 1000))
+        self._send_json(context.http_status(), context.error_body(), headers=headers)
+    
+    def _read_json_body(self):
+        """Read and parse the request body (empty body = empty JSON object)."""
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            data = bytearray()
+            while True:
+                size = int(self.rfile.readline(65537).split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    while self.rfile.readline(65537) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                data += self.rfile.read(size)
+                self.rfile.readline(65537)
+        else:
+            data = self.rfile.read(self._content_length())
+        if not data.strip():
+            return {}
+        return json.loads(data)
+    
+    def _query_json_body(self):
+        """JSON request from the "request" query parameter (empty = empty JSON object)."""
+        values = parse_qs(urlsplit(self.path).query).get("request")
+        if not values or not values[0].strip():
+            return {}
+        return json.loads(values[0])
+    
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+    
+    def _send_upstream(self, conn: http.client.HTTPConnection, route: str) -> http.client.HTTPResponse:
+        """Send request line, headers and (streamed) body; return the upstream response."""
+        conn.putrequest(self.command, self.path, skip_host=True, skip_accept_encoding=True)
+        for name, value in self.headers.items():
+            lowered = name.lower()
+            if lowered in HOP_BY_HOP_HEADERS or lowered in ("content-length", "host"):
+                continue
+            conn.putheader(name, value)
+        conn.putheader("Host", f"{conn.host}:{conn.port}")
+        conn.putheader("X-Forwarded-For", self.client_address[0])
+        if "Host" in self.headers:
+            conn.putheader("X-Forwarded-Host", self.headers["Host"])
+        
+        chunked = "chunked" in self.headers.get("Transfer-Encoding", "").lower()
+        if chunked:
+            conn.putheader("Transfer-Encoding", "chunked")
+        elif "Content-Length" in self.headers or self.command in ("POST", "PUT", "PATCH"):
+            conn.putheader("Content-Length", str(self._content_length()))
+        conn.endheaders()
+        
+        if chunked:
+            sent = self._copy_chunked_body(conn)
+        else:
+            sent = 0
+            remaining = self._content_length()
+            while remaining > 0:
+                data = self.rfile.read(min(CHUNK_SIZE, remaining))
+                if not data:
+                    break
+                conn.send(data)
+                sent += len(data)
+                remaining -= len(data)
+        self.metrics.add_bytes("http", route, "sent", sent)
+        
+        return conn.getresponse()
+    
+    def _relay_response(self, response: http.client.HTTPResponse, route: str):
+        """Relay status, headers and body to the client as the body arrives."""
+        self.send_response(response.status, response.reason)
+        for name, value in response.getheaders():
+            if name.lower() in HOP_BY_HOP_HEADERS:
+                continue
+            self.send_header(name, value)
+        
+        no_body = self.command == "HEAD" or response.status in (204, 304) or response.status < 200
+        # Unknown length (chunked upstream, SSE, ...): re-chunk towards the client
+        rechunk = not no_body and response.getheader("Content-Length") is None
+        if rechunk:
+            self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        if no_body:
+            return
+        
+        received = 0
+        try:
+            while True:
+                # read1 returns whatever is available, so SSE events are not held back
+                data = response.read1(CHUNK_SIZE)
+                if not data:
+                    break
+                received += len(data)
+                if rechunk:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                else:
+                    self.wfile.write(data)
+            if rechunk:
+                self.wfile.write(b"0\r\n\r\n")
+        finally:
+            self.metrics.add_bytes("http", route, "received", received)
+    
+    def _copy_chunked_body(self, conn: http.client.HTTPConnection) -> int:
+        """Copy a chunked request body to the upstream chunk by chunk; return its size."""
+        total = 0
+        while True:
+            size_line = self.rfile.readline(65537)
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip trailers up to the terminating empty line
+                while self.rfile.readline(65537) not in (b"\r\n", b"\n", b""):
+                    pass
+                conn.send(b"0\r\n\r\n")
+                return total
+            data = self.rfile.read(size)
+            total += len(data)
+            self.rfile.readline(65537)  # CRLF after the chunk data
+            conn.send(b"%x\r\n%s\r\n" % (len(data), data))
+    
+    def _api_path(self) -> str:
+        """Request path used for routing (query string is forwarded, not routed on)."""
+        return self.path.split("?", 1)[0]
+    
+    def _content_length(self) -> int:
+        return int(self.headers.get("Content-Length", 0) or 0)
+    
+    def _has_request_body(self) -> bool:
+        return self._content_length() > 0 or "Transfer-Encoding" in self.headers
+    
+    def _discard_request_body(self):
+        """Drain an unread request body so the client connection stays usable."""
+        if "Transfer-Encoding" in self.headers:
+            self.close_connection = True
+            return
+        remaining = self._content_length()
+        while remaining > 0:
+            data = self.rfile.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+    
+    def _send_metrics(self):
+        """Serve gateway metrics in the Prometheus text format."""
+        body = self.metrics.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        """Send a JSON response."""
+        body = _json_encoder.encode(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
     
     def log_message(self, format, *args):
         """Override to reduce log noise."""
         pass
-
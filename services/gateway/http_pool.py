@@ -0,0 +1,115 @@
+"""
+HTTP Connection Pool - Keep-alive connections to workflow containers.
+
+Each upstream address keeps a small stack of idle HTTP/1.1 connections.
+A forwarded request takes one (or opens a new one), and gives it back
+once the response has been fully relayed, so consecutive requests skip
+the TCP handshake.
+"""
+
+import http.client
+import threading
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+
+class HTTPConnectionPool:
+    """
+    Pool of keep-alive HTTP connections keyed by upstream address.
+
+    Addresses may be "host:port" or a full "http(s)://host:port" URL.
+    """
+
+    def __init__(
+        self,
+        max_idle_per_host: int = 16,
+        idle_timeout: float = 4.0,
+        timeout: float = 300.0,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            max_idle_per_host: Idle connections kept per upstream
+            idle_timeout: Seconds an idle connection is trusted before it is
+                dropped (keep below the upstream server's keep-alive timeout)
+            timeout: Socket timeout for upstream connections
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        # address -> [(connection, returned_at)]
+        self._idle: Dict[str, List[Tuple[http.client.HTTPConnection, float]]] = {}
+
+        # Counters for gateway stats
+        self._acquired = 0
+        self._reused = 0
+
+    def acquire(self, address: str) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Get a connection to an upstream.
+
+        Returns:
+            Tuple of (connection, reused) where reused is True for a
+            kept-alive connection
+        """
+        now = time.monotonic()
+        stale = []
+        conn = None
+        with self._lock:
+            self._acquired += 1
+            idle = self._idle.get(address)
+            while idle:
+                candidate, returned_at = idle.pop()
+                if now - returned_at < self.idle_timeout:
+                    conn = candidate
+                    self._reused += 1
+                    break
+                stale.append(candidate)
+
+        for candidate in stale:
+            candidate.close()
+
+        if conn is not None:
+            return conn, True
+        return self.connect(address), False
+
+    def release(self, address: str, conn: http.client.HTTPConnection):
+        """Return a connection whose response was fully read."""
+        with self._lock:
+            idle = self._idle.setdefault(address, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of pool counters, including the connection reuse ratio."""
+        with self._lock:
+            return {
+                "acquired": self._acquired,
+                "reused": self._reused,
+                "idle_connections": sum(len(idle) for idle in self._idle.values()),
+                "reuse_ratio": self._reused / self._acquired if self._acquired else 0.0,
+            }
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle = [conn for conns in self._idle.values() for conn, _ in conns]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+    def connect(self, address: str) -> http.client.HTTPConnection:
+        """Open a new (unpooled) connection for an address."""
+        if "://" not in address:
+            return http.client.HTTPConnection(address, timeout=self.timeout)
+
+        parts = urlsplit(address)
+        if parts.scheme == "https":
+            return http.client.HTTPSConnection(parts.netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(parts.netloc, timeout=self.timeout)
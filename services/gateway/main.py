@@ -9,11 +9,48 @@ This is a single gateway component that handles both types of traffic.
 Internally, it runs two servers (HTTP and gRPC) but presents a unified gateway interface.
 """
 
+import asyncio
 import os
 import threading
+from typing import Optional
+
+import grpc
 
 from services.gateway.registry import ServiceRegistry
-from services.gateway.servers import create_http_server, create_grpc_server
+from services.gateway.admission import AdmissionController
+from services.gateway.affinity import SessionAffinity
+from services.gateway.bulkheads import Bulkheads
+from services.gateway.channel_pool import ChannelPool
+from services.gateway.grpc_proxy import GenericProxy
+from services.gateway.http_pool import HTTPConnectionPool
+from services.gateway.metrics import GatewayMetrics
+from services.gateway.mirroring import TrafficMirror
+from services.gateway.registration import RegistrationServicer, start_expiry_thread
+from services.gateway.response_cache import ResponseCache
+from services.gateway.retries import RetryBudget, RetryPolicy
+from services.gateway.singleflight import SingleFlight
+from services.gateway.stream_buffer import StreamBuffers
+from services.gateway.transcoding import DEFAULT_METHODS as DEFAULT_TRANSCODED_METHODS, Transcoder
+from services.gateway.servers import create_http_server, create_grpc_server, create_aio_grpc_server
+from services.shared.compression import CompressionPolicy
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean environment variable."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+
+def _transcoded_methods(value: Optional[str]):
+    """Transcoding allowlist from "service.Method,..." ("*" = every method, unset = defaults)."""
+    if not value:
+        return DEFAULT_TRANSCODED_METHODS
+    if value.strip() == "*":
+        return None
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    return {(name.partition(".")[0], name.partition(".")[2]) for name in names}
 
 
 def main():
@@ -25,13 +62,41 @@ def main():
     - HTTP server for external clients → workflows
     - gRPC server for internal workflows → platform services
     """
-    registry = ServiceRegistry()
+    # Route each session's (or user's) calls to one replica by consistent hashing (JSON, see affinity.py)
+    affinity_config = os.getenv("GATEWAY_AFFINITY")
+    affinity = SessionAffinity.from_json(affinity_config) if affinity_config else None
+    
+    registry = ServiceRegistry(
+        policy=os.getenv("GATEWAY_LB_POLICY", "round_robin"),
+        # Per-replica circuit breakers on error rate and slow calls
+        circuit_breakers=_env_flag("GATEWAY_CIRCUIT_BREAKERS", default=True),
+        breaker_settings=dict(
+            error_threshold=float(os.getenv("GATEWAY_BREAKER_ERROR_RATE", "0.5")),
+            slow_call_duration=float(os.getenv("GATEWAY_BREAKER_SLOW_CALL_SECONDS", "5")),
+            open_time=float(os.getenv("GATEWAY_BREAKER_OPEN_SECONDS", "5")),
+        ),
+        hash_load_factor=affinity.load_factor if affinity is not None else 1.25,
+    )
     
     # Register platform services from environment variables
-    sessions_addr = os.getenv("SESSIONS_SERVICE_ADDR", "localhost:50052")
-    registry.register_platform_service("sessions", sessions_addr)
-    models_addr = os.getenv("MODELS_SERVICE_ADDR", "localhost:50053")
-    registry.register_platform_service("models", models_addr)
+    # (comma-separated addresses register several replicas)
+    sessions_addrs = os.getenv("SESSIONS_SERVICE_ADDR", "localhost:50052")
+    for sessions_addr in sessions_addrs.split(","):
+        registry.register_platform_service("sessions", sessions_addr.strip())
+    models_addrs = os.getenv("MODELS_SERVICE_ADDR", "localhost:50053")
+    for models_addr in models_addrs.split(","):
+        registry.register_platform_service("models", models_addr.strip())
+    
+    # Replicas can also register at runtime (RegistryService on the gRPC port)
+    # and are evicted when they stop heartbeating; callers need the token or
+    # an allowlisted source network (neither set = registration disabled)
+    registration = RegistrationServicer(
+        registry,
+        default_ttl=float(os.getenv("GATEWAY_REGISTRATION_TTL", "15")),
+        token=os.getenv("GATEWAY_REGISTRATION_TOKEN"),
+        allowed_networks=os.getenv("GATEWAY_REGISTRATION_ALLOWED_NETWORKS", "").split(","),
+    )
+    start_expiry_thread(registry)
     
     # Register workflows (in production, this would come from Workflow Service)
     # For now, we can register manually for testing
@@ -48,16 +113,152 @@ def main():
     print("  - HTTP requests to workflows based on API path")
     print("  - gRPC requests to platform services based on x-target-service metadata")
     
+    # Metrics shared by both servers, served on the HTTP port at /metrics
+    metrics = GatewayMetrics()
+    metrics.add_collector("replica", registry.get_replica_stats, label="address")
+    http_pool = HTTPConnectionPool()
+    metrics.add_collector("http_pool", http_pool.stats)
+    
+    # Backend channel pool (warm connections reused across proxied calls)
+    pool_settings = dict(
+        max_streams_per_channel=int(os.getenv("GATEWAY_MAX_STREAMS_PER_CHANNEL", "100")),
+        idle_timeout=float(os.getenv("GATEWAY_CHANNEL_IDLE_TIMEOUT", "300")),
+    )
+    
+    # Cache for idempotent reads (ListModels, GetPrompt, ...); 0 disables it
+    cache_mb = float(os.getenv("GATEWAY_RESPONSE_CACHE_MB", "32"))
+    response_cache = ResponseCache(max_bytes=int(cache_mb * 1024 * 1024)) if cache_mb > 0 else None
+    
+    # Per-tenant / per-method rate and concurrency limits (JSON, see admission.py)
+    rate_limits = os.getenv("GATEWAY_RATE_LIMITS")
+    admission = AdmissionController.from_json(rate_limits) if rate_limits else None
+    if response_cache is not None:
+        metrics.add_collector("response_cache", response_cache.stats)
+    if admission is not None:
+        metrics.add_collector("admission", admission.stats)
+    
+    # Jittered retries for idempotent reads, capped by a gateway-wide budget; 1 disables them
+    max_attempts = int(os.getenv("GATEWAY_RETRY_MAX_ATTEMPTS", "3"))
+    retry_policy = None
+    if max_attempts > 1:
+        budget = RetryBudget(ratio=float(os.getenv("GATEWAY_RETRY_BUDGET_RATIO", "0.1")))
+        retry_policy = RetryPolicy(max_attempts=max_attempts, budget=budget)
+        metrics.add_collector("retries", retry_policy.stats)
+    
+    # Identical concurrent reads share one backend call (read-only methods only)
+    singleflight = None
+    if _env_flag("GATEWAY_COALESCE_READS", default=True):
+        singleflight = SingleFlight()
+        metrics.add_collector("singleflight", singleflight.stats)
+    
+    # Client deadlines are always propagated; this bounds unary calls without one
+    default_timeout = os.getenv("GATEWAY_DEFAULT_TIMEOUT")
+    
+    # Bounded read-ahead per streamed response; a slow client blocks the backend
+    # read ("block") or gets its stream cancelled ("cancel"). 0 disables it
+    stream_buffer_kb = float(os.getenv("GATEWAY_STREAM_BUFFER_KB", "256"))
+    stream_buffers = None
+    if stream_buffer_kb > 0:
+        stream_buffers = StreamBuffers(
+            max_stream_bytes=int(stream_buffer_kb * 1024),
+            policy=os.getenv("GATEWAY_STREAM_OVERFLOW", "block"),
+        )
+        metrics.add_collector("stream_buffer", stream_buffers.stats)
+    
+    # Copy a sample of calls to shadow backends, e.g. a new Model Service build (JSON, see mirroring.py)
+    mirror_config = os.getenv("GATEWAY_MIRROR")
+    mirror = TrafficMirror.from_json(mirror_config, metrics=metrics) if mirror_config else None
+    if mirror is not None:
+        metrics.add_collector("mirror", mirror.stats)
+    if affinity is not None:
+        metrics.add_collector("affinity", lambda: {**affinity.stats(), **registry.get_affinity_stats()})
+    
+    # Per-method gzip/deflate for large messages (GRPC_COMPRESSION*, see services/shared/compression.py)
+    compression = CompressionPolicy.from_env()
+    
+    # Settings shared by the threaded and asyncio gRPC servers
+    proxy_settings = dict(
+        response_cache=response_cache,
+        admission=admission,
+        metrics=metrics,
+        retry_policy=retry_policy,
+        default_timeout=float(default_timeout) if default_timeout else None,
+        registration=registration,
+        singleflight=singleflight,
+        compression=compression if compression.enabled else None,
+        stream_buffers=stream_buffers,
+        mirror=mirror,
+        affinity=affinity,
+    )
+    
+    # REST/JSON endpoints for platform services on the HTTP port (/v1/<service>/<Method>).
+    # Off by default: the HTTP port is external and unauthenticated
+    transcoder = None
+    if _env_flag("GATEWAY_TRANSCODING", default=False):
+        transcoding_pool = ChannelPool(**pool_settings)
+        metrics.add_collector("transcoding_channel_pool", transcoding_pool.stats)
+        transcoder = Transcoder(
+            GenericProxy(
+                registry,
+                channel_pool=transcoding_pool,
+                response_cache=response_cache,
+                admission=admission,
+                metrics=metrics,
+                retry_policy=retry_policy,
+                default_timeout=proxy_settings["default_timeout"],
+                singleflight=singleflight,
+                stream_buffers=stream_buffers,
+                mirror=mirror,
+                affinity=affinity,
+            ),
+            methods=_transcoded_methods(os.getenv("GATEWAY_TRANSCODING_METHODS")),
+        )
+    
     # Start HTTP server in a separate thread
-    http_server = create_http_server(registry, http_port)
+    http_server = create_http_server(
+        registry,
+        http_port,
+        connection_pool=http_pool,
+        metrics=metrics,
+        transcoder=transcoder,
+    )
     http_thread = threading.Thread(target=http_server.serve_forever, daemon=True)
     http_thread.start()
-    print(f"HTTP server started on port {http_port}")
+    print(f"HTTP server started on port {http_port} (metrics at /metrics)")
+    
+    # asyncio gateway: proxied calls run as coroutines instead of worker threads
+    if _env_flag("GATEWAY_ASYNC"):
+        try:
+            asyncio.run(_serve_aio(registry, grpc_port, pool_settings, proxy_settings))
+        except KeyboardInterrupt:
+            print("\nStopping gateway...")
+            http_server.shutdown()
+        return
+    
+    channel_pool = ChannelPool(**pool_settings)
+    metrics.add_collector("channel_pool", channel_pool.stats)
+    
+    # Byte passthrough: forward serialized messages without parsing them
+    passthrough = _env_flag("GATEWAY_PASSTHROUGH")
+    
+    # Separate worker pools for streaming inference, unary inference and metadata reads
+    bulkheads = None
+    if _env_flag("GATEWAY_BULKHEADS", default=True):
+        bulkhead_limits = os.getenv("GATEWAY_BULKHEAD_LIMITS")
+        bulkheads = Bulkheads.from_json(bulkhead_limits) if bulkhead_limits else Bulkheads()
+        metrics.add_collector("bulkhead", bulkheads.stats, label="class")
     
     # Start gRPC server
-    grpc_server = create_grpc_server(registry, grpc_port)
+    grpc_server = create_grpc_server(
+        registry,
+        grpc_port,
+        channel_pool=channel_pool,
+        passthrough=passthrough,
+        bulkheads=bulkheads,
+        **proxy_settings,
+    )
     grpc_server.start()
-    print(f"gRPC server started on port {grpc_port}")
+    print(f"gRPC server started on port {grpc_port}" + (" (byte passthrough)" if passthrough else ""))
     
     print("\nGateway started. Press Ctrl+C to stop.")
     try:
@@ -66,6 +267,33 @@ def main():
         print("\nStopping gateway...")
         http_server.shutdown()
         grpc_server.stop(0)
+        channel_pool.close()
+
+
+async def _serve_aio(
+    registry: ServiceRegistry,
+    grpc_port: int,
+    pool_settings: dict,
+    proxy_settings: dict,
+):
+    """Run the grpc.aio gateway server until cancelled."""
+    channel_pool = ChannelPool(channel_factory=grpc.aio.insecure_channel, **pool_settings)
+    proxy_settings["metrics"].add_collector("channel_pool", channel_pool.stats)
+    grpc_server = create_aio_grpc_server(
+        registry,
+        grpc_port,
+        channel_pool=channel_pool,
+        **proxy_settings,
+    )
+    await grpc_server.start()
+    print(f"gRPC server started on port {grpc_port} (asyncio)")
+    
+    print("\nGateway started. Press Ctrl+C to stop.")
+    try:
+        await grpc_server.wait_for_termination()
+    finally:
+        await grpc_server.stop(0)
+        channel_pool.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+"""
+Method Table - Platform service methods known to the gateway.
+
+Built once at import time from the generated proto descriptors so the
+gateway can route on a gRPC method path without the generated servicer
+classes (needed for byte passthrough, where requests are never parsed).
+"""
+
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from proto import models_pb2
+from proto import sessions_pb2
+
+
+class MethodInfo:
+    """Routing information for one RPC method of a platform service."""
+
+    __slots__ = (
+        "service_name",
+        "method_name",
+        "path",
+        "server_streaming",
+        "request_class",
+        "response_class",
+        "read_only",
+    )
+
+    def __init__(self, service_name: str, method_descriptor, pb2_module):
+        self.service_name = service_name
+        self.method_name = method_descriptor.name
+        self.path = f"/{method_descriptor.containing_service.full_name}/{method_descriptor.name}"
+        self.server_streaming = method_descriptor.server_streaming
+        self.request_class = getattr(pb2_module, method_descriptor.input_type.name)
+        self.response_class = getattr(pb2_module, method_descriptor.output_type.name)
+        self.read_only = (service_name, self.method_name) in READ_ONLY_METHODS
+
+
+# Unary methods without side effects: safe to retry, and identical concurrent
+# calls can share one backend round trip
+READ_ONLY_METHODS: FrozenSet[Tuple[str, str]] = frozenset({
+    ("sessions", "GetMessages"),
+    ("sessions", "GetMemory"),
+    ("models", "ListModels"),
+    ("models", "GetModelCapabilities"),
+    ("models", "GetPrompt"),
+    ("models", "ListPrompts"),
+    ("models", "ListRegisteredModels"),
+    ("models", "GetModelStatus"),
+})
+
+# Platform service name (x-target-service value) -> (pb2 module, proto service name)
+PLATFORM_SERVICES = {
+    "sessions": (sessions_pb2, "SessionService"),
+    "models": (models_pb2, "ModelService"),
+}
+
+
+def _build_method_table() -> Dict[str, MethodInfo]:
+    """Index every platform service method by its gRPC path."""
+    methods: Dict[str, MethodInfo] = {}
+    for service_name, (pb2_module, proto_service) in PLATFORM_SERVICES.items():
+        service_descriptor = pb2_module.DESCRIPTOR.services_by_name[proto_service]
+        for method_descriptor in service_descriptor.methods:
+            info = MethodInfo(service_name, method_descriptor, pb2_module)
+            methods[info.path] = info
+    return methods
+
+
+# gRPC method path (e.g. "/proto.SessionService/GetMessages") -> MethodInfo
+METHODS_BY_PATH: Dict[str, MethodInfo] = _build_method_table()
+
+# (service_name, method_name) -> MethodInfo
+METHODS_BY_NAME: Dict[tuple, MethodInfo] = {
+    (info.service_name, info.method_name): info for info in METHODS_BY_PATH.values()
+}
+
+
+def get_method(service_name: str, method_name: str) -> Optional[MethodInfo]:
+    """Look up a method by platform service name and RPC name."""
+    return METHODS_BY_NAME.get((service_name, method_name))
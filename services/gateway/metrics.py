@@ -0,0 +1,272 @@
+"""
+Gateway Metrics - Prometheus-style counters, gauges and histograms.
+
+Recorded on every proxied call by the gRPC proxy and the HTTP handler and
+served as Prometheus text from the /metrics path of the HTTP server:
+- Requests per (protocol, service, method, status)
+- Request latency histograms
+- Calls in flight
+- Stream durations and time to the first streamed message (first token)
+- Bytes forwarded in each direction
+
+Recording is a dictionary update under one lock (a few microseconds), so
+there is no dependency on prometheus_client. Stats already kept by other
+gateway components (channel pool, cache, admission, replicas) are added at
+scrape time through collectors.
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# Stream duration histogram bucket upper bounds, in seconds
+STREAM_BUCKETS: Tuple[float, ...] = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# (protocol, service, method)
+CallLabels = Tuple[str, str, str]
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets (one per label set)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class GatewayMetrics:
+    """Metrics registry shared by the gateway's gRPC and HTTP servers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (protocol, service, method, status) -> count
+        self._requests: Dict[Tuple[str, str, str, str], int] = {}
+        self._latency: Dict[CallLabels, Histogram] = {}
+        self._in_flight: Dict[CallLabels, int] = {}
+        self._stream_duration: Dict[CallLabels, Histogram] = {}
+        self._first_message: Dict[CallLabels, Histogram] = {}
+        # (protocol, service, direction) -> bytes
+        self._bytes: Dict[Tuple[str, str, str], int] = {}
+        # (protocol, service, method, reason) -> calls dropped before forwarding
+        self._shed: Dict[Tuple[str, str, str, str], int] = {}
+        # (prefix, stats callable, label for per-key stats)
+        self._collectors: List[Tuple[str, Callable[[], Dict], Optional[str]]] = []
+
+    def add_collector(self, prefix: str, collect: Callable[[], Dict], label: Optional[str] = None):
+        """
+        Export a component's stats() as gauges named gateway_<prefix>_<stat>.
+
+        Args:
+            prefix: Metric name prefix (e.g. "channel_pool")
+            collect: Returns {stat: value}; dict values ({key: value}) are
+                exported with a "name" label
+            label: If set, collect returns {key: {stat: value}} and each key
+                becomes a label with this name (e.g. "address" for replicas)
+        """
+        self._collectors.append((prefix, collect, label))
+
+    def call_started(self, protocol: str, service: str, method: str):
+        """Count a call as in flight."""
+        labels = (protocol, service, method)
+        with self._lock:
+            self._in_flight[labels] = self._in_flight.get(labels, 0) + 1
+
+    def call_finished(
+        self,
+        protocol: str,
+        service: str,
+        method: str,
+        status: str,
+        duration: float,
+        streaming: bool = False,
+    ):
+        """Record a finished call started with call_started()."""
+        labels = (protocol, service, method)
+        with self._lock:
+            self._in_flight[labels] -= 1
+            self._record_locked(labels, status, duration, streaming)
+
+    def observe(self, protocol: str, service: str, method: str, status: str, duration: float):
+        """Record a call that was never in flight (cache hit, rejection, ...)."""
+        with self._lock:
+            self._record_locked((protocol, service, method), status, duration, False)
+
+    def first_message(self, protocol: str, service: str, method: str, delay: float):
+        """Record the time from the start of a streaming call to its first message."""
+        labels = (protocol, service, method)
+        with self._lock:
+            histogram = self._first_message.get(labels)
+            if histogram is None:
+                histogram = self._first_message[labels] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(delay)
+
+    def add_bytes(self, protocol: str, service: str, direction: str, count: int):
+        """Count bytes forwarded ("sent" to the backend or "received" from it)."""
+        key = (protocol, service, direction)
+        with self._lock:
+            self._bytes[key] = self._bytes.get(key, 0) + count
+
+    def shed(self, protocol: str, service: str, method: str, reason: str):
+        """Count a call dropped by the gateway instead of forwarded (expired deadline, overload)."""
+        key = (protocol, service, method, reason)
+        with self._lock:
+            self._shed[key] = self._shed.get(key, 0) + 1
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            requests = dict(self._requests)
+            latency = {labels: _copy_histogram(h) for labels, h in self._latency.items()}
+            in_flight = dict(self._in_flight)
+            streams = {labels: _copy_histogram(h) for labels, h in self._stream_duration.items()}
+            first_messages = {labels: _copy_histogram(h) for labels, h in self._first_message.items()}
+            forwarded = dict(self._bytes)
+            shed = dict(self._shed)
+
+        lines = [
+            "# HELP gateway_requests_total Proxied calls by final status.",
+            "# TYPE gateway_requests_total counter",
+        ]
+        for (protocol, service, method, status), count in sorted(requests.items()):
+            labels = _format_labels(protocol=protocol, service=service, method=method, status=status)
+            lines.append(f"gateway_requests_total{labels} {count}")
+
+        lines += [
+            "# HELP gateway_request_duration_seconds Time from receiving a call to its final status.",
+            "# TYPE gateway_request_duration_seconds histogram",
+        ]
+        for call_labels, histogram in sorted(latency.items()):
+            _render_histogram(lines, "gateway_request_duration_seconds", call_labels, histogram)
+
+        lines += [
+            "# HELP gateway_in_flight_requests Proxied calls currently in progress.",
+            "# TYPE gateway_in_flight_requests gauge",
+        ]
+        for (protocol, service, method), count in sorted(in_flight.items()):
+            labels = _format_labels(protocol=protocol, service=service, method=method)
+            lines.append(f"gateway_in_flight_requests{labels} {count}")
+
+        lines += [
+            "# HELP gateway_stream_duration_seconds Lifetime of server-streaming calls.",
+            "# TYPE gateway_stream_duration_seconds histogram",
+        ]
+        for call_labels, histogram in sorted(streams.items()):
+            _render_histogram(lines, "gateway_stream_duration_seconds", call_labels, histogram)
+
+        lines += [
+            "# HELP gateway_stream_first_message_seconds Time from receiving a streaming call to its first message.",
+            "# TYPE gateway_stream_first_message_seconds histogram",
+        ]
+        for call_labels, histogram in sorted(first_messages.items()):
+            _render_histogram(lines, "gateway_stream_first_message_seconds", call_labels, histogram)
+
+        lines += [
+            "# HELP gateway_forwarded_bytes_total Payload bytes forwarded to and from backends.",
+            "# TYPE gateway_forwarded_bytes_total counter",
+        ]
+        for (protocol, service, direction), count in sorted(forwarded.items()):
+            labels = _format_labels(protocol=protocol, service=service, direction=direction)
+            lines.append(f"gateway_forwarded_bytes_total{labels} {count}")
+
+        lines += [
+            "# HELP gateway_shed_requests_total Calls dropped instead of forwarded, by reason.",
+            "# TYPE gateway_shed_requests_total counter",
+        ]
+        for (protocol, service, method, reason), count in sorted(shed.items()):
+            labels = _format_labels(protocol=protocol, service=service, method=method, reason=reason)
+            lines.append(f"gateway_shed_requests_total{labels} {count}")
+
+        for prefix, collect, label in self._collectors:
+            stats = collect()
+            if label is None:
+                _render_collected(lines, f"gateway_{prefix}", stats, {})
+            else:
+                for key, key_stats in sorted(stats.items()):
+                    _render_collected(lines, f"gateway_{prefix}", key_stats, {label: key})
+
+        return "\n".join(lines) + "\n"
+
+    def _record_locked(self, labels: CallLabels, status: str, duration: float, streaming: bool):
+        key = labels + (status,)
+        self._requests[key] = self._requests.get(key, 0) + 1
+
+        histogram = self._latency.get(labels)
+        if histogram is None:
+            histogram = self._latency[labels] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(duration)
+
+        if streaming:
+            histogram = self._stream_duration.get(labels)
+            if histogram is None:
+                histogram = self._stream_duration[labels] = Histogram(STREAM_BUCKETS)
+            histogram.observe(duration)
+
+
+def payload_size(message) -> int:
+    """Serialized size of a forwarded message (raw bytes or pb2 message)."""
+    if isinstance(message, bytes):
+        return len(message)
+    return message.ByteSize()
+
+
+def _copy_histogram(histogram: Histogram) -> Histogram:
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.sum = histogram.sum
+    copy.count = histogram.count
+    return copy
+
+
+def _render_histogram(lines: List[str], name: str, call_labels: CallLabels, histogram: Histogram):
+    protocol, service, method = call_labels
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        labels = _format_labels(protocol=protocol, service=service, method=method, le=repr(bound))
+        lines.append(f"{name}_bucket{labels} {cumulative}")
+    labels = _format_labels(protocol=protocol, service=service, method=method, le="+Inf")
+    lines.append(f"{name}_bucket{labels} {histogram.count}")
+    labels = _format_labels(protocol=protocol, service=service, method=method)
+    lines.append(f"{name}_sum{labels} {histogram.sum}")
+    lines.append(f"{name}_count{labels} {histogram.count}")
+
+
+def _render_collected(lines: List[str], prefix: str, stats: Dict, labels: Dict[str, str]):
+    for name, value in sorted(stats.items()):
+        if isinstance(value, dict):
+            # {"in_flight": {limit: n}} -> gateway_<prefix>_in_flight{name="limit"}
+            for inner_name, inner_value in sorted(value.items()):
+                if _is_number(inner_value):
+                    sample_labels = _format_labels(**labels, name=inner_name)
+                    lines.append(f"{prefix}_{name}{sample_labels} {inner_value}")
+        elif _is_number(value):
+            sample_labels = _format_labels(**labels) if labels else ""
+            lines.append(f"{prefix}_{name}{sample_labels} {value}")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _format_labels(**labels: str) -> str:
+    parts = []
+    for name, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
@@ -0,0 +1,259 @@
+"""
+Traffic Mirroring - Replays a sample of live calls against shadow backends.
+
+Before a new Model Service build is promoted it can be given real
+production traffic: for configured services or methods ("models",
+"models.Chat") a sample of calls is copied to a shadow address and the
+shadow's responses are discarded. Clients only ever see the primary
+backend's response.
+
+Mirroring stays off the primary path:
+- Copies are sent from a small, separate thread pool with its own channels
+- When that pool's queue is full the copy is dropped, never waited for
+- Shadow errors and timeouts are only counted
+
+For every mirrored call the primary and shadow outcomes are compared:
+latency of each, errors of each, and calls whose status codes differ.
+Shadow calls are also recorded in the gateway metrics with
+protocol="shadow".
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent import futures
+from typing import Dict, Optional
+
+import grpc
+
+from services.gateway.channel_pool import ChannelPool
+from services.gateway.methods import MethodInfo
+from services.gateway.metrics import GatewayMetrics
+
+
+class MirrorRule:
+    """Where to mirror a service's (or method's) calls, and how many of them."""
+
+    def __init__(self, address: str, sample: float = 1.0, timeout: float = 30.0):
+        """
+        Args:
+            address: Shadow backend address ("host:port")
+            sample: Fraction of calls to mirror (0-1)
+            timeout: Deadline for shadow calls in seconds
+        """
+        self.address = address
+        self.sample = sample
+        self.timeout = timeout
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "MirrorRule":
+        return cls(
+            address=config["address"],
+            sample=config.get("sample", 1.0),
+            timeout=config.get("timeout", 30.0),
+        )
+
+
+class _Comparison:
+    """Primary vs shadow counters for one method."""
+
+    __slots__ = (
+        "mirrored",
+        "compared",
+        "primary_errors",
+        "shadow_errors",
+        "status_mismatches",
+        "primary_seconds",
+        "shadow_seconds",
+        "shadow_slower",
+    )
+
+    def __init__(self):
+        self.mirrored = 0
+        self.compared = 0
+        self.primary_errors = 0
+        self.shadow_errors = 0
+        self.status_mismatches = 0
+        self.primary_seconds = 0.0
+        self.shadow_seconds = 0.0
+        self.shadow_slower = 0
+
+
+class MirroredCall:
+    """
+    A call sent to both the primary and a shadow backend.
+
+    The proxy reports the primary outcome with primary_finished(); the
+    comparison is recorded once both sides have finished, in either order.
+    """
+
+    __slots__ = ("_mirror", "_key", "_lock", "_primary", "_shadow")
+
+    def __init__(self, mirror: "TrafficMirror", key: str):
+        self._mirror = mirror
+        self._key = key
+        self._lock = threading.Lock()
+        self._primary = None
+        self._shadow = None
+
+    def primary_finished(self, status: str, duration: float):
+        with self._lock:
+            self._primary = (status, duration)
+            done = self._shadow is not None
+        if done:
+            self._mirror._compare(self._key, self._primary, self._shadow)
+
+    def _shadow_finished(self, status: str, duration: float):
+        with self._lock:
+            self._shadow = (status, duration)
+            done = self._primary is not None
+        if done:
+            self._mirror._compare(self._key, self._primary, self._shadow)
+
+
+class TrafficMirror:
+    """Sends sampled copies of proxied calls to shadow backends."""
+
+    def __init__(
+        self,
+        rules: Dict[str, MirrorRule],
+        max_workers: int = 4,
+        max_queue: int = 100,
+        metrics: Optional[GatewayMetrics] = None,
+    ):
+        """
+        Args:
+            rules: Mirror rules keyed by service or service.method
+                ("models", "models.Chat"); the method rule wins
+            max_workers: Threads sending shadow calls
+            max_queue: Shadow calls allowed to wait or run at once; further
+                copies are dropped
+            metrics: Metrics registry to record shadow calls in
+        """
+        self.rules = rules
+        self.max_queue = max_queue
+        self.metrics = metrics or GatewayMetrics()
+
+        # Separate from the proxy's workers and channels, so a slow or
+        # broken shadow cannot hold up primary calls
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mirror")
+        self._channel_pool = ChannelPool()
+        self._slots = threading.BoundedSemaphore(max_queue)
+
+        self._lock = threading.Lock()
+        self._comparisons: Dict[str, _Comparison] = {}
+        self._dropped = 0
+
+    @classmethod
+    def from_json(cls, config_json: str, metrics: Optional[GatewayMetrics] = None) -> "TrafficMirror":
+        """Build a mirror from a JSON config string."""
+        config = json.loads(config_json)
+        return cls(
+            rules={name: MirrorRule.from_dict(c) for name, c in config.get("rules", {}).items()},
+            max_workers=config.get("max_workers", 4),
+            max_queue=config.get("max_queue", 100),
+            metrics=metrics,
+        )
+
+    def rule_for(self, service_name: str, method_name: str) -> Optional[MirrorRule]:
+        rule = self.rules.get(f"{service_name}.{method_name}")
+        if rule is None:
+            rule = self.rules.get(service_name)
+        return rule
+
+    def submit(self, method: MethodInfo, request) -> Optional[MirroredCall]:
+        """
+        Mirror a call if it is sampled; never blocks.
+
+        Returns the MirroredCall to report the primary outcome to, or None
+        if the call is not mirrored.
+        """
+        rule = self.rule_for(method.service_name, method.method_name)
+        if rule is None or random.random() >= rule.sample:
+            return None
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._dropped += 1
+            return None
+
+        key = f"{method.service_name}.{method.method_name}"
+        mirrored = MirroredCall(self, key)
+        try:
+            self._executor.submit(self._call_shadow, rule, method, request, mirrored)
+        except RuntimeError:
+            # Executor shut down
+            self._slots.release()
+            return None
+        with self._lock:
+            comparison = self._comparisons.get(key)
+            if comparison is None:
+                comparison = self._comparisons[key] = _Comparison()
+            comparison.mirrored += 1
+        return mirrored
+
+    def stats(self) -> Dict[str, object]:
+        """Dropped copies, and primary vs shadow comparison per mirrored method."""
+        with self._lock:
+            comparisons = list(self._comparisons.items())
+            return {
+                "dropped": self._dropped,
+                "mirrored": {key: c.mirrored for key, c in comparisons},
+                "compared": {key: c.compared for key, c in comparisons},
+                "primary_errors": {key: c.primary_errors for key, c in comparisons},
+                "shadow_errors": {key: c.shadow_errors for key, c in comparisons},
+                "status_mismatches": {key: c.status_mismatches for key, c in comparisons},
+                "primary_seconds_total": {key: c.primary_seconds for key, c in comparisons},
+                "shadow_seconds_total": {key: c.shadow_seconds for key, c in comparisons},
+                "shadow_slower": {key: c.shadow_slower for key, c in comparisons},
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self._channel_pool.close()
+
+    def _call_shadow(self, rule: MirrorRule, method: MethodInfo, request, mirrored: MirroredCall):
+        started_at = time.perf_counter()
+        status = "OK"
+        pooled = None
+        error = None
+        try:
+            if not isinstance(request, bytes):
+                request = request.SerializeToString()
+            pooled = self._channel_pool.acquire(rule.address)
+            call = pooled.raw_method(method.path, method.server_streaming)
+            if method.server_streaming:
+                # Drain the stream; only its outcome and duration matter
+                for _ in call(request, timeout=rule.timeout):
+                    pass
+            else:
+                call(request, timeout=rule.timeout)
+        except grpc.RpcError as e:
+            error = e
+            status = e.code().name
+        except Exception:
+            status = "INTERNAL"
+        finally:
+            if pooled is not None:
+                self._channel_pool.release(pooled, error)
+            self._slots.release()
+        duration = time.perf_counter() - started_at
+        self.metrics.observe("shadow", method.service_name, method.method_name, status, duration)
+        mirrored._shadow_finished(status, duration)
+
+    def _compare(self, key: str, primary, shadow):
+        primary_status, primary_duration = primary
+        shadow_status, shadow_duration = shadow
+        with self._lock:
+            c = self._comparisons[key]
+            c.compared += 1
+            c.primary_seconds += primary_duration
+            c.shadow_seconds += shadow_duration
+            if primary_status != "OK":
+                c.primary_errors += 1
+            if shadow_status != "OK":
+                c.shadow_errors += 1
+            if primary_status != shadow_status:
+                c.status_mismatches += 1
+            if shadow_duration > primary_duration:
+                c.shadow_slower += 1
@@ -0,0 +1,82 @@
+"""
+Byte Passthrough - Forwards platform service calls without parsing them.
+
+The generated-servicer proxies (SessionServiceProxy, ModelServiceProxy)
+deserialize every request into pb2 objects, re-serialize it for the backend
+stub and do the same again for the response. In passthrough mode a
+grpc.GenericRpcHandler routes on the method path plus x-target-service and
+forwards the raw request and response bytes unchanged.
+"""
+
+from typing import Optional
+
+import grpc
+
+from services.gateway.grpc_proxy import GenericProxy
+from services.gateway.methods import METHODS_BY_PATH, PLATFORM_SERVICES, MethodInfo
+
+
+class PassthroughHandler(grpc.GenericRpcHandler):
+    """
+    Generic RPC handler that forwards serialized messages as-is.
+
+    Supports unary and server-streaming methods of every service in
+    the gateway method table.
+    """
+
+    def __init__(self, proxy: GenericProxy):
+        self.proxy = proxy
+        # One handler per method path, built lazily and reused
+        self._handlers = {}
+
+    def service(self, handler_call_details):
+        """Return the RPC handler for a method path, or None if unknown."""
+        handler = self._handlers.get(handler_call_details.method)
+        if handler is not None:
+            return handler
+
+        method = METHODS_BY_PATH.get(handler_call_details.method)
+        if method is None:
+            # gRPC answers UNIMPLEMENTED
+            return None
+
+        # No (de)serializers: the behavior receives and returns raw bytes
+        if method.server_streaming:
+            handler = grpc.unary_stream_rpc_method_handler(self._stream_behavior(method))
+        else:
+            handler = grpc.unary_unary_rpc_method_handler(self._unary_behavior(method))
+        self._handlers[handler_call_details.method] = handler
+        return handler
+
+    def _unary_behavior(self, method: MethodInfo):
+        def behavior(request: bytes, context):
+            if not check_target(method, self.proxy._extract_target_service(context), context):
+                return b""
+            return self.proxy.forward_raw(method, request, context)
+        return behavior
+
+    def _stream_behavior(self, method: MethodInfo):
+        def behavior(request: bytes, context):
+            if not check_target(method, self.proxy._extract_target_service(context), context):
+                return iter(())
+            return self.proxy.forward_raw(method, request, context)
+        return behavior
+
+
+def check_target(method: MethodInfo, target_service: Optional[str], context) -> bool:
+    """Validate x-target-service against the service owning the method path."""
+    if not target_service:
+        context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+        context.set_details("Missing x-target-service metadata")
+        return False
+    if target_service not in PLATFORM_SERVICES:
+        context.set_code(grpc.StatusCode.NOT_FOUND)
+        context.set_details(f"Service '{target_service}' not found")
+        return False
+    if target_service != method.service_name:
+        context.set_code(grpc.StatusCode.NOT_FOUND)
+        context.set_details(
+            f"Method '{method.path}' not found on service '{target_service}'"
+        )
+        return False
+    return True
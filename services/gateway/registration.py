@@ -0,0 +1,153 @@
+"""
+Registration Service - Lets platform service replicas join and leave at runtime.
+
+Replicas call Register at startup and Heartbeat periodically (see
+services/shared/registration.py). A registration that misses heartbeats
+for its TTL is evicted from the routing table, so crashed or scaled-down
+replicas stop receiving traffic without a gateway restart.
+
+The servicer is served directly by the gateway's gRPC server (no
+x-target-service metadata is needed). Since a registration takes traffic,
+every call must be authorized by a shared token in the
+"x-registration-token" metadata or come from an allowlisted network; with
+neither configured, dynamic registration is disabled. Only the platform
+services the gateway knows (methods.PLATFORM_SERVICES) can be registered.
+"""
+
+import hmac
+import ipaddress
+import math
+import threading
+import time
+from typing import Iterable, Optional
+
+import grpc
+
+from proto import registry_pb2
+from proto import registry_pb2_grpc
+from services.gateway.methods import PLATFORM_SERVICES
+from services.gateway.registry import ServiceRegistry
+
+
+TOKEN_METADATA_KEY = "x-registration-token"
+
+
+def _peer_host(peer: str) -> str:
+    """Host part of a gRPC peer string ("ipv4:10.0.0.5:4312" -> "10.0.0.5", "unix:..." -> "unix")."""
+    kind, _, rest = peer.partition(":")
+    if kind == "unix":
+        return "unix"
+    host = rest.rpartition(":")[0] if kind in ("ipv4", "ipv6") else rest
+    return host.strip("[]")
+
+
+class RegistrationServicer(registry_pb2_grpc.RegistryServiceServicer):
+    """Handles Register / Heartbeat / Deregister calls from service replicas."""
+
+    def __init__(
+        self,
+        registry: ServiceRegistry,
+        default_ttl: float = 15.0,
+        max_ttl: float = 300.0,
+        token: Optional[str] = None,
+        allowed_networks: Iterable[str] = (),
+    ):
+        """
+        Args:
+            registry: Registry whose routing table is updated
+            default_ttl: TTL for registrations that do not ask for one
+            max_ttl: Upper bound on requested TTLs
+            token: Shared secret callers send in "x-registration-token"
+            allowed_networks: Caller networks admitted without a token
+                (IPs or CIDRs, "unix" for Unix socket peers)
+        """
+        self.registry = registry
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self.token = token or None
+        self.allow_unix = False
+        self.allowed_networks = []
+        for network in allowed_networks:
+            network = network.strip()
+            if network == "unix":
+                self.allow_unix = True
+            elif network:
+                self.allowed_networks.append(ipaddress.ip_network(network, strict=False))
+
+    def Register(self, request, context):
+        """Register (or re-register) a replica with a TTL."""
+        if not self._authorize(context):
+            return registry_pb2.RegisterResponse()
+        if not request.service_name or not request.address:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("service_name and address are required")
+            return registry_pb2.RegisterResponse()
+        if request.service_name not in PLATFORM_SERVICES:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(f"Unknown platform service: {request.service_name}")
+            return registry_pb2.RegisterResponse()
+        if request.ttl_seconds < 0 or math.isnan(request.ttl_seconds):
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("ttl_seconds must be positive (0 uses the gateway default)")
+            return registry_pb2.RegisterResponse()
+
+        ttl = min(request.ttl_seconds or self.default_ttl, self.max_ttl)
+        self.registry.register_platform_service(request.service_name, request.address, ttl=ttl)
+        return registry_pb2.RegisterResponse(
+            ttl_seconds=ttl,
+            # Three heartbeats per TTL: one lost heartbeat does not evict
+            heartbeat_interval_seconds=ttl / 3,
+        )
+
+    def Heartbeat(self, request, context):
+        """Renew a registration; registered=False asks the replica to register again."""
+        if not self._authorize(context):
+            return registry_pb2.HeartbeatResponse()
+        registered = self.registry.heartbeat(request.service_name, request.address)
+        return registry_pb2.HeartbeatResponse(registered=registered)
+
+    def Deregister(self, request, context):
+        """Remove a replica from the routing table."""
+        if not self._authorize(context):
+            return registry_pb2.DeregisterResponse()
+        success = self.registry.deregister_platform_service(request.service_name, request.address)
+        return registry_pb2.DeregisterResponse(success=success)
+
+    def _authorize(self, context) -> bool:
+        """Whether the caller sent the token or is on an allowed network; fails the call if not."""
+        if self.token is not None:
+            sent = dict(context.invocation_metadata()).get(TOKEN_METADATA_KEY, "")
+            if hmac.compare_digest(sent.encode(), self.token.encode()):
+                return True
+        if self._peer_allowed(context.peer()):
+            return True
+
+        if self.token is None and not self.allowed_networks and not self.allow_unix:
+            context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+            context.set_details("Dynamic registration is disabled on this gateway")
+        else:
+            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
+            context.set_details("Missing or invalid registration token")
+        return False
+
+    def _peer_allowed(self, peer: str) -> bool:
+        host = _peer_host(peer)
+        if host == "unix":
+            return self.allow_unix
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.allowed_networks)
+
+
+def start_expiry_thread(registry: ServiceRegistry, interval: float = 1.0) -> threading.Thread:
+    """Evict expired registrations every `interval` seconds on a daemon thread."""
+    def run():
+        while True:
+            time.sleep(interval)
+            registry.evict_expired()
+
+    thread = threading.Thread(target=run, name="registry-expiry", daemon=True)
+    thread.start()
+    return thread
@@ -4,9 +4,38 @@ Service Registry - Tracks available backend services and workflows.
 The registry maintains mappings for:
 - Platform services (sessions, models, data, etc.) for internal gRPC routing
 - Workflow services (user-defined workflows) for external HTTP routing
+
+Each service or workflow can have several replicas. A pluggable load
+balancing policy (see balancer.py) picks one per request. Replicas that
+keep failing are ejected until they recover, and a circuit breaker per
+replica (see circuit_breaker.py) takes sick replicas - high error rate or
+slow calls - out of rotation and probes them before letting traffic back.
+
+Replicas either come from static configuration or register themselves
+with a TTL (see registration.py) and expire unless they heartbeat. Route
+tables are copy-on-write: writers build a new table and swap it in, so
+the request path reads them without taking a lock.
+
+Calls with an affinity key (see affinity.py) are routed by consistent
+hashing with bounded loads, so one session keeps reaching one replica.
+
+Addresses are host:port or "unix:" socket paths. A local host:port is
+dialed over the service's Unix socket when it listens on one (see
+services/shared/transport.py), falling back to TCP otherwise; the
+registry keeps tracking the replica under its registered address.
+
+Workflow paths are routed by a radix trie (see routing.py): patterns may
+contain parameter segments ("/tenants/{tenant}/assistant") and route every
+path below them, the longest match winning.
 """
 
-from typing import Dict, List
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from services.gateway.balancer import ConsistentHashBalancer, Replica, create_balancer
+from services.gateway.circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError
+from services.gateway.routing import WorkflowRouter, split_path
 
 
 class ServiceRegistry:
@@ -18,39 +47,294 @@ class ServiceRegistry:
     - Workflow services (user-defined workflows) for external HTTP routing
     """
     
-    def __init__(self):
-        # Platform services: service_name -> [addresses]
-        self._platform_services: Dict[str, List[str]] = {}
-        # Workflows: api_path -> [addresses]
-        self._workflows: Dict[str, List[str]] = {}
+    def __init__(
+        self,
+        policy: str = "round_robin",
+        max_failures: int = 3,
+        ejection_time: float = 10.0,
+        max_ejection_time: float = 300.0,
+        circuit_breakers: bool = True,
+        breaker_settings: Optional[Dict[str, float]] = None,
+        hash_load_factor: float = 1.25,
+    ):
+        """
+        Initialize the registry.
+        
+        Args:
+            policy: Load balancing policy ("round_robin", "least_outstanding", "power_of_two")
+            max_failures: Consecutive failures before a replica is ejected
+            ejection_time: Seconds a replica stays ejected the first time
+            max_ejection_time: Upper bound for ejection time (doubles per repeated ejection)
+            circuit_breakers: Give every replica an error-rate / latency circuit breaker
+            breaker_settings: CircuitBreaker keyword arguments (thresholds, window, ...)
+            hash_load_factor: Load bound for calls routed by affinity key
+                (see ConsistentHashBalancer)
+        """
+        # Route tables, replaced (never mutated) under _write_lock
+        # Platform services: service_name -> (addresses)
+        self._platform_services: Dict[str, Tuple[str, ...]] = {}
+        # Workflows: path pattern -> (addresses), and the trie matching request paths to patterns
+        self._workflows: Dict[str, Tuple[str, ...]] = {}
+        self._workflow_router = WorkflowRouter()
+        
+        # Load and health state per address, shared by all routes to it
+        self._replicas: Dict[str, Replica] = {}
+        # Dynamic registrations: (service_name, address) -> (expires_at, ttl)
+        self._leases: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._write_lock = threading.Lock()
+        self._balancer = create_balancer(policy)
+        self._hash_balancer = ConsistentHashBalancer(hash_load_factor)
+        self.policy = policy
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.circuit_breakers = circuit_breakers
+        self.breaker_settings = dict(breaker_settings or {})
+        self._lock = threading.Lock()
     
-    def register_platform_service(self, service_name: str, address: str):
-        """Register a platform service (sessions, models, etc.)."""
-        if service_name not in self._platform_services:
-            self._platform_services[service_name] = []
-        if address not in self._platform_services[service_name]:
-            self._platform_services[service_name].append(address)
-            print(f"Registered platform service '{service_name}' at {address}")
+    def register_platform_service(self, service_name: str, address: str, ttl: Optional[float] = None):
+        """
+        Register a platform service (sessions, models, etc.).
+        
+        Args:
+            service_name: Service the replica serves
+            address: Replica address (host:port or unix:/path/to.sock)
+            ttl: Seconds until the registration expires unless renewed with
+                heartbeat() (None = static, never expires)
+        """
+        with self._write_lock:
+            key = (service_name, address)
+            addresses = self._platform_services.get(service_name, ())
+            if ttl is None:
+                self._leases.pop(key, None)
+            elif key in self._leases or address not in addresses:
+                self._leases[key] = (time.monotonic() + ttl, ttl)
+            # else: already registered statically, which never expires
+            
+            if address in addresses:
+                return
+            self._add_replica(address)
+            self._platform_services = {**self._platform_services, service_name: addresses + (address,)}
+        print(f"Registered platform service '{service_name}' at {address}")
+    
+    def heartbeat(self, service_name: str, address: str) -> bool:
+        """
+        Renew a dynamic registration for another TTL.
+        
+        Returns:
+            False if the replica is not registered (it expired or the gateway
+            restarted) and must register again
+        """
+        key = (service_name, address)
+        with self._write_lock:
+            lease = self._leases.get(key)
+            if lease is None:
+                # Static registrations need no renewal
+                return address in self._platform_services.get(service_name, ())
+            ttl = lease[1]
+            self._leases[key] = (time.monotonic() + ttl, ttl)
+            return True
+    
+    def deregister_platform_service(self, service_name: str, address: str) -> bool:
+        """Remove a platform service replica. Returns False if it was not registered."""
+        with self._write_lock:
+            self._leases.pop((service_name, address), None)
+            if not self._remove_platform_address_locked(service_name, address):
+                return False
+        print(f"Deregistered platform service '{service_name}' at {address}")
+        return True
+    
+    def evict_expired(self) -> List[Tuple[str, str]]:
+        """Remove dynamic registrations whose TTL passed; returns (service, address) pairs."""
+        now = time.monotonic()
+        with self._write_lock:
+            expired = [key for key, (expires_at, _) in self._leases.items() if expires_at <= now]
+            for service_name, address in expired:
+                del self._leases[(service_name, address)]
+                self._remove_platform_address_locked(service_name, address)
+        for service_name, address in expired:
+            print(f"Registration of '{service_name}' at {address} expired")
+        return expired
     
     def register_workflow(self, api_path: str, address: str):
-        """Register a workflow service."""
-        if api_path not in self._workflows:
-            self._workflows[api_path] = []
-        if address not in self._workflows[api_path]:
-            self._workflows[api_path].append(address)
-            print(f"Registered workflow '{api_path}' at {address}")
-    
-    def get_platform_service_address(self, service_name: str) -> str:
-        """Get address for a platform service."""
-        addresses = self._platform_services.get(service_name, [])
+        """
+        Register a workflow service.
+        
+        Args:
+            api_path: Path pattern the workflow serves, with optional parameter
+                segments ("/patient-assistant", "/tenants/{tenant}/assistant");
+                requests to paths below it are routed to it as well
+            address: Replica address
+        """
+        api_path = "/" + "/".join(split_path(api_path))
+        with self._write_lock:
+            addresses = self._workflows.get(api_path, ())
+            if address in addresses:
+                return
+            router = self._workflow_router if addresses else self._workflow_router.add(api_path)
+            self._add_replica(address)
+            # Table first: a pattern the router matches always has addresses
+            self._workflows = {**self._workflows, api_path: addresses + (address,)}
+            self._workflow_router = router
+        print(f"Registered workflow '{api_path}' at {address}")
+    
+    def get_platform_service_address(self, service_name: str, affinity_key: Optional[str] = None) -> str:
+        """
+        Get address for a platform service.
+        
+        Args:
+            service_name: Service to route to
+            affinity_key: Session or user the call belongs to; calls with the
+                same key go to the same replica (None = balancing policy)
+        """
+        addresses = self._platform_services.get(service_name, ())
         if not addresses:
             raise ValueError(f"Platform service '{service_name}' not registered")
-        return addresses[0]  # Simple: use first address
+        return self._pick(service_name, addresses, affinity_key)
     
     def get_workflow_address(self, api_path: str) -> str:
-        """Get address for a workflow based on API path."""
-        addresses = self._workflows.get(api_path, [])
-        if not addresses:
-            raise ValueError(f"Workflow '{api_path}' not registered")
-        return addresses[0]  # Simple: use first address
-
+        """Get address for a workflow based on API path (picked by the balancing policy)."""
+        # Registered patterns are their own route; other paths go through the trie
+        route = api_path if api_path in self._workflows else self.get_workflow_route(api_path)
+        return self._pick(route, self._workflows[route])
+    
+    def get_workflow_route(self, api_path: str) -> str:
+        """Longest registered workflow pattern matching a request path."""
+        match = self._workflow_router.match(api_path)
+        if match is None:
+            raise ValueError(f"No workflow registered for '{api_path}'")
+        return match[0]
+    
+    # Request accounting (reported by the gateway for every forwarded call)
+    
+    def request_started(self, address: str):
+        """Count a request as in flight on a replica."""
+        replica = self._replicas.get(address)
+        if replica is not None:
+            with self._lock:
+                replica.in_flight += 1
+                if replica.breaker is not None:
+                    replica.breaker.on_call_started(time.monotonic())
+    
+    def request_finished(self, address: str, success: bool = True, duration: Optional[float] = None):
+        """
+        Record the end of a request on a replica.
+        
+        Args:
+            address: Replica the request was sent to
+            success: False if the replica itself failed (unavailable, timed out).
+                Application errors from a healthy replica count as success.
+            duration: Latency of a unary call in seconds, checked against the
+                circuit breaker's slow-call threshold (None for streams)
+        """
+        replica = self._replicas.get(address)
+        if replica is None:
+            return
+        with self._lock:
+            replica.in_flight -= 1
+            if replica.breaker is not None:
+                breaker = replica.breaker
+                was_closed = breaker.state == CLOSED
+                breaker.on_call_finished(success, duration, time.monotonic())
+                if was_closed and breaker.state != CLOSED:
+                    print(f"Circuit opened for replica {address}")
+            if success:
+                replica.consecutive_failures = 0
+                replica.ejections = 0
+                return
+            
+            replica.consecutive_failures += 1
+            if replica.consecutive_failures >= self.max_failures:
+                self._eject_locked(replica)
+    
+    def get_affinity_stats(self) -> Dict[str, float]:
+        """Calls routed by affinity key, and how many spilled past their home replica."""
+        return self._hash_balancer.stats()
+    
+    def get_replica_stats(self) -> Dict[str, Dict[str, float]]:
+        """Snapshot of per-replica load and health."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                address: {
+                    "in_flight": replica.in_flight,
+                    "consecutive_failures": replica.consecutive_failures,
+                    "ejected": 0 if replica.ejected_until <= now else 1,
+                    # 0 = closed, 1 = open, 2 = half-open
+                    "circuit_state": replica.breaker.state if replica.breaker is not None else CLOSED,
+                }
+                for address, replica in self._replicas.items()
+            }
+    
+    # Private helpers
+    
+    def _add_replica(self, address: str):
+        if address not in self._replicas:
+            breaker = CircuitBreaker(**self.breaker_settings) if self.circuit_breakers else None
+            self._replicas = {**self._replicas, address: Replica(address, breaker)}
+    
+    def _remove_platform_address_locked(self, service_name: str, address: str) -> bool:
+        """Drop an address from a service's route table (caller holds _write_lock)."""
+        addresses = self._platform_services.get(service_name, ())
+        if address not in addresses:
+            return False
+        remaining = tuple(a for a in addresses if a != address)
+        platform_services = dict(self._platform_services)
+        if remaining:
+            platform_services[service_name] = remaining
+        else:
+            del platform_services[service_name]
+        self._platform_services = platform_services
+        
+        # Forget load/health state once no route uses the address
+        in_use = any(address in routes for routes in self._platform_services.values())
+        in_use = in_use or any(address in routes for routes in self._workflows.values())
+        if not in_use:
+            self._replicas = {a: r for a, r in self._replicas.items() if a != address}
+        return True
+    
+    def _pick(self, pool_name: str, addresses: Tuple[str, ...], affinity_key: Optional[str] = None) -> str:
+        """
+        Pick a replica among the addresses, skipping ejected ones and open circuits.
+        
+        A call with an affinity key goes to the key's replica on the hash
+        ring of available replicas, so ejections only move that replica's keys.
+        
+        Raises:
+            CircuitOpenError: If every replica's circuit is open
+        """
+        now = time.monotonic()
+        # A route table read just before a deregistration may list an address
+        # whose replica state is already gone
+        replica_map = self._replicas
+        replicas = [replica_map[address] for address in addresses if address in replica_map]
+        if not replicas:
+            return addresses[0]
+        available = [replica for replica in replicas if replica.is_available(now)]
+        if not available:
+            closed = [
+                replica for replica in replicas
+                if replica.breaker is None or replica.breaker.allows(now)
+            ]
+            if not closed:
+                # Fail fast instead of queueing calls on sick replicas
+                raise CircuitOpenError(f"Circuit open for every replica of '{pool_name}'")
+            # Every replica is ejected: fail open on the one that returns first
+            return min(closed, key=lambda replica: replica.ejected_until).address
+        if len(available) == 1:
+            return available[0].address
+        if affinity_key is not None:
+            return self._hash_balancer.pick(pool_name, available, affinity_key).address
+        return self._balancer.pick(pool_name, available).address
+    
+    def _eject_locked(self, replica: Replica):
+        """Take a replica out of rotation, backing off on repeated ejections."""
+        ejection_time = min(
+            self.ejection_time * (2 ** replica.ejections),
+            self.max_ejection_time,
+        )
+        replica.ejected_until = time.monotonic() + ejection_time
+        replica.ejections += 1
+        # After the ejection expires, a single failure ejects it again
+        replica.consecutive_failures = self.max_failures - 1
+        print(f"Ejected replica {replica.address} for {ejection_time:.0f}s")
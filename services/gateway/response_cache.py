@@ -0,0 +1,169 @@
+"""
+Response Cache - Gateway-side cache for idempotent read RPCs.
+
+Discovery and prompt reads (ListModels, GetModelCapabilities, GetPrompt, ...)
+are called on nearly every workflow request but change rarely. The cache
+keeps their responses keyed on (service, method, serialized request bytes):
+- Per-method TTLs
+- LRU eviction within a byte budget
+- Invalidation when a matching write (RegisterPrompt, RegisterModel) is
+  routed through the gateway
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+
+# Cacheable read methods: (service, method) -> TTL in seconds
+DEFAULT_CACHE_TTLS: Dict[Tuple[str, str], float] = {
+    ("models", "ListModels"): 30.0,
+    ("models", "GetModelCapabilities"): 300.0,
+    ("models", "GetPrompt"): 60.0,
+    ("models", "ListPrompts"): 30.0,
+    ("models", "ListRegisteredModels"): 30.0,
+}
+
+# Writes that invalidate cached reads: (service, method) -> read methods of that service
+DEFAULT_INVALIDATIONS: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ("models", "RegisterPrompt"): ("GetPrompt", "ListPrompts"),
+    ("models", "RegisterModel"): ("ListModels", "GetModelCapabilities", "ListRegisteredModels"),
+}
+
+CacheKey = Tuple[str, str, bytes]
+
+
+class ResponseCache:
+    """
+    Byte-budgeted LRU cache of unary responses.
+
+    Values are stored as returned by the backend (pb2 messages, or raw
+    bytes in passthrough mode) and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttls: Optional[Dict[Tuple[str, str], float]] = None,
+        invalidations: Optional[Dict[Tuple[str, str], Iterable[str]]] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Total size of cached responses before LRU eviction
+            ttls: Cacheable methods and their TTLs (defaults to DEFAULT_CACHE_TTLS)
+            invalidations: Write methods and the reads they invalidate
+                (defaults to DEFAULT_INVALIDATIONS)
+        """
+        self.max_bytes = max_bytes
+        self.ttls = dict(ttls) if ttls is not None else dict(DEFAULT_CACHE_TTLS)
+        self.invalidations = {
+            write: tuple(reads)
+            for write, reads in (invalidations if invalidations is not None else DEFAULT_INVALIDATIONS).items()
+        }
+
+        self._lock = threading.Lock()
+        # key -> (response, size, expires_at), least recently used first
+        self._entries: "OrderedDict[CacheKey, Tuple[object, int, float]]" = OrderedDict()
+        # (service, method) -> keys, for invalidation
+        self._keys_by_method: Dict[Tuple[str, str], Set[CacheKey]] = {}
+        # Bumped on invalidation so responses fetched before it are not stored
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._bytes = 0
+
+        # Counters for gateway stats
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidated = 0
+
+    def make_key(self, service_name: str, method_name: str, request) -> Optional[CacheKey]:
+        """Build the cache key for a request, or None if the method is not cacheable."""
+        if (service_name, method_name) not in self.ttls:
+            return None
+        if isinstance(request, bytes):
+            request_bytes = request
+        else:
+            request_bytes = request.SerializeToString(deterministic=True)
+        return (service_name, method_name, request_bytes)
+
+    def lookup(self, key: CacheKey) -> Tuple[Optional[object], int]:
+        """
+        Look up a cached response.
+
+        Returns:
+            Tuple of (response or None, generation). Pass the generation to
+            put() so a response fetched across an invalidation is dropped.
+        """
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generations.get(key[:2], 0)
+            entry = self._entries.get(key)
+            if entry is not None:
+                response, size, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return response, generation
+                self._remove_locked(key)
+            self._misses += 1
+            return None, generation
+
+    def put(self, key: CacheKey, response, generation: int):
+        """Store a successful response."""
+        size = len(response) if isinstance(response, bytes) else response.ByteSize()
+        size += len(key[2])
+        if size > self.max_bytes:
+            return
+
+        method_key = key[:2]
+        expires_at = time.monotonic() + self.ttls[method_key]
+        with self._lock:
+            if self._generations.get(method_key, 0) != generation:
+                return
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = (response, size, expires_at)
+            self._keys_by_method.setdefault(method_key, set()).add(key)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+                self._evictions += 1
+
+    def invalidate_after(self, service_name: str, method_name: str):
+        """Drop cached reads affected by a successful write (no-op for other methods)."""
+        reads = self.invalidations.get((service_name, method_name))
+        if not reads:
+            return
+        with self._lock:
+            for read in reads:
+                method_key = (service_name, read)
+                self._generations[method_key] = self._generations.get(method_key, 0) + 1
+                for key in list(self._keys_by_method.get(method_key, ())):
+                    self._remove_locked(key)
+                    self._invalidated += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of hit/miss counters and cache size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidated,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove_locked(self, key: CacheKey):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        keys = self._keys_by_method.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
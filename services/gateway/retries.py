@@ -0,0 +1,149 @@
+"""
+Retries - Bounded, jittered retries for idempotent backend calls.
+
+A read that fails because a replica is briefly unavailable can safely be
+sent again (usually to another replica). To keep retries from multiplying
+load during an outage:
+- Only idempotent unary reads are retried, and only on UNAVAILABLE
+- Each call gets a few attempts, with exponential backoff and full jitter
+- A gateway-wide retry budget caps retries at a fraction of recent traffic
+- No attempt starts without time left before the client's deadline
+"""
+
+import random
+import threading
+import time
+from typing import Dict, FrozenSet, Optional, Tuple
+
+import grpc
+
+from services.gateway.methods import READ_ONLY_METHODS
+
+
+# Unary read methods that are safe to send more than once
+IDEMPOTENT_METHODS: FrozenSet[Tuple[str, str]] = READ_ONLY_METHODS
+
+# Status codes that mean the request did not reach a healthy backend
+RETRYABLE_CODES: FrozenSet[grpc.StatusCode] = frozenset({
+    grpc.StatusCode.UNAVAILABLE,
+})
+
+
+class RetryBudget:
+    """
+    Gateway-wide limit on retries.
+
+    Every call deposits `ratio` tokens and every retry spends one, so
+    retries stay below `ratio` of overall traffic. A small floor
+    (`min_retries_per_second`) keeps retries possible at low traffic.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_retries_per_second: float = 1.0,
+        max_tokens: float = 100.0,
+    ):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+
+        self._lock = threading.Lock()
+        self._tokens = max_tokens
+        self._updated_at = time.monotonic()
+
+        # Counters for gateway stats
+        self._retries = 0
+        self._exhausted = 0
+
+    def record_call(self):
+        """Deposit tokens for an original (non-retry) call."""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False if it is exhausted."""
+        now = time.monotonic()
+        with self._lock:
+            self._tokens = min(
+                self.max_tokens,
+                self._tokens + (now - self._updated_at) * self.min_retries_per_second,
+            )
+            self._updated_at = now
+            if self._tokens < 1.0:
+                self._exhausted += 1
+                return False
+            self._tokens -= 1.0
+            self._retries += 1
+            return True
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of retries taken and refused."""
+        with self._lock:
+            return {
+                "retries": self._retries,
+                "budget_exhausted": self._exhausted,
+                "tokens": self._tokens,
+            }
+
+
+class RetryPolicy:
+    """When and how long to wait before retrying a failed backend call."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        initial_backoff: float = 0.025,
+        max_backoff: float = 0.5,
+        multiplier: float = 2.0,
+        budget: Optional[RetryBudget] = None,
+        methods: FrozenSet[Tuple[str, str]] = IDEMPOTENT_METHODS,
+    ):
+        """
+        Args:
+            max_attempts: Total attempts per call, including the first one
+            initial_backoff: Upper bound of the first (jittered) backoff, in seconds
+            max_backoff: Cap on the backoff upper bound, in seconds
+            multiplier: Backoff growth per attempt
+            budget: Shared retry budget (a default one is created otherwise)
+            methods: (service, method) pairs that may be retried
+        """
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.budget = budget or RetryBudget()
+        self.methods = methods
+
+    def is_retryable(self, service_name: str, method_name: str) -> bool:
+        return (service_name, method_name) in self.methods
+
+    def next_backoff(
+        self,
+        attempt: int,
+        error: grpc.RpcError,
+        time_remaining: Optional[float],
+    ) -> Optional[float]:
+        """
+        Decide whether to retry after a failed attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            error: Error returned by the last attempt
+            time_remaining: Seconds left before the client's deadline (None = no deadline)
+
+        Returns:
+            Seconds to sleep before the next attempt, or None to give up
+        """
+        if attempt >= self.max_attempts or error.code() not in RETRYABLE_CODES:
+            return None
+        # Full jitter spreads retries from many callers over the backoff window
+        backoff = random.uniform(0, min(self.max_backoff, self.initial_backoff * self.multiplier ** (attempt - 1)))
+        if time_remaining is not None and backoff >= time_remaining:
+            return None
+        if not self.budget.try_spend():
+            return None
+        return backoff
+
+    def stats(self) -> Dict[str, float]:
+        return self.budget.stats()
@@ -0,0 +1,151 @@
+"""
+Workflow Routing - Radix-trie router for workflow API paths.
+
+Workflows are registered under path patterns made of "/"-separated
+segments. A segment is either literal ("patient-assistant") or a parameter
+("{tenant}") that matches any one segment:
+
+    /patient-assistant
+    /tenants/{tenant}/assistant
+
+A pattern also routes every path below it, and the longest matching pattern
+wins: with both patterns above registered, "/patient-assistant/123" goes to
+the first and "/tenants/acme/assistant/chat" to the second. Between
+matches of the same length, literal segments win over parameters.
+
+Patterns are stored in a radix trie over path segments (runs of literal
+segments without branches share one edge), so the cost of a lookup depends
+on the request path, not on how many workflows are registered. The trie is immutable:
+add() returns a new router that shares every untouched node with the old
+one, which fits the registry's copy-on-write route tables.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+def split_path(path: str) -> List[str]:
+    """Path segments, ignoring empty ones ("/a//b/" -> ["a", "b"])."""
+    return [segment for segment in path.split("/") if segment]
+
+
+def _param_name(segment: str) -> Optional[str]:
+    if len(segment) > 2 and segment[0] == "{" and segment[-1] == "}":
+        return segment[1:-1]
+    return None
+
+
+class _Node:
+    """Trie node reached over `prefix` (literal segments) from its parent."""
+
+    __slots__ = ("prefix", "static", "param", "param_name", "route")
+
+    def __init__(self, prefix: Tuple[str, ...] = ()):
+        self.prefix = prefix
+        # First segment of a child's prefix -> child
+        self.static: Dict[str, "_Node"] = {}
+        # Child matching any one segment, and the parameter it binds
+        self.param: Optional["_Node"] = None
+        self.param_name: Optional[str] = None
+        # Pattern registered at this node
+        self.route: Optional[str] = None
+
+    def copy(self, prefix: Optional[Tuple[str, ...]] = None) -> "_Node":
+        node = _Node(self.prefix if prefix is None else prefix)
+        node.static = dict(self.static)
+        node.param = self.param
+        node.param_name = self.param_name
+        node.route = self.route
+        return node
+
+
+def _insert(node: _Node, segments: List[str], route: str) -> _Node:
+    """Copy of `node` with `route` added at `segments` below it (path copying)."""
+    node = node.copy()
+    if not segments:
+        node.route = route
+        return node
+
+    name = _param_name(segments[0])
+    if name is not None:
+        if node.param is not None and node.param_name != name:
+            raise ValueError(
+                f"Parameter '{{{name}}}' in '{route}' conflicts with '{{{node.param_name}}}' at the same position"
+            )
+        node.param = _insert(node.param or _Node(), segments[1:], route)
+        node.param_name = name
+        return node
+
+    child = node.static.get(segments[0])
+    if child is None:
+        # New edge over the literal segments up to the next parameter
+        literal = 1
+        while literal < len(segments) and _param_name(segments[literal]) is None:
+            literal += 1
+        child = _Node(tuple(segments[:literal]))
+        node.static[segments[0]] = _insert(child, segments[literal:], route)
+        return node
+
+    common = 1
+    limit = min(len(child.prefix), len(segments))
+    while common < limit and child.prefix[common] == segments[common]:
+        common += 1
+    if common < len(child.prefix):
+        # Split the edge where the new pattern branches off
+        tail = child.copy(child.prefix[common:])
+        child = _Node(child.prefix[:common])
+        child.static[tail.prefix[0]] = tail
+    node.static[segments[0]] = _insert(child, segments[common:], route)
+    return node
+
+
+class WorkflowRouter:
+    """Immutable radix trie of workflow path patterns (see module docstring)."""
+
+    def __init__(self, root: Optional[_Node] = None):
+        self._root = root or _Node()
+
+    def add(self, pattern: str) -> "WorkflowRouter":
+        """
+        Router with `pattern` added; this one is left unchanged.
+
+        Raises:
+            ValueError: If a parameter clashes with a differently named one
+                at the same position ("/a/{id}" vs "/a/{name}")
+        """
+        return WorkflowRouter(_insert(self._root, split_path(pattern), pattern))
+
+    def match(self, path: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Longest pattern routing `path`.
+
+        Args:
+            path: Request path without query string
+
+        Returns:
+            (pattern, parameters) or None if no pattern matches
+        """
+        segments = split_path(path)
+        count = len(segments)
+        best = None
+
+        # Depth-first, literal edges before parameters; only nodes with both
+        # kinds of children are ever revisited
+        stack: List[Tuple[_Node, int, Tuple[Tuple[str, str], ...]]] = [(self._root, 0, ())]
+        while stack:
+            node, position, values = stack.pop()
+            if node.route is not None and (best is None or position > best[1]):
+                best = (node.route, position, values)
+            if position == count:
+                continue
+            if node.param is not None:
+                stack.append((node.param, position + 1, values + ((node.param_name, segments[position]),)))
+            child = node.static.get(segments[position])
+            if child is not None:
+                prefix = child.prefix
+                end = position + len(prefix)
+                if end <= count and all(segments[position + i] == prefix[i] for i in range(1, len(prefix))):
+                    stack.append((child, end, values))
+
+        if best is None:
+            return None
+        return best[0], dict(best[2])
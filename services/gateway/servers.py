@@ -2,46 +2,220 @@
 Server Creation - Factory functions for creating HTTP and gRPC servers.
 """
 
-from http.server import HTTPServer
+from http.server import ThreadingHTTPServer
 from concurrent import futures
+from typing import Optional
 import grpc
 
 from proto import models_pb2_grpc
+from proto import registry_pb2_grpc
 from proto import sessions_pb2_grpc
 from services.gateway.registry import ServiceRegistry
+from services.gateway.admission import AdmissionController
+from services.gateway.affinity import SessionAffinity
+from services.gateway.channel_pool import ChannelPool
+from services.gateway.response_cache import ResponseCache
+from services.gateway.retries import RetryPolicy
+from services.gateway.singleflight import SingleFlight
+from services.gateway.stream_buffer import StreamBuffers
+from services.gateway.mirroring import TrafficMirror
+from services.gateway.bulkheads import BulkheadInterceptor, Bulkheads
 from services.gateway.grpc_proxy import GenericProxy, SessionServiceProxy, ModelServiceProxy
+from services.gateway.passthrough import PassthroughHandler
+from services.gateway.aio_proxy import AioGenericProxy, AioPassthroughHandler
+from services.gateway.registration import RegistrationServicer
 from services.gateway.http_handler import WorkflowHTTPHandler
+from services.gateway.http_pool import HTTPConnectionPool
+from services.gateway.metrics import GatewayMetrics
+from services.gateway.transcoding import Transcoder
+from services.shared.compression import CompressionPolicy, message_size_options
+from services.shared.transport import add_listen_ports
 
 
-def create_http_server(registry: ServiceRegistry, port: int = 8080):
-    """Create HTTP server for external client requests."""
+def create_http_server(
+    registry: ServiceRegistry,
+    port: int = 8080,
+    connection_pool: Optional[HTTPConnectionPool] = None,
+    metrics: Optional[GatewayMetrics] = None,
+    transcoder: Optional[Transcoder] = None,
+):
+    """
+    Create HTTP server for external client requests.
+    
+    Each client connection is served on its own thread, and requests are
+    forwarded to workflows over pooled keep-alive connections. Gateway
+    metrics are served on /metrics. With a transcoder, JSON POSTs to
+    /v1/<service>/<Method> call platform services directly.
+    """
+    connection_pool = connection_pool or HTTPConnectionPool()
+    metrics = metrics or GatewayMetrics()
+    
     def handler(*args, **kwargs):
-        return WorkflowHTTPHandler(registry, *args, **kwargs)
+        return WorkflowHTTPHandler(registry, connection_pool, metrics, transcoder, *args, **kwargs)
     
-    server = HTTPServer(('', port), handler)
+    server = ThreadingHTTPServer(('', port), handler)
     return server
 
 
-def create_grpc_server(registry: ServiceRegistry, port: int = 50051):
-    """Create and configure the gateway gRPC server for internal service communication."""
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+def create_grpc_server(
+    registry: ServiceRegistry,
+    port: int = 50051,
+    channel_pool: Optional[ChannelPool] = None,
+    passthrough: bool = False,
+    response_cache: Optional[ResponseCache] = None,
+    admission: Optional[AdmissionController] = None,
+    metrics: Optional[GatewayMetrics] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    default_timeout: Optional[float] = None,
+    registration: Optional[RegistrationServicer] = None,
+    singleflight: Optional[SingleFlight] = None,
+    compression: Optional[CompressionPolicy] = None,
+    stream_buffers: Optional[StreamBuffers] = None,
+    mirror: Optional[TrafficMirror] = None,
+    affinity: Optional[SessionAffinity] = None,
+    bulkheads: Optional[Bulkheads] = None,
+    max_send_message_bytes: Optional[int] = None,
+    max_receive_message_bytes: Optional[int] = None,
+):
+    """
+    Create and configure the gateway gRPC server for internal service communication.
     
-    # Create generic proxy
-    proxy = GenericProxy(registry)
+    Args:
+        registry: Service registry used for routing
+        port: Port to listen on
+        channel_pool: Optional backend channel pool (a default one is created otherwise)
+        passthrough: Forward raw request/response bytes instead of parsing
+            them through the generated servicer interfaces
+        response_cache: Optional cache for idempotent read RPCs
+        admission: Optional per-tenant / per-method rate and concurrency limits
+        metrics: Metrics registry to record calls in (share it with the HTTP
+            server so they are served on /metrics)
+        retry_policy: Optional retries for idempotent reads
+        default_timeout: Backend timeout for unary calls without a client deadline
+        registration: Servicer for replica Register/Heartbeat calls (a default
+            one for this registry is created otherwise)
+        singleflight: Optional coalescing of identical concurrent reads
+        compression: Optional per-method compression of large messages
+        stream_buffers: Optional bounded read-ahead for streamed responses
+        mirror: Optional copying of sampled calls to shadow backends
+        affinity: Optional session/user affinity routing by consistent hashing
+        bulkheads: Optional per-traffic-class concurrency pools; the worker
+            pool is then sized to run and queue every class at its limits
+            (10 shared workers otherwise)
+        max_send_message_bytes: Largest response sent to clients (default from
+            GRPC_MAX_SEND_MESSAGE_MB, see services/shared/compression.py)
+        max_receive_message_bytes: Largest request accepted from clients
+    """
+    max_workers = 10
+    interceptors = ()
+    if bulkheads is not None:
+        # Streams cannot take the workers that quick reads need
+        max_workers = bulkheads.max_workers
+        metrics = metrics or GatewayMetrics()
+        interceptors = (BulkheadInterceptor(bulkheads, metrics),)
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        interceptors=interceptors,
+        options=message_size_options(max_send_message_bytes, max_receive_message_bytes),
+    )
     
-    # Register proxy handlers for each platform service interface
-    # Each handler is minimal - just reads metadata and forwards
-    sessions_pb2_grpc.add_SessionServiceServicer_to_server(
-        SessionServiceProxy(proxy),
-        server
+    # Create generic proxy (backend channels are pooled and reused)
+    proxy = GenericProxy(
+        registry,
+        channel_pool=channel_pool,
+        response_cache=response_cache,
+        admission=admission,
+        metrics=metrics,
+        retry_policy=retry_policy,
+        default_timeout=default_timeout,
+        singleflight=singleflight,
+        compression=compression,
+        stream_buffers=stream_buffers,
+        mirror=mirror,
+        affinity=affinity,
     )
-    models_pb2_grpc.add_ModelServiceServicer_to_server(
-        ModelServiceProxy(proxy),
+    
+    if passthrough:
+        # Route on method path + x-target-service, forward bytes unchanged
+        server.add_generic_rpc_handlers((PassthroughHandler(proxy),))
+    else:
+        # Register proxy handlers for each platform service interface
+        # Each handler is minimal - just reads metadata and forwards
+        sessions_pb2_grpc.add_SessionServiceServicer_to_server(
+            SessionServiceProxy(proxy),
+            server
+        )
+        models_pb2_grpc.add_ModelServiceServicer_to_server(
+            ModelServiceProxy(proxy),
+            server
+        )
+    
+    # Replicas register and heartbeat with the gateway itself
+    registry_pb2_grpc.add_RegistryServiceServicer_to_server(
+        registration or RegistrationServicer(registry),
         server
     )
     
-    listen_addr = f'[::]:{port}'
-    server.add_insecure_port(listen_addr)
+    # TCP, plus a Unix socket for co-located workflows (GRPC_UNIX_SOCKET_DIR)
+    add_listen_ports(server, port)
     
     return server
 
+
+def create_aio_grpc_server(
+    registry: ServiceRegistry,
+    port: int = 50051,
+    channel_pool: Optional[ChannelPool] = None,
+    response_cache: Optional[ResponseCache] = None,
+    admission: Optional[AdmissionController] = None,
+    metrics: Optional[GatewayMetrics] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    default_timeout: Optional[float] = None,
+    registration: Optional[RegistrationServicer] = None,
+    singleflight: Optional[SingleFlight] = None,
+    compression: Optional[CompressionPolicy] = None,
+    stream_buffers: Optional[StreamBuffers] = None,
+    mirror: Optional[TrafficMirror] = None,
+    affinity: Optional[SessionAffinity] = None,
+    max_send_message_bytes: Optional[int] = None,
+    max_receive_message_bytes: Optional[int] = None,
+) -> grpc.aio.Server:
+    """
+    Create the asyncio (grpc.aio) gateway gRPC server.
+    
+    Every proxied call runs as a coroutine instead of occupying a worker
+    thread, so long-lived streams do not starve other RPCs. Requests are
+    forwarded as raw bytes (same routing as passthrough mode).
+    
+    Must be called from within a running event loop.
+    """
+    server = grpc.aio.server(
+        options=message_size_options(max_send_message_bytes, max_receive_message_bytes),
+        # Unary responses can only be compressed server-wide (see AioGenericProxy._compress_response)
+        compression=compression.server_algorithm if compression is not None else None,
+    )
+    
+    proxy = AioGenericProxy(
+        registry,
+        channel_pool=channel_pool,
+        response_cache=response_cache,
+        admission=admission,
+        metrics=metrics,
+        retry_policy=retry_policy,
+        default_timeout=default_timeout,
+        singleflight=singleflight,
+        compression=compression,
+        stream_buffers=stream_buffers,
+        mirror=mirror,
+        affinity=affinity,
+    )
+    server.add_generic_rpc_handlers((AioPassthroughHandler(proxy),))
+    registry_pb2_grpc.add_RegistryServiceServicer_to_server(
+        registration or RegistrationServicer(registry),
+        server
+    )
+    
+    # TCP, plus a Unix socket for co-located workflows (GRPC_UNIX_SOCKET_DIR)
+    add_listen_ports(server, port)
+    
+    return server
@@ -0,0 +1,163 @@
+"""
+Single Flight - Request coalescing for identical concurrent reads.
+
+Bursty workflows often send the same read several times at once (e.g.
+GetMemory for one user from parallel steps). While a read is in flight,
+identical requests - same method and request bytes - wait for it and
+share its response (or error) instead of making their own backend round
+trip. Only read-only methods are coalesced.
+
+Waiters are bounded by their own deadline, not the leader's: the shared
+call runs with a timeout of its own (see GenericProxy), a waiter whose
+deadline passes fails with FlightTimeout, and errors that only describe
+the leader's call (DEADLINE_EXCEEDED, CANCELLED) are not shared - waiters
+make their own call instead.
+"""
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional, Tuple
+
+import grpc
+
+from services.gateway.methods import READ_ONLY_METHODS
+
+
+# (service, method, serialized request)
+FlightKey = Tuple[str, str, bytes]
+
+# Timeout of a shared backend call when the gateway has no default timeout
+DEFAULT_CALL_TIMEOUT = 30.0
+
+# Outcomes that belong to the leader's call rather than to the request
+_LEADER_CODES = frozenset({grpc.StatusCode.DEADLINE_EXCEEDED, grpc.StatusCode.CANCELLED})
+
+
+class FlightTimeout(Exception):
+    """Raised when a waiter's deadline passes before the shared call finishes."""
+
+
+def _leader_error(error: BaseException) -> bool:
+    return isinstance(error, grpc.RpcError) and hasattr(error, "code") and error.code() in _LEADER_CODES
+
+
+class _Flight:
+    """A backend call shared by its leader and any waiters."""
+
+    __slots__ = ("done", "response", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplicates identical in-flight read calls.
+
+    do() is used by the threaded gateway and do_async() by the asyncio one;
+    each keeps its own table of calls in flight.
+    """
+
+    def __init__(
+        self,
+        methods: FrozenSet[Tuple[str, str]] = READ_ONLY_METHODS,
+        call_timeout: float = DEFAULT_CALL_TIMEOUT,
+    ):
+        """
+        Args:
+            methods: (service, method) pairs that may be coalesced
+            call_timeout: Timeout of a shared backend call when the gateway
+                has no default timeout (it is never shorter than the
+                leader's remaining time)
+        """
+        self.methods = methods
+        self.call_timeout = call_timeout
+
+        self._lock = threading.Lock()
+        self._flights: Dict[FlightKey, _Flight] = {}
+        self._tasks: Dict[FlightKey, asyncio.Future] = {}
+
+        # Counters for gateway stats
+        self._calls = 0
+        self._coalesced = 0
+
+    def is_coalesced(self, service_name: str, method_name: str) -> bool:
+        return (service_name, method_name) in self.methods
+
+    def make_key(self, service_name: str, method_name: str, request) -> FlightKey:
+        if isinstance(request, bytes):
+            return (service_name, method_name, request)
+        return (service_name, method_name, request.SerializeToString(deterministic=True))
+
+    def do(self, key: FlightKey, call: Callable[[], object], timeout: Optional[float] = None):
+        """
+        Run call(), or wait for an identical call already in flight and share its outcome.
+
+        Args:
+            key: Flight key (make_key)
+            call: This caller's backend call; a waiter runs it itself if the
+                shared call failed for reasons of the leader's own
+            timeout: Seconds this caller can wait (its remaining deadline)
+
+        Raises:
+            FlightTimeout: If `timeout` passed while waiting
+        """
+        with self._lock:
+            self._calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            if not flight.done.wait(timeout):
+                raise FlightTimeout("Deadline passed while waiting for an identical call in flight")
+            if flight.error is not None:
+                if _leader_error(flight.error):
+                    return call()
+                raise flight.error
+            return flight.response
+
+        try:
+            flight.response = call()
+            return flight.response
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def do_async(self, key: FlightKey, call: Callable[[], Awaitable]):
+        """Async variant of do(); the shared call keeps running if its first caller is cancelled."""
+        with self._lock:
+            self._calls += 1
+            task = self._tasks.get(key)
+            leader = task is None
+            if leader:
+                task = self._tasks[key] = asyncio.ensure_future(call())
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            else:
+                self._coalesced += 1
+        # Waiters are cancelled by grpc.aio at their own deadline
+        try:
+            return await asyncio.shield(task)
+        except grpc.RpcError as e:
+            if leader or not _leader_error(e):
+                raise
+        return await call()
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of coalescing counters."""
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "coalesced": self._coalesced,
+                "coalesced_ratio": self._coalesced / self._calls if self._calls else 0.0,
+                "in_flight": len(self._flights) + len(self._tasks),
+            }
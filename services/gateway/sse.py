@@ -0,0 +1,112 @@
+"""
+Server-Sent Events - Relays streaming platform calls to browsers.
+
+Transcoded server-streaming methods (ChatStream) can be consumed as an
+event stream instead of NDJSON: POST with "Accept: text/event-stream", or
+GET with the JSON request in the "request" query parameter (EventSource
+only issues GETs). Each response message is written and flushed as one
+"message" event as soon as the backend produces it; the stream ends with a
+"done" event, or an "error" event if the call fails after the headers were
+sent.
+
+While the backend is quiet, comment lines are sent as heartbeats so
+proxies and load balancers keep the connection open. The client socket is
+watched while waiting, and a disconnect cancels the backend call right
+away instead of when the next token would have been written.
+"""
+
+import queue
+import select
+import socket
+import threading
+from typing import Iterator, Optional, Tuple
+
+
+SSE_CONTENT_TYPE = "text/event-stream"
+
+# Idle time after which a heartbeat comment is sent
+HEARTBEAT_INTERVAL = 15.0
+
+# How often the client socket is checked for a disconnect while waiting
+DISCONNECT_POLL_INTERVAL = 0.25
+
+HEARTBEAT = b": heartbeat\n\n"
+
+# What StreamPump.get() returns besides messages
+MESSAGE = "message"
+ERROR = "error"
+DONE = "done"
+
+
+def format_event(data: str, event: Optional[str] = None) -> bytes:
+    """Encode one event; multi-line data is split over several data: fields."""
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+def client_disconnected(sock: socket.socket) -> bool:
+    """True if the peer has closed the connection (without blocking)."""
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        # Readable with nothing to read = EOF; pipelined request data is left in place
+        return sock.recv(1, socket.MSG_PEEK) == b""
+    except (OSError, ValueError):
+        return True
+
+
+class StreamPump:
+    """
+    Reads a blocking iterator on its own thread.
+
+    Lets the HTTP handler wait for the next message with a timeout, so it
+    can send heartbeats and notice disconnects between messages. At most
+    max_buffered messages are read ahead of the client.
+    """
+
+    def __init__(self, iterator: Iterator, max_buffered: int = 16):
+        self._iterator = iterator
+        self._queue: "queue.Queue[Tuple[str, object]]" = queue.Queue(maxsize=max_buffered)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sse-pump", daemon=True)
+        self._thread.start()
+
+    def get(self, timeout: float) -> Optional[Tuple[str, object]]:
+        """Next (MESSAGE, message), (ERROR, exception) or (DONE, None); None on timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        """
+        Stop reading and close the iterator.
+
+        The iterator is closed on the pump thread once its current next()
+        returns, so cancel the underlying call first if it may block.
+        """
+        self._stopped.set()
+
+    def _run(self):
+        try:
+            for item in self._iterator:
+                if not self._put((MESSAGE, item)):
+                    return
+            self._put((DONE, None))
+        except Exception as e:
+            self._put((ERROR, e))
+        finally:
+            close = getattr(self._iterator, "close", None)
+            if close is not None:
+                close()
+
+    def _put(self, entry: Tuple[str, object]) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(entry, timeout=DISCONNECT_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
@@ -0,0 +1,280 @@
+"""
+Stream Buffering - Bounded read-ahead for streamed responses.
+
+A streamed response (ChatStream) is read from the backend by its own
+reader - a thread in the threaded gateway, a task in the asyncio one - into
+a per-stream buffer, so token generation is not paced by client jitter.
+The buffer is bounded in bytes. When a slow client lets it fill up, the
+overflow policy decides what happens:
+- "block": stop reading from the backend until the client catches up;
+  HTTP/2 flow control then pushes back on the backend
+- "cancel": cancel the backend call and end the client's stream with
+  RESOURCE_EXHAUSTED, so a client that stopped reading does not hold
+  backend capacity
+
+A single message larger than the bound is still relayed, one at a time.
+
+Every stream's buffered bytes count towards a gateway-wide total, exported
+with the peak per-stream buffer and overflow counts (gateway_stream_buffer_*
+on /metrics) for sizing gateway pods.
+"""
+
+import asyncio
+import collections
+import threading
+from typing import AsyncIterator, Callable, Dict, Iterator
+
+from services.gateway.metrics import payload_size
+
+
+BLOCK = "block"
+CANCEL = "cancel"
+OVERFLOW_POLICIES = (BLOCK, CANCEL)
+
+DEFAULT_MAX_STREAM_BYTES = 256 * 1024
+
+
+class StreamOverflowError(Exception):
+    """A client fell behind its stream by more than the buffer bound (cancel policy)."""
+
+
+class StreamBuffers:
+    """
+    Creates bounded per-stream buffers and accounts for their memory.
+
+    wrap() is used by the threaded gateway and wrap_async() by the asyncio
+    one; both share the same limits and counters.
+    """
+
+    def __init__(self, max_stream_bytes: int = DEFAULT_MAX_STREAM_BYTES, policy: str = BLOCK):
+        """
+        Args:
+            max_stream_bytes: Bytes read ahead of the client per stream
+            policy: What to do when a stream's buffer is full ("block" or "cancel")
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{policy}' (expected one of {', '.join(OVERFLOW_POLICIES)})")
+        self.max_stream_bytes = max_stream_bytes
+        self.policy = policy
+
+        self._lock = threading.Lock()
+        self._buffered_bytes = 0
+        self._streams = 0
+
+        # Counters for gateway stats
+        self._peak_stream_bytes = 0
+        self._blocked = 0
+        self._cancelled = 0
+
+    def wrap(self, iterator: Iterator, cancel: Callable[[], None]) -> "BufferedStream":
+        """Read `iterator` ahead on a thread; `cancel` stops the underlying call."""
+        return BufferedStream(self, iterator, cancel)
+
+    def wrap_async(self, iterator: AsyncIterator, cancel: Callable[[], None]) -> "AsyncBufferedStream":
+        """Read the async `iterator` ahead on a task; must be called within the event loop."""
+        return AsyncBufferedStream(self, iterator, cancel)
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of buffer memory and overflow counters."""
+        with self._lock:
+            return {
+                "buffered_bytes": self._buffered_bytes,
+                "streams": self._streams,
+                "max_stream_bytes": self.max_stream_bytes,
+                "peak_stream_bytes": self._peak_stream_bytes,
+                "blocked_total": self._blocked,
+                "overflow_cancelled_total": self._cancelled,
+            }
+
+    def _stream_opened(self):
+        with self._lock:
+            self._streams += 1
+
+    def _stream_released(self, buffered: int):
+        with self._lock:
+            self._streams -= 1
+            self._buffered_bytes -= buffered
+
+    def _buffered(self, delta: int, stream_bytes: int):
+        with self._lock:
+            self._buffered_bytes += delta
+            if stream_bytes > self._peak_stream_bytes:
+                self._peak_stream_bytes = stream_bytes
+
+    def _overflow(self) -> bool:
+        """Record a full buffer; True if the stream should be cancelled."""
+        with self._lock:
+            if self.policy == CANCEL:
+                self._cancelled += 1
+                return True
+            self._blocked += 1
+            return False
+
+    def _overflow_error(self) -> StreamOverflowError:
+        return StreamOverflowError(f"Client fell more than {self.max_stream_bytes} bytes behind the stream")
+
+
+class BufferedStream:
+    """Iterator over a stream read ahead by a background thread (see StreamBuffers.wrap)."""
+
+    def __init__(self, buffers: StreamBuffers, iterator: Iterator, cancel: Callable[[], None]):
+        self._buffers = buffers
+        self._iterator = iterator
+        self._cancel = cancel
+
+        self._condition = threading.Condition()
+        # (message, size) pairs not yet taken by the client
+        self._messages = collections.deque()
+        self._bytes = 0
+        self._done = False
+        self._released = False
+        self._error = None
+
+        buffers._stream_opened()
+        threading.Thread(target=self._read, name="stream-buffer", daemon=True).start()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._condition:
+            while not self._messages and not self._done:
+                self._condition.wait()
+            if self._messages:
+                message, size = self._messages.popleft()
+                self._bytes -= size
+                self._buffers._buffered(-size, self._bytes)
+                self._condition.notify()
+                return message
+            self._release_locked()
+            if self._error is not None:
+                raise self._error
+            raise StopIteration
+
+    def close(self):
+        """Stop reading, drop buffered messages and cancel the backend call (no-op once finished)."""
+        with self._condition:
+            self._release_locked()
+            self._condition.notify_all()
+        self._cancel()
+
+    def _release_locked(self):
+        if self._released:
+            return
+        self._released = True
+        self._messages.clear()
+        self._buffers._stream_released(self._bytes)
+        self._bytes = 0
+
+    def _read(self):
+        max_bytes = self._buffers.max_stream_bytes
+        try:
+            for message in self._iterator:
+                size = payload_size(message)
+                with self._condition:
+                    if self._messages and self._bytes + size > max_bytes:
+                        if self._buffers._overflow():
+                            self._error = self._buffers._overflow_error()
+                            break
+                        while self._messages and self._bytes + size > max_bytes and not self._released:
+                            self._condition.wait()
+                    if self._released:
+                        return
+                    self._messages.append((message, size))
+                    self._bytes += size
+                    self._buffers._buffered(size, self._bytes)
+                    self._condition.notify()
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._condition:
+                self._done = True
+                if isinstance(self._error, StreamOverflowError):
+                    # The client gets the error now rather than after the backlog
+                    self._release_locked()
+                self._condition.notify_all()
+        if isinstance(self._error, StreamOverflowError):
+            self._cancel()
+
+
+class AsyncBufferedStream:
+    """Async iterator over a stream read ahead by a task (see StreamBuffers.wrap_async)."""
+
+    def __init__(self, buffers: StreamBuffers, iterator: AsyncIterator, cancel: Callable[[], None]):
+        self._buffers = buffers
+        self._iterator = iterator
+        self._cancel = cancel
+
+        self._condition = asyncio.Condition()
+        # (message, size) pairs not yet taken by the client
+        self._messages = collections.deque()
+        self._bytes = 0
+        self._done = False
+        self._released = False
+        self._error = None
+
+        buffers._stream_opened()
+        self._task = asyncio.ensure_future(self._read())
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._messages or self._done)
+            if self._messages:
+                message, size = self._messages.popleft()
+                self._bytes -= size
+                self._buffers._buffered(-size, self._bytes)
+                self._condition.notify()
+                return message
+            self._release()
+            if self._error is not None:
+                raise self._error
+            raise StopAsyncIteration
+
+    def close(self):
+        """Stop reading, drop buffered messages and cancel the backend call (no-op once finished)."""
+        self._task.cancel()
+        self._release()
+        self._cancel()
+
+    def _release(self):
+        # Runs on the event loop without awaiting, so it needs no lock
+        if self._released:
+            return
+        self._released = True
+        self._messages.clear()
+        self._buffers._stream_released(self._bytes)
+        self._bytes = 0
+
+    async def _read(self):
+        max_bytes = self._buffers.max_stream_bytes
+        try:
+            async for message in self._iterator:
+                size = len(message)
+                async with self._condition:
+                    if self._messages and self._bytes + size > max_bytes:
+                        if self._buffers._overflow():
+                            self._error = self._buffers._overflow_error()
+                            self._release()
+                            self._cancel()
+                            break
+                        await self._condition.wait_for(
+                            lambda: not self._messages or self._bytes + size <= max_bytes
+                        )
+                    if self._released:
+                        return
+                    self._messages.append((message, size))
+                    self._bytes += size
+                    self._buffers._buffered(size, self._bytes)
+                    self._condition.notify()
+        except asyncio.CancelledError:
+            # close() was called: nobody is waiting for messages any more
+            self._done = True
+            raise
+        except Exception as e:
+            self._error = e
+        async with self._condition:
+            self._done = True
+            self._condition.notify_all()
@@ -0,0 +1,396 @@
+"""
+REST/JSON Transcoding - Calls platform services from plain HTTP clients.
+
+Non-Python clients can POST JSON to /v1/<service>/<Method> on the gateway's
+HTTP port (e.g. /v1/sessions/GetMessages) instead of going through a
+workflow container. The request is converted to the method's proto message
+and forwarded through a GenericProxy, so admission control, retries,
+circuit breakers and metrics apply as for gRPC calls. Server-streaming
+methods (ChatStream) are returned as newline-delimited JSON.
+
+The HTTP port faces outside clients and has no authentication of its own,
+so only an allowlist of methods is exposed (DEFAULT_METHODS: model
+inference and model reads); session data, memory and registrations stay on
+the internal gRPC port unless listed explicitly.
+
+JSON follows the proto3 JSON mapping (camelCase names, 64-bit integers as
+strings, bytes as base64; proto field names are accepted on input). The
+converters are compiled once per message type from the descriptors at
+startup, so a call costs a dict walk rather than json_format's per-call
+reflection.
+"""
+
+import base64
+import math
+import struct
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import grpc
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message_factory import GetMessageClass
+
+from services.gateway.grpc_proxy import GenericProxy
+from services.gateway.methods import METHODS_BY_NAME, MethodInfo
+
+
+# Routes are /v1/<service>/<Method>
+TRANSCODING_PREFIX = "/v1"
+
+# Methods exposed when no allowlist is configured
+DEFAULT_METHODS: FrozenSet[Tuple[str, str]] = frozenset({
+    ("models", "Chat"),
+    ("models", "ChatStream"),
+    ("models", "ListModels"),
+    ("models", "GetModelCapabilities"),
+})
+
+# HTTP header carrying the client's deadline in seconds (gRPC's grpc-timeout equivalent)
+TIMEOUT_HEADER = "x-request-timeout"
+
+# gRPC status -> HTTP status (as in google/rpc/code.proto)
+HTTP_STATUS: Dict[grpc.StatusCode, int] = {
+    grpc.StatusCode.OK: 200,
+    grpc.StatusCode.CANCELLED: 499,
+    grpc.StatusCode.UNKNOWN: 500,
+    grpc.StatusCode.INVALID_ARGUMENT: 400,
+    grpc.StatusCode.DEADLINE_EXCEEDED: 504,
+    grpc.StatusCode.NOT_FOUND: 404,
+    grpc.StatusCode.ALREADY_EXISTS: 409,
+    grpc.StatusCode.PERMISSION_DENIED: 403,
+    grpc.StatusCode.RESOURCE_EXHAUSTED: 429,
+    grpc.StatusCode.FAILED_PRECONDITION: 400,
+    grpc.StatusCode.ABORTED: 409,
+    grpc.StatusCode.OUT_OF_RANGE: 400,
+    grpc.StatusCode.UNIMPLEMENTED: 501,
+    grpc.StatusCode.INTERNAL: 500,
+    grpc.StatusCode.UNAVAILABLE: 503,
+    grpc.StatusCode.DATA_LOSS: 500,
+    grpc.StatusCode.UNAUTHENTICATED: 401,
+}
+
+_INT64_TYPES = frozenset({
+    FieldDescriptor.TYPE_INT64,
+    FieldDescriptor.TYPE_UINT64,
+    FieldDescriptor.TYPE_SINT64,
+    FieldDescriptor.TYPE_FIXED64,
+    FieldDescriptor.TYPE_SFIXED64,
+})
+
+
+class TranscodingError(Exception):
+    """A JSON body that does not match the method's request message."""
+
+
+class TranscodingContext:
+    """
+    Stands in for grpc.ServicerContext when a call arrives over HTTP.
+
+    Provides what GenericProxy uses: invocation metadata (HTTP headers),
+    the client's deadline, and the status / trailers set by the proxy.
+    """
+
+    def __init__(self, metadata: Iterable[Tuple[str, str]], timeout: Optional[float] = None):
+        self._metadata = tuple(metadata)
+        self._deadline = time.monotonic() + timeout if timeout else None
+        self.code = grpc.StatusCode.OK
+        self.details = ""
+        self.trailing_metadata: Tuple[Tuple[str, str], ...] = ()
+        self._callbacks: List[Callable[[], None]] = []
+
+    def invocation_metadata(self):
+        return self._metadata
+
+    def time_remaining(self) -> Optional[float]:
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def set_code(self, code: grpc.StatusCode):
+        self.code = code
+
+    def set_details(self, details: str):
+        self.details = details
+
+    def set_trailing_metadata(self, trailing_metadata):
+        self.trailing_metadata = tuple(trailing_metadata)
+
+    def set_compression(self, compression):
+        # HTTP responses are not gRPC-framed
+        pass
+
+    def disable_next_message_compression(self):
+        pass
+
+    def add_callback(self, callback: Callable[[], None]) -> bool:
+        self._callbacks.append(callback)
+        return True
+
+    def terminate(self):
+        """End the call, running callbacks (e.g. cancelling the backend stream) once."""
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def http_status(self) -> int:
+        return HTTP_STATUS.get(self.code, 500)
+
+    def error_body(self) -> dict:
+        return {"error": {"code": self.code.name, "message": self.details}}
+
+
+def _is_repeated(field) -> bool:
+    is_repeated = getattr(field, "is_repeated", None)
+    if is_repeated is None:
+        # protobuf < 5
+        return field.label == field.LABEL_REPEATED
+    return is_repeated
+
+
+def _shortest_float(value: float) -> float:
+    """Shortest decimal that round-trips a float32 (0.7, not 0.699999988079071)."""
+    for precision in range(6, 10):
+        rounded = float(f"{value:.{precision}g}")
+        if struct.unpack("f", struct.pack("f", rounded))[0] == value:
+            return rounded
+    return value
+
+
+def _float_to_json(value: float):
+    if math.isfinite(value):
+        return value
+    if math.isnan(value):
+        return "NaN"
+    return "Infinity" if value > 0 else "-Infinity"
+
+
+class MessageConverter:
+    """
+    JSON <-> proto conversion for one message type.
+
+    Per-field encoders and decoders are built once from the descriptor;
+    converters for nested message types are shared through `registry`.
+    """
+
+    def __init__(self, message_class, registry: Dict[str, "MessageConverter"]):
+        descriptor = message_class.DESCRIPTOR
+        registry[descriptor.full_name] = self
+        self.message_class = message_class
+        # field number -> (JSON name, encoder)
+        self._encoders: Dict[int, Tuple[str, Callable]] = {}
+        # JSON or proto field name -> (proto field name, decoder)
+        self._decoders: Dict[str, Tuple[str, Callable]] = {}
+
+        for field in descriptor.fields:
+            encode, decode = self._field_codec(field, registry)
+            self._encoders[field.number] = (field.json_name, encode)
+            self._decoders[field.json_name] = (field.name, decode)
+            self._decoders[field.name] = (field.name, decode)
+
+    def to_json(self, message) -> dict:
+        """Message -> JSON-compatible dict (fields at their default value are omitted)."""
+        encoders = self._encoders
+        result = {}
+        for field, value in message.ListFields():
+            json_name, encode = encoders[field.number]
+            result[json_name] = encode(value)
+        return result
+
+    def from_json(self, data) -> object:
+        """JSON object -> message; raises TranscodingError on unknown fields or bad values."""
+        if not isinstance(data, dict):
+            raise TranscodingError(f"Expected a JSON object for {self.message_class.DESCRIPTOR.name}")
+        kwargs = {}
+        for key, value in data.items():
+            decoder = self._decoders.get(key)
+            if decoder is None:
+                raise TranscodingError(
+                    f"Unknown field '{key}' in {self.message_class.DESCRIPTOR.name}"
+                )
+            if value is None:
+                # JSON null means the default value
+                continue
+            name, decode = decoder
+            kwargs[name] = decode(value)
+        try:
+            return self.message_class(**kwargs)
+        except (TypeError, ValueError) as e:
+            raise TranscodingError(f"Invalid {self.message_class.DESCRIPTOR.name}: {e}") from e
+
+    def _field_codec(self, field, registry: Dict[str, "MessageConverter"]) -> Tuple[Callable, Callable]:
+        """(encoder, decoder) for a field, including repeated and map fields."""
+        if field.message_type is not None and field.message_type.GetOptions().map_entry:
+            key_field = field.message_type.fields_by_name["key"]
+            value_field = field.message_type.fields_by_name["value"]
+            _, decode_key = self._value_codec(key_field, registry)
+            encode_value, decode_value = self._value_codec(value_field, registry)
+
+            def encode_map(value):
+                return {str(k): encode_value(v) for k, v in value.items()}
+
+            def decode_map(value):
+                if not isinstance(value, dict):
+                    raise TranscodingError(f"Expected a JSON object for '{field.name}'")
+                return {decode_key(k): decode_value(v) for k, v in value.items()}
+
+            return encode_map, decode_map
+
+        encode, decode = self._value_codec(field, registry)
+        if not _is_repeated(field):
+            return encode, decode
+
+        def encode_list(value):
+            return [encode(item) for item in value]
+
+        def decode_list(value):
+            if not isinstance(value, list):
+                raise TranscodingError(f"Expected a JSON array for '{field.name}'")
+            return [decode(item) for item in value]
+
+        return encode_list, decode_list
+
+    def _value_codec(self, field, registry: Dict[str, "MessageConverter"]) -> Tuple[Callable, Callable]:
+        """(encoder, decoder) for a single value of a field."""
+        if field.message_type is not None:
+            converter = _converter(GetMessageClass(field.message_type), registry)
+            return converter.to_json, converter.from_json
+
+        if field.type in _INT64_TYPES:
+            return str, _decode_int
+        if field.type == FieldDescriptor.TYPE_FLOAT:
+            return lambda value: _float_to_json(_shortest_float(value)), _decode_float
+        if field.type == FieldDescriptor.TYPE_DOUBLE:
+            return _float_to_json, _decode_float
+        if field.type == FieldDescriptor.TYPE_BYTES:
+            return lambda value: base64.b64encode(value).decode("ascii"), _decode_bytes
+        if field.type == FieldDescriptor.TYPE_ENUM:
+            enum_type = field.enum_type
+
+            def encode_enum(value):
+                enum_value = enum_type.values_by_number.get(value)
+                return enum_value.name if enum_value is not None else value
+
+            return encode_enum, lambda value: value
+
+        # string, bool, 32-bit integers: JSON and Python values coincide
+        identity = lambda value: value
+        return identity, identity
+
+
+def _decode_int(value) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, str, float)):
+        raise TranscodingError(f"Expected an integer, got {value!r}")
+    try:
+        result = int(value)
+    except (ValueError, OverflowError):
+        raise TranscodingError(f"Expected an integer, got {value!r}")
+    if isinstance(value, float) and result != value:
+        raise TranscodingError(f"Expected an integer, got {value!r}")
+    return result
+
+
+def _decode_float(value) -> float:
+    if isinstance(value, str) and value in ("NaN", "Infinity", "-Infinity"):
+        return float(value.replace("Infinity", "inf"))
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TranscodingError(f"Expected a number, got {value!r}")
+    return float(value)
+
+
+def _decode_bytes(value) -> bytes:
+    # Standard and URL-safe base64 are both accepted, with or without padding
+    if not isinstance(value, str):
+        raise TranscodingError(f"Expected a base64 string, got {value!r}")
+    try:
+        return base64.urlsafe_b64decode(value.replace("+", "-").replace("/", "_") + "=" * (-len(value) % 4))
+    except ValueError as e:
+        raise TranscodingError(f"Invalid base64: {e}") from e
+
+
+class Route:
+    """A transcoded method with its request and response converters."""
+
+    __slots__ = ("method", "request_converter", "response_converter")
+
+    def __init__(self, method: MethodInfo, request_converter: MessageConverter, response_converter: MessageConverter):
+        self.method = method
+        self.request_converter = request_converter
+        self.response_converter = response_converter
+
+
+class Transcoder:
+    """Routes /v1/<service>/<Method> HTTP calls to platform services through a proxy."""
+
+    def __init__(
+        self,
+        proxy: GenericProxy,
+        prefix: str = TRANSCODING_PREFIX,
+        methods: Optional[Iterable[Tuple[str, str]]] = DEFAULT_METHODS,
+    ):
+        """
+        Args:
+            proxy: Proxy used to reach backends (its admission, retries,
+                cache and metrics settings apply to transcoded calls)
+            prefix: URL prefix of the transcoded routes
+            methods: (service, method) pairs to expose (None = every method)
+
+        Raises:
+            ValueError: If an allowlisted method does not exist
+        """
+        self.proxy = proxy
+        self.prefix = prefix
+        if methods is not None:
+            methods = frozenset(methods)
+            unknown = methods - METHODS_BY_NAME.keys()
+            if unknown:
+                names = ", ".join(sorted(f"{service}.{method}" for service, method in unknown))
+                raise ValueError(f"Unknown methods in transcoding allowlist: {names}")
+
+        # Converters for every request/response type, built once
+        converters: Dict[str, MessageConverter] = {}
+        self.routes: Dict[str, Route] = {}
+        for (service_name, method_name), method in METHODS_BY_NAME.items():
+            if methods is not None and (service_name, method_name) not in methods:
+                continue
+            self.routes[f"{prefix}/{service_name}/{method_name}"] = Route(
+                method,
+                _converter(method.request_class, converters),
+                _converter(method.response_class, converters),
+            )
+
+    def match(self, path: str) -> Optional[Route]:
+        """Route for an HTTP path, or None if it is not a transcoded method."""
+        return self.routes.get(path)
+
+    def call(self, route: Route, request, context: TranscodingContext):
+        """
+        Forward a request message decoded with route.request_converter.
+
+        Returns the response as a JSON-compatible dict for unary methods and
+        an iterator of dicts for streaming methods (None if the proxy
+        rejected the call; context.code says why). Proxy errors are raised
+        after their status is set on the context.
+        """
+        response = self.proxy.forward_message(route.method, request, context)
+        if context.code != grpc.StatusCode.OK or response is None:
+            return None
+        if route.method.server_streaming:
+            return self._stream(route, response)
+        return route.response_converter.to_json(response)
+
+    @staticmethod
+    def _stream(route: Route, responses):
+        to_json = route.response_converter.to_json
+        try:
+            for message in responses:
+                yield to_json(message)
+        finally:
+            # Propagates a client disconnect to the backend stream
+            responses.close()
+
+
+def _converter(message_class, converters: Dict[str, MessageConverter]) -> MessageConverter:
+    converter = converters.get(message_class.DESCRIPTOR.full_name)
+    if converter is None:
+        converter = MessageConverter(message_class, converters)
+    return converter
@@ -0,0 +1,333 @@
+"""
+Response Cache - Exact-match cache for deterministic Chat requests.
+
+Deterministic calls (temperature 0 classification and extraction prompts)
+are often repeated verbatim across users. With a cache configured, the
+Model Service answers a repeat of such a call from the cache instead of
+the provider:
+- The key is a hash of the canonical request: resolved model name,
+  messages, ChatConfig, tools, response_format and resolved system prompt
+  text (so a new prompt version is a new key)
+- Only calls that set a temperature <= max_temperature (default 0) are
+  cached; without one the provider samples at its own default
+- Entries expire after a TTL and the least recently used ones are evicted
+  to stay within a byte budget
+- Chat and ChatStream share entries: a cached text response is replayed as
+  a stream, and a completed stream fills the cache for both
+- Responses served from the cache have `cached` set (ChatResponse and
+  every replayed ChatChunk), so the mark reaches clients through the
+  gateway in every proxy mode
+
+Backends are in-process (MemoryCacheBackend) or a SQLite file
+(SQLiteCacheBackend) that survives restarts and can be shared by replicas
+on one host.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from proto import models_pb2
+
+
+# Bumped when the key derivation changes, so old SQLite entries stop matching
+KEY_VERSION = b"v1"
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 3600.0
+
+
+class CacheBackend(ABC):
+    """Byte store with per-entry TTL and a byte budget."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Value stored under `key`, or None if missing or expired."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, key: str, value: bytes, ttl: float) -> None:
+        """Store `value`, evicting least recently used entries to stay within budget."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Entries, bytes used and evictions."""
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU (per replica, lost on restart)."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (expires_at, value), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, value: bytes, ttl: float) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self._evictions}
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(key) + len(value)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    LRU in a SQLite file.
+
+    Entries survive restarts, and processes on one host can share the file
+    (expiry uses wall-clock time for that reason). The byte budget is
+    enforced by the process that writes; it is approximate while several
+    processes write at once.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS response_cache_lru ON response_cache (last_used)")
+        self._bytes = self._total_bytes()
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE response_cache SET last_used = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, value: bytes, ttl: float) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, size, expires_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now + ttl, now),
+            )
+            self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._evict(now)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+            return {"entries": entries, "bytes": self._bytes, "evictions": self._evictions}
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _total_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        # Expired entries first, then the least recently used ones; the
+        # running total is resynced since other processes may write too
+        self._db.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        self._bytes = self._total_bytes()
+        while self._bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM response_cache ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._bytes -= size
+                self._evictions += 1
+
+
+class ResponseCache:
+    """Chat response cache over a backend (see module docstring)."""
+
+    def __init__(self, backend: CacheBackend, ttl: float = DEFAULT_TTL, max_temperature: float = 0.0):
+        """
+        Args:
+            backend: Where entries are stored
+            ttl: Seconds an entry is served after it was stored
+            max_temperature: Highest sampling temperature of a cached call
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @classmethod
+    def from_json(cls, config_json: str) -> "ResponseCache":
+        """
+        Build a cache from a JSON config string:
+        {"backend": "sqlite", "path": "/var/cache/genai/responses.db",
+         "max_bytes": 67108864, "ttl": 3600, "max_temperature": 0}
+        """
+        config = json.loads(config_json)
+        max_bytes = int(config.get("max_bytes", DEFAULT_MAX_BYTES))
+        backend_name = config.get("backend", "memory")
+        if backend_name == "memory":
+            backend = MemoryCacheBackend(max_bytes)
+        elif backend_name == "sqlite":
+            if not config.get("path"):
+                raise ValueError("The sqlite response cache backend needs a 'path'")
+            backend = SQLiteCacheBackend(config["path"], max_bytes)
+        else:
+            raise ValueError(f"Unknown response cache backend: {backend_name}")
+        return cls(
+            backend,
+            ttl=float(config.get("ttl", DEFAULT_TTL)),
+            max_temperature=float(config.get("max_temperature", 0.0)),
+        )
+
+    def key_for(
+        self,
+        model: str,
+        request: models_pb2.ChatRequest,
+        config: models_pb2.ChatConfig,
+        system_prompt: Optional[str],
+    ) -> Optional[str]:
+        """
+        Cache key of a call, or None if it is not cacheable.
+
+        Args:
+            model: Resolved model name
+            request: The ChatRequest (messages, tools, response_format)
+            config: Resolved ChatConfig (the request's or the default)
+            system_prompt: Resolved system prompt text
+        """
+        # An unset temperature is the provider's default, not 0
+        if not config.HasField("temperature") or config.temperature > self.max_temperature:
+            return None
+        canonical = models_pb2.ChatRequest(
+            model=model,
+            messages=request.messages,
+            config=config,
+            tools=request.tools,
+        )
+        if request.HasField("response_format"):
+            canonical.response_format.CopyFrom(request.response_format)
+
+        digest = hashlib.blake2b(KEY_VERSION, digest_size=32)
+        digest.update(canonical.SerializeToString(deterministic=True))
+        if system_prompt is not None:
+            digest.update(b"\x00")
+            digest.update(system_prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[models_pb2.ChatResponse]:
+        """Cached response (marked `cached`), or None."""
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        if value is None:
+            return None
+        response = models_pb2.ChatResponse.FromString(value)
+        response.cached = True
+        return response
+
+    def put(self, key: str, response: models_pb2.ChatResponse) -> None:
+        self.backend.put(key, response.SerializeToString(), self.ttl)
+
+    def stats(self) -> Dict[str, int]:
+        """Hits and misses, plus the backend's entries, bytes and evictions."""
+        with self._lock:
+            stats = {"hits": self._hits, "misses": self._misses}
+        stats.update(self.backend.stats())
+        return stats
+
+
+def replayable(response: models_pb2.ChatResponse) -> bool:
+    """Whether a cached response can be replayed as ChatStream chunks (text, no tool calls)."""
+    return response.WhichOneof("content") != "blocks" and not response.tool_calls
+
+
+def replay_stream(response: models_pb2.ChatResponse) -> Iterator[models_pb2.ChatChunk]:
+    """A cached response as the chunks a provider stream ends with: text, then finish."""
+    index = 0
+    if response.text:
+        yield models_pb2.ChatChunk(token=response.text, index=index, cached=True)
+        index += 1
+    yield models_pb2.ChatChunk(
+        token="",
+        index=index,
+        finish_reason=response.finish_reason or "stop",
+        usage=response.usage if response.HasField("usage") else None,
+        cached=True,
+    )
+
+
+def response_from_chunks(
+    model: str,
+    provider: str,
+    chunks: List[models_pb2.ChatChunk],
+) -> Optional[models_pb2.ChatResponse]:
+    """The ChatResponse of a completed stream, or None if it did not finish."""
+    if not chunks or not chunks[-1].HasField("finish_reason"):
+        return None
+    final = chunks[-1]
+    return models_pb2.ChatResponse(
+        text="".join(chunk.token for chunk in chunks),
+        model=model,
+        provider=provider,
+        usage=final.usage if final.HasField("usage") else None,
+        finish_reason=final.finish_reason,
+    )
@@ -10,6 +10,7 @@ import os
 from pathlib import Path
 
 from services.shared.server import create_grpc_server, run_service, get_service_port
+from services.models.cache import ResponseCache
 from services.models.service import ModelService
 
 
@@ -36,7 +37,11 @@ def main():
     service_name = "models"
     port = get_service_port(service_name)
 
-    servicer = ModelService()
+    # Opt-in exact-match cache of deterministic responses (JSON, see cache.py)
+    cache_config = os.getenv("MODEL_RESPONSE_CACHE")
+    response_cache = ResponseCache.from_json(cache_config) if cache_config else None
+
+    servicer = ModelService(response_cache=response_cache)
     server = create_grpc_server(
         servicer=servicer,
         port=port,
@@ -38,7 +38,7 @@ class AnthropicProvider(ModelProvider):
         
         # Anthropic doesn't allow both temperature and top_p
         # Prefer temperature if set, otherwise use top_p
-        if config.temperature > 0:
+        if config.HasField("temperature"):
             payload["temperature"] = config.temperature
         elif config.top_p > 0 and config.top_p < 1:
             payload["top_p"] = config.top_p
@@ -84,7 +84,7 @@ class AnthropicProvider(ModelProvider):
         
         # Anthropic doesn't allow both temperature and top_p
         # Prefer temperature if set, otherwise use top_p
-        if config.temperature > 0:
+        if config.HasField("temperature"):
             payload["temperature"] = config.temperature
         elif config.top_p > 0 and config.top_p < 1:
             payload["top_p"] = config.top_p
@@ -40,10 +40,12 @@ class OpenAIProvider(ModelProvider):
         payload = {
             "model": model,
             "messages": openai_messages,
-            "temperature": config.temperature,
             "top_p": config.top_p,
             "stop": list(config.stop_sequences),
         }
+        # Unset temperature leaves the provider's default
+        if config.HasField("temperature"):
+            payload["temperature"] = config.temperature
         # Only include max_tokens if explicitly set (> 0)
         if config.max_tokens > 0:
             payload["max_tokens"] = config.max_tokens
@@ -88,12 +90,14 @@ class OpenAIProvider(ModelProvider):
         payload = {
             "model": model,
             "messages": openai_messages,
-            "temperature": config.temperature,
             "top_p": config.top_p,
             "stop": list(config.stop_sequences),
             "stream": True,
             "stream_options": {"include_usage": True},
         }
+        # Unset temperature leaves the provider's default
+        if config.HasField("temperature"):
+            payload["temperature"] = config.temperature
         # Only include max_tokens if explicitly set (> 0)
         if config.max_tokens > 0:
             payload["max_tokens"] = config.max_tokens
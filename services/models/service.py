@@ -5,22 +5,113 @@ Architecture:
 - Provider adapters auto-discover their models (OpenAI, Anthropic)
 - ModelRegistry stores explicit registrations (custom + overrides)
 - Resolution: Check registry first (overrides), then adapters (defaults)
+- ModelIndex: resolution precomputed into one immutable name -> entry map,
+  rebuilt (copy-on-write) when a model is registered
+- ResponseCache (opt-in): repeats of deterministic Chat/ChatStream calls
+  are answered from an exact-match cache
 """
 
 from __future__ import annotations
 
 import os
-from typing import Dict, Iterable, Optional
+import threading
+from typing import Dict, Iterable, Optional, Tuple
 
 import grpc
 
 from proto import models_pb2
 from proto import models_pb2_grpc
 from services.shared.servicer_base import BaseServicer
+from services.models.cache import (
+    ResponseCache,
+    replay_stream,
+    replayable,
+    response_from_chunks,
+)
 from services.models.store import ModelRegistry, PromptRegistry
 from services.models.providers import ModelProvider, OpenAIProvider, AnthropicProvider
 
 
+class ModelEntry:
+    """Resolved model: adapter to run it (None if unavailable), capabilities and listing."""
+
+    __slots__ = ("provider", "capabilities", "info")
+
+    def __init__(
+        self,
+        provider: Optional[ModelProvider],
+        capabilities: models_pb2.ModelCapabilities,
+        info: models_pb2.ModelInfo,
+    ):
+        self.provider = provider
+        self.capabilities = capabilities
+        self.info = info
+
+
+class ModelIndex:
+    """
+    Immutable model name -> ModelEntry map.
+    
+    Built once from the provider adapters' models and the registrations, so
+    resolving a model on the Chat/ChatStream path is one dict lookup with no
+    protobuf allocation. Registrations produce a new index (with_registered)
+    that readers pick up by reference swap, without locking.
+    """
+
+    __slots__ = ("_entries", "_infos")
+
+    def __init__(self, entries: Dict[str, ModelEntry]):
+        self._entries = entries
+        # ListModels response contents, in resolution order
+        self._infos = tuple(entry.info for entry in entries.values())
+
+    @classmethod
+    def build(
+        cls,
+        providers: Dict[str, ModelProvider],
+        registered: Iterable[models_pb2.RegisteredModel] = (),
+    ) -> "ModelIndex":
+        """Index auto-discovered models, then apply explicit registrations (overrides)."""
+        entries: Dict[str, ModelEntry] = {}
+        for provider in providers.values():
+            for model_info in provider.get_supported_models():
+                entries[model_info.name] = ModelEntry(provider, model_info.capabilities, model_info)
+        for model in registered:
+            entries[model.name] = cls._registered_entry(model, providers)
+        return cls(entries)
+
+    def with_registered(
+        self,
+        model: models_pb2.RegisteredModel,
+        providers: Dict[str, ModelProvider],
+    ) -> "ModelIndex":
+        """Copy of this index with a registration added or replaced."""
+        entries = dict(self._entries)
+        entries[model.name] = self._registered_entry(model, providers)
+        return ModelIndex(entries)
+
+    def get(self, model_name: str) -> Optional[ModelEntry]:
+        return self._entries.get(model_name)
+
+    @property
+    def model_infos(self) -> Tuple[models_pb2.ModelInfo, ...]:
+        return self._infos
+
+    @staticmethod
+    def _registered_entry(
+        model: models_pb2.RegisteredModel,
+        providers: Dict[str, ModelProvider],
+    ) -> ModelEntry:
+        # For now, we only support inference through default providers
+        # TODO: Support custom adapters for registered models
+        info = models_pb2.ModelInfo(
+            name=model.name,
+            provider=model.provider,
+            capabilities=model.capabilities,
+        )
+        return ModelEntry(providers.get(model.adapter_type), model.capabilities, info)
+
+
 class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
     """
     Model Service implementation.
@@ -31,7 +122,7 @@ class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
     3. Return None if not found
     """
 
-    def __init__(self):
+    def __init__(self, response_cache: Optional[ResponseCache] = None):
         # Provider adapters (auto-discover models)
         self._providers: Dict[str, ModelProvider] = {}
         self._initialize_providers()
@@ -39,8 +130,16 @@ class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
         # Explicit model registrations (custom + overrides)
         self._model_registry = ModelRegistry()
         
+        # Precomputed resolution (replaced, never mutated); readers take no
+        # lock, registrations serialize on the writer lock
+        self._model_index = ModelIndex.build(self._providers, self._model_registry.list_all())
+        self._index_lock = threading.Lock()
+        
         # System prompts
         self._prompts = PromptRegistry()
+        
+        # Exact-match cache of deterministic responses (None = disabled)
+        self._response_cache = response_cache
 
     def add_to_server(self, server: grpc.Server):
         """Add this servicer to a gRPC server."""
@@ -73,7 +172,13 @@ class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
             request.response_format if request.HasField("response_format") else None
         )
 
-        return provider.chat(
+        cache_key = self._cache_key(model_name, request, config, system_prompt)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        response = provider.chat(
             model=model_name,
             messages=list(request.messages),
             config=config,
@@ -81,6 +186,9 @@ class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
             response_format=response_format,
             system_prompt=system_prompt,
         )
+        if cache_key is not None:
+            self._response_cache.put(cache_key, response)
+        return response
 
     def ChatStream(
         self,
@@ -111,7 +219,14 @@ class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
             request.response_format if request.HasField("response_format") else None
         )
 
-        yield from provider.chat_stream(
+        cache_key = self._cache_key(model_name, request, config, system_prompt)
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None and replayable(cached):
+                yield from replay_stream(cached)
+                return
+
+        stream = provider.chat_stream(
             model=model_name,
             messages=list(request.messages),
             config=config,
@@ -119,6 +234,18 @@ class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
             response_format=response_format,
             system_prompt=system_prompt,
         )
+        # Streams cannot carry tool calls, so only tool-free calls fill the cache
+        if cache_key is None or tools:
+            yield from stream
+            return
+
+        chunks = []
+        for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        response = response_from_chunks(model_name, self._model_index.get(model_name).info.provider, chunks)
+        if response is not None:
+            self._response_cache.put(cache_key, response)
 
     # ==================== Discovery ====================
 
@@ -132,22 +259,7 @@ class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
         
         Note: Explicit registrations override auto-discovered models with same name
         """
-        models_by_name = {}
-        
-        # First, get auto-discovered models from providers
-        for provider in self._providers.values():
-            for model_info in provider.get_supported_models():
-                models_by_name[model_info.name] = model_info
-        
-        # Then add/override with explicit registrations
-        for registered in self._model_registry.list_all():
-            models_by_name[registered.name] = models_pb2.ModelInfo(
-                name=registered.name,
-                provider=registered.provider,
-                capabilities=registered.capabilities,
-            )
-        
-        return models_pb2.ListModelsResponse(models=list(models_by_name.values()))
+        return models_pb2.ListModelsResponse(models=self._model_index.model_infos)
 
     def GetModelCapabilities(
         self,
@@ -155,16 +267,9 @@ class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
         context,
     ) -> models_pb2.ModelCapabilities:
         """Get capabilities for a specific model."""
-        # Check explicit registrations first
-        registered = self._model_registry.get(request.model)
-        if registered:
-            return registered.capabilities
-        
-        # Check auto-discovered models from providers
-        for provider in self._providers.values():
-            for model_info in provider.get_supported_models():
-                if model_info.name == request.model:
-                    return model_info.capabilities
+        entry = self._model_index.get(request.model)
+        if entry is not None:
+            return entry.capabilities
         
         context.set_code(grpc.StatusCode.NOT_FOUND)
         context.set_details(f"Model '{request.model}' not found")
@@ -216,14 +321,19 @@ class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
         - Custom self-hosted models
         - Override built-in model endpoints (e.g., Azure OpenAI)
         """
-        model = self._model_registry.register(
-            name=request.name,
-            endpoint=request.endpoint,
-            capabilities=request.capabilities,
-            health_check=request.health_check,
-            adapter_type=request.adapter_type or "openai",
-            provider=request.provider if request.provider else None,
-        )
+        with self._index_lock:
+            model = self._model_registry.register(
+                name=request.name,
+                endpoint=request.endpoint,
+                capabilities=request.capabilities,
+                health_check=request.health_check,
+                adapter_type=request.adapter_type or "openai",
+                provider=request.provider if request.provider else None,
+            )
+            # Swap in a new index; calls in flight keep resolving against the
+            # old one. Concurrent registrations must not both start from the
+            # same index, or one of them would be lost
+            self._model_index = self._model_index.with_registered(model, self._providers)
         return models_pb2.RegisterModelResponse(
             name=model.name,
             status=model.status,
@@ -278,30 +388,27 @@ class ModelService(models_pb2_grpc.ModelServiceServicer, BaseServicer):
         """
         Find the provider adapter for a model.
         
-        Resolution order:
+        Resolution order (precomputed in the ModelIndex):
         1. Check explicit registrations (custom + overrides)
         2. Check provider auto-discovered models (built-in defaults)
         
         Returns:
             Provider adapter or None if not found
         """
-        # Check explicit registrations first (overrides + custom models)
-        registered = self._model_registry.get(model_name)
-        if registered:
-            # For now, we only support inference through default providers
-            # TODO: Support custom adapters for registered models
-            adapter_type = registered.adapter_type
-            if adapter_type in self._providers:
-                return self._providers[adapter_type]
+        entry = self._model_index.get(model_name)
+        return entry.provider if entry is not None else None
+
+    def _cache_key(
+        self,
+        model_name: str,
+        request: models_pb2.ChatRequest,
+        config: models_pb2.ChatConfig,
+        system_prompt: Optional[str],
+    ) -> Optional[str]:
+        """Response cache key of a call, or None if caching is off or the call is not deterministic."""
+        if self._response_cache is None:
             return None
-        
-        # Check auto-discovered models from providers
-        for provider in self._providers.values():
-            for model_info in provider.get_supported_models():
-                if model_info.name == model_name:
-                    return provider
-        
-        return None
+        return self._response_cache.key_for(model_name, request, config, system_prompt)
 
     def _resolve_system_prompt(
         self,
@@ -0,0 +1,232 @@
+"""
+Message compression and size limits for platform gRPC servers.
+
+Long sessions make GetMessagesResponse (and the gateway's copy of it)
+megabytes large, which both costs bandwidth and runs into gRPC's default
+4 MB receive limit. This module provides:
+- Channel/server options that raise the send and receive limits
+- A per-method compression policy with a size threshold, so large
+  responses are gzip/deflate compressed and tiny ones are sent as is
+- A server interceptor that applies the policy to every response
+
+Compression is negotiated by gRPC itself: clients advertise the
+algorithms they accept and a response is only compressed with one of them.
+
+Configured with environment variables:
+- GRPC_MAX_SEND_MESSAGE_MB / GRPC_MAX_RECEIVE_MESSAGE_MB (default 64)
+- GRPC_COMPRESSION: default algorithm, "gzip", "deflate" or "none" (default none)
+- GRPC_COMPRESSION_METHODS: per-method overrides, e.g. "GetMessages=gzip,Chat=none"
+- GRPC_COMPRESSION_MIN_BYTES: messages smaller than this are not compressed (default 1024)
+"""
+
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import grpc
+
+
+# gRPC's own receive limit is 4 MB, too small for long session histories
+DEFAULT_MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+# Below this size compression costs more CPU than it saves on the wire
+DEFAULT_COMPRESSION_MIN_BYTES = 1024
+
+ALGORITHMS: Dict[str, grpc.Compression] = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+def message_size_options(
+    max_send_bytes: Optional[int] = None,
+    max_receive_bytes: Optional[int] = None,
+) -> List[Tuple[str, int]]:
+    """
+    gRPC channel/server options for message size limits.
+
+    Limits not given explicitly are read from GRPC_MAX_SEND_MESSAGE_MB and
+    GRPC_MAX_RECEIVE_MESSAGE_MB (-1 = unlimited).
+    """
+    if max_send_bytes is None:
+        max_send_bytes = _env_megabytes("GRPC_MAX_SEND_MESSAGE_MB")
+    if max_receive_bytes is None:
+        max_receive_bytes = _env_megabytes("GRPC_MAX_RECEIVE_MESSAGE_MB")
+    return [
+        ("grpc.max_send_message_length", max_send_bytes),
+        ("grpc.max_receive_message_length", max_receive_bytes),
+    ]
+
+
+def _env_megabytes(name: str) -> int:
+    value = os.getenv(name)
+    if not value:
+        return DEFAULT_MAX_MESSAGE_BYTES
+    megabytes = float(value)
+    return -1 if megabytes < 0 else int(megabytes * 1024 * 1024)
+
+
+def parse_algorithm(name: str) -> grpc.Compression:
+    try:
+        return ALGORITHMS[name.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown compression algorithm '{name}' (expected one of {', '.join(ALGORITHMS)})")
+
+
+def message_size(message) -> int:
+    """Serialized size of a protobuf message (or length of raw bytes)."""
+    if isinstance(message, bytes):
+        return len(message)
+    return message.ByteSize()
+
+
+class CompressionPolicy:
+    """Chooses a compression algorithm per method and message size."""
+
+    def __init__(
+        self,
+        default: grpc.Compression = grpc.Compression.NoCompression,
+        methods: Optional[Dict[str, grpc.Compression]] = None,
+        min_bytes: int = DEFAULT_COMPRESSION_MIN_BYTES,
+    ):
+        """
+        Args:
+            default: Algorithm for methods without an override
+            methods: Per-method algorithm overrides, keyed by RPC name (e.g. "GetMessages")
+            min_bytes: Messages smaller than this are sent uncompressed
+        """
+        self.default = default
+        self.methods = methods or {}
+        self.min_bytes = min_bytes
+
+    @classmethod
+    def from_env(cls) -> "CompressionPolicy":
+        """Build a policy from GRPC_COMPRESSION* environment variables."""
+        methods = {}
+        for entry in os.getenv("GRPC_COMPRESSION_METHODS", "").split(","):
+            if entry.strip():
+                method_name, _, algorithm = entry.partition("=")
+                methods[method_name.strip()] = parse_algorithm(algorithm)
+        return cls(
+            default=parse_algorithm(os.getenv("GRPC_COMPRESSION", "none")),
+            methods=methods,
+            min_bytes=int(os.getenv("GRPC_COMPRESSION_MIN_BYTES", str(DEFAULT_COMPRESSION_MIN_BYTES))),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.default != grpc.Compression.NoCompression or any(
+            algorithm != grpc.Compression.NoCompression for algorithm in self.methods.values()
+        )
+
+    @property
+    def server_algorithm(self) -> Optional[grpc.Compression]:
+        """Algorithm to enable server-wide where it cannot be chosen per call (grpc.aio)."""
+        if self.default != grpc.Compression.NoCompression:
+            return self.default
+        for algorithm in self.methods.values():
+            if algorithm != grpc.Compression.NoCompression:
+                return algorithm
+        return None
+
+    def algorithm_for(self, method_name: str) -> grpc.Compression:
+        return self.methods.get(method_name, self.default)
+
+    def for_message(self, method_name: str, message) -> Optional[grpc.Compression]:
+        """Algorithm to send `message` with, or None to send it uncompressed."""
+        algorithm = self.algorithm_for(method_name)
+        if algorithm == grpc.Compression.NoCompression:
+            return None
+        if message_size(message) < self.min_bytes:
+            return None
+        return algorithm
+
+    def apply_unary(self, context, method_name: str, response):
+        """Compress a unary response if the method and its size call for it."""
+        algorithm = self.for_message(method_name, response)
+        if algorithm is not None:
+            context.set_compression(algorithm)
+
+    def stream_filter(self, context, method_name: str) -> Optional[Callable[[object], None]]:
+        """
+        Per-message hook for a streaming response.
+
+        Returns None if the method is not compressed; otherwise a function to
+        call before yielding each message, which skips compression for
+        messages under the threshold (e.g. individual chat chunks).
+        """
+        algorithm = self.algorithm_for(method_name)
+        if algorithm == grpc.Compression.NoCompression:
+            return None
+        context.set_compression(algorithm)
+
+        def before_send(message):
+            if message_size(message) < self.min_bytes:
+                context.disable_next_message_compression()
+
+        return before_send
+
+
+def _rpc_name(full_method: str) -> str:
+    # "/proto.SessionService/GetMessages" -> "GetMessages"
+    return full_method.rsplit("/", 1)[-1]
+
+
+class CompressionInterceptor(grpc.ServerInterceptor):
+    """Applies a CompressionPolicy to the responses of a (threaded) gRPC server."""
+
+    def __init__(self, policy: CompressionPolicy):
+        self.policy = policy
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        method_name = _rpc_name(handler_call_details.method)
+        if self.policy.algorithm_for(method_name) == grpc.Compression.NoCompression:
+            return handler
+
+        policy = self.policy
+        if handler.unary_unary:
+            behavior = handler.unary_unary
+
+            def unary_unary(request, context):
+                response = behavior(request, context)
+                if response is not None:
+                    policy.apply_unary(context, method_name, response)
+                return response
+
+            return handler._replace(unary_unary=unary_unary)
+
+        if handler.stream_unary:
+            behavior = handler.stream_unary
+
+            def stream_unary(request_iterator, context):
+                response = behavior(request_iterator, context)
+                if response is not None:
+                    policy.apply_unary(context, method_name, response)
+                return response
+
+            return handler._replace(stream_unary=stream_unary)
+
+        if handler.unary_stream:
+            behavior = handler.unary_stream
+
+            def unary_stream(request, context):
+                return _filter_stream(policy, context, method_name, behavior(request, context))
+
+            return handler._replace(unary_stream=unary_stream)
+
+        behavior = handler.stream_stream
+
+        def stream_stream(request_iterator, context):
+            return _filter_stream(policy, context, method_name, behavior(request_iterator, context))
+
+        return handler._replace(stream_stream=stream_stream)
+
+
+def _filter_stream(policy: CompressionPolicy, context, method_name: str, responses):
+    before_send = policy.stream_filter(context, method_name)
+    for response in responses:
+        before_send(response)
+        yield response
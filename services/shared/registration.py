@@ -0,0 +1,136 @@
+"""
+Gateway registration for platform services.
+
+A service replica registers its address with the gateway at startup and
+then heartbeats in the background, so the gateway routes to it without
+static configuration. If the gateway forgets the replica (TTL expired,
+gateway restarted), the next heartbeat registers it again.
+
+Enabled by setting GATEWAY_REGISTRY_ADDR (the gateway's gRPC address);
+GATEWAY_REGISTRATION_TOKEN is sent with every call if the gateway requires it.
+"""
+
+import os
+import socket
+import threading
+from typing import Optional
+
+import grpc
+
+from proto import registry_pb2
+from proto import registry_pb2_grpc
+from services.shared.transport import preferred_address
+
+
+class ServiceRegistration:
+    """Keeps one replica registered with the gateway until stopped."""
+
+    def __init__(
+        self,
+        service_name: str,
+        address: str,
+        gateway_address: str,
+        ttl: float = 0.0,
+        retry_interval: float = 2.0,
+        token: Optional[str] = None,
+    ):
+        """
+        Args:
+            service_name: Service this replica serves (e.g. "sessions")
+            address: host:port the gateway can reach this replica on
+            gateway_address: Gateway gRPC address (host:port)
+            ttl: Requested TTL in seconds (0 = gateway default)
+            retry_interval: Seconds between attempts while the gateway is unreachable
+            token: Registration token the gateway requires (if any)
+        """
+        self.service_name = service_name
+        self.address = address
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._metadata = (("x-registration-token", token),) if token else None
+
+        self._channel = grpc.insecure_channel(preferred_address(gateway_address))
+        self._stub = registry_pb2_grpc.RegistryServiceStub(self._channel)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Register and start heartbeating on a daemon thread."""
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"{self.service_name}-registration",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop heartbeating and deregister (best effort)."""
+        self._stop.set()
+        # A heartbeat or registration still in flight would re-register the
+        # replica after Deregister; let it finish (its calls have timeouts)
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self._stub.Deregister(
+                registry_pb2.DeregisterRequest(service_name=self.service_name, address=self.address),
+                timeout=2.0,
+                metadata=self._metadata,
+            )
+        except grpc.RpcError:
+            pass
+        self._channel.close()
+
+    def _run(self):
+        registered = False
+        interval = self.retry_interval
+        while not self._stop.is_set():
+            try:
+                if registered:
+                    response = self._stub.Heartbeat(
+                        registry_pb2.HeartbeatRequest(service_name=self.service_name, address=self.address),
+                        timeout=interval,
+                        metadata=self._metadata,
+                    )
+                    registered = response.registered
+                if not registered:
+                    response = self._stub.Register(
+                        registry_pb2.RegisterRequest(
+                            service_name=self.service_name,
+                            address=self.address,
+                            ttl_seconds=self.ttl,
+                        ),
+                        timeout=self.retry_interval,
+                        metadata=self._metadata,
+                    )
+                    registered = True
+                    interval = response.heartbeat_interval_seconds or self.retry_interval
+                    print(f"Registered {self.service_name} at {self.address} with the gateway")
+            except grpc.RpcError as e:
+                # Gateway unreachable: keep trying, re-registering once it is back
+                registered = False
+                interval = self.retry_interval
+                print(f"Gateway registration failed: {e.code()}")
+            self._stop.wait(interval)
+
+
+def start_registration(service_name: str, port: int) -> Optional[ServiceRegistration]:
+    """
+    Register this service with the gateway if GATEWAY_REGISTRY_ADDR is set.
+
+    The advertised address is SERVICE_ADVERTISE_ADDR if set, otherwise
+    this host's name and the service port.
+    """
+    gateway_address = os.getenv("GATEWAY_REGISTRY_ADDR")
+    if not gateway_address:
+        return None
+
+    address = os.getenv("SERVICE_ADVERTISE_ADDR") or f"{socket.gethostname()}:{port}"
+    registration = ServiceRegistration(
+        service_name,
+        address,
+        gateway_address,
+        ttl=float(os.getenv("SERVICE_REGISTRATION_TTL", "0")),
+        token=os.getenv("GATEWAY_REGISTRATION_TOKEN"),
+    )
+    registration.start()
+    return registration
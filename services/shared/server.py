@@ -5,6 +5,9 @@ Provides common patterns for:
 - gRPC server creation
 - Port configuration
 - Server lifecycle management
+- Registration with the gateway (see registration.py)
+- Message size limits and compression (see compression.py)
+- Unix domain sockets for co-located callers (see transport.py)
 """
 
 import os
@@ -12,6 +15,10 @@ import grpc
 from concurrent import futures
 from typing import Callable, Optional
 
+from services.shared.compression import CompressionInterceptor, CompressionPolicy, message_size_options
+from services.shared.registration import start_registration
+from services.shared.transport import add_listen_ports
+
 
 # Port registry to ensure unique ports across services
 SERVICE_PORTS = {
@@ -60,7 +67,11 @@ def create_grpc_server(
     servicer: 'BaseServicer',
     port: Optional[int] = None,
     service_name: Optional[str] = None,
-    max_workers: int = 10
+    max_workers: int = 10,
+    compression: Optional[CompressionPolicy] = None,
+    max_send_message_bytes: Optional[int] = None,
+    max_receive_message_bytes: Optional[int] = None,
+    socket_dir: Optional[str] = None,
 ) -> grpc.Server:
     """
     Create and configure a gRPC server for a platform service.
@@ -70,6 +81,14 @@ def create_grpc_server(
         port: Optional explicit port. If None, uses service_name to look up port
         service_name: Service name for port lookup (required if port is None)
         max_workers: Number of worker threads for the server
+        compression: Per-method response compression (defaults to the
+            GRPC_COMPRESSION* environment variables)
+        max_send_message_bytes: Largest response the server sends (defaults
+            to GRPC_MAX_SEND_MESSAGE_MB, 64 MB)
+        max_receive_message_bytes: Largest request the server accepts
+            (defaults to GRPC_MAX_RECEIVE_MESSAGE_MB, 64 MB)
+        socket_dir: Directory to also listen on a Unix socket in, as
+            grpc-<port>.sock (defaults to GRPC_UNIX_SOCKET_DIR; unset = TCP only)
     
     Returns:
         Configured gRPC server (not started)
@@ -80,15 +99,23 @@ def create_grpc_server(
             raise ValueError("Either port or service_name must be provided")
         port = get_service_port(service_name)
     
+    # Compress large responses (e.g. GetMessages for long sessions) per method
+    if compression is None:
+        compression = CompressionPolicy.from_env()
+    interceptors = [CompressionInterceptor(compression)] if compression.enabled else []
+    
     # Create server
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        interceptors=interceptors,
+        options=message_size_options(max_send_message_bytes, max_receive_message_bytes),
+    )
     
     # Add servicer (servicer implements add_to_server method)
     servicer.add_to_server(server)
     
-    # Configure listening address
-    listen_addr = f'[::]:{port}'
-    server.add_insecure_port(listen_addr)
+    # Listen on TCP, plus a Unix socket for callers on the same host
+    add_listen_ports(server, port, socket_dir)
     
     return server
 
@@ -101,6 +128,9 @@ def run_service(
     """
     Run a service server with proper startup/shutdown handling.
     
+    If GATEWAY_REGISTRY_ADDR is set, the service registers with the gateway
+    once started and heartbeats until it stops.
+    
     Args:
         server: gRPC server instance
         service_name: Name of the service (for logging)
@@ -113,11 +143,15 @@ def run_service(
     
     server.start()
     print(f"{service_name} Service started. Press Ctrl+C to stop.")
+    registration = start_registration(service_name, port)
     
     try:
         server.wait_for_termination()
     except KeyboardInterrupt:
         print(f"\nStopping {service_name} Service...")
+        # Leave the gateway's routing table before refusing calls
+        if registration is not None:
+            registration.stop()
         server.stop(0)
         print(f"{service_name} Service stopped.")
 
@@ -0,0 +1,120 @@
+"""
+Unix domain socket transport for co-located services.
+
+When the gateway and platform services share a host (same pod), a hop over
+a Unix domain socket skips the TCP/IP stack that loopback TCP still goes
+through. With GRPC_UNIX_SOCKET_DIR set (to a directory every co-located
+process can reach, e.g. a shared emptyDir volume):
+- Servers listen on <dir>/grpc-<port>.sock in addition to their TCP port
+- Clients dialing a local host:port (localhost, 127.0.0.1, this host's
+  name) use that socket instead if a server is listening on it, and fall
+  back to TCP otherwise
+
+Explicit "unix:" addresses (unix:/run/genai/sessions.sock) are accepted
+wherever a host:port is.
+"""
+
+import os
+import socket
+import stat
+from typing import Optional
+
+
+UNIX_PREFIX = "unix:"
+SOCKET_DIR_ENV = "GRPC_UNIX_SOCKET_DIR"
+
+# Host names that mean "this host"
+LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "::1", "[::1]", "0.0.0.0", socket.gethostname()})
+
+# How long a probe waits for the server behind a socket file
+PROBE_TIMEOUT = 0.2
+
+
+def is_unix_address(address: str) -> bool:
+    return address.startswith(UNIX_PREFIX)
+
+
+def unix_socket_path(address: str) -> str:
+    """Filesystem path of a "unix:" address (unix:/path and unix:///path)."""
+    path = address[len(UNIX_PREFIX):]
+    if path.startswith("//"):
+        path = path[2:]
+    return path
+
+
+def unix_socket_address(port: int, socket_dir: Optional[str] = None) -> Optional[str]:
+    """Socket address for a port (None if no socket directory is configured)."""
+    socket_dir = socket_dir or os.getenv(SOCKET_DIR_ENV)
+    if not socket_dir:
+        return None
+    return f"{UNIX_PREFIX}{os.path.join(os.path.abspath(socket_dir), f'grpc-{port}.sock')}"
+
+
+def unix_socket_ready(address: str) -> bool:
+    """Whether a server is accepting connections on a "unix:" address."""
+    path = unix_socket_path(address)
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return False
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.settimeout(PROBE_TIMEOUT)
+            probe.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def preferred_address(address: str, socket_dir: Optional[str] = None) -> str:
+    """
+    Address to dial for `address`.
+
+    The Unix socket of a local host:port if its server is listening on one,
+    `address` itself otherwise (remote hosts, no socket directory, server
+    not running or without a socket).
+    """
+    if is_unix_address(address):
+        return address
+    host, _, port = address.rpartition(":")
+    if host not in LOCAL_HOSTS or not port.isdigit():
+        return address
+    unix_address = unix_socket_address(int(port), socket_dir)
+    if unix_address is None or not unix_socket_ready(unix_address):
+        return address
+    return unix_address
+
+
+def add_listen_ports(server, port: int, socket_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Listen on a TCP port and, if a socket directory is configured, its Unix socket.
+
+    A socket file left behind by a previous server is replaced; one with a
+    live server behind it is left alone and only TCP is served.
+
+    Returns:
+        The "unix:" address listened on, or None
+    """
+    server.add_insecure_port(f"[::]:{port}")
+    unix_address = unix_socket_address(port, socket_dir)
+    if unix_address is None:
+        return None
+
+    path = unix_socket_path(unix_address)
+    if unix_socket_ready(unix_address):
+        print(f"Unix socket {path} is in use, serving TCP only")
+        return None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.lexists(path):
+            os.unlink(path)
+        server.add_insecure_port(unix_address)
+    except (OSError, RuntimeError) as e:
+        # TCP keeps working; clients fall back to it
+        print(f"Not listening on {unix_address}: {e}")
+        return None
+    return unix_address
+
+
+def insecure_target(address: str) -> bool:
+    """Whether a client target is local (Unix socket or loopback) and needs no TLS."""
+    return is_unix_address(address) or address.startswith(("localhost", "127.0.0.1"))
+